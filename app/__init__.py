@@ -2,6 +2,9 @@ from flask import Flask, redirect
 from flasgger import Swagger
 from app.routes import register_routes
 from app.middleware.auth import init_auth_middleware
+from app.db import init_db
+from app.helpers.vector_index import init_vector_index
+from app.helpers.jobs import init_jobs
 from flask_cors import CORS
 from flask_mail import Mail
 import os
@@ -23,9 +26,9 @@ def create_app(test_config=None):
                 "https://prosterio.onrender.com"
             ],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-            "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Credentials"],
+            "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Credentials", "Cache-Control"],
             "supports_credentials": True,
-            "expose_headers": ["Content-Range", "X-Content-Range"]
+            "expose_headers": ["Content-Range", "X-Content-Range", "X-Cache", "ETag", "Accept-Ranges", "Location"]
         }
     })
 
@@ -97,6 +100,14 @@ def create_app(test_config=None):
         {
             "name": "Gdrive",
             "description": "Endpoints for upload file to Google Drive"
+        },
+        {
+            "name": "Metrics",
+            "description": "Endpoints for runtime metrics"
+        },
+        {
+            "name": "Jobs",
+            "description": "Endpoints for background job status"
         }
     ]
     }
@@ -156,6 +167,15 @@ def create_app(test_config=None):
     
     # Initialize auth middleware after routes are registered
     init_auth_middleware(app)
+
+    # Return request-scoped Snowflake connections to the pool
+    init_db(app)
+
+    # Warm the in-process RAG vector index in the background (opt-in)
+    init_vector_index(app)
+
+    # Pick up background jobs left queued or interrupted by a previous run
+    init_jobs(app)
     
     @app.route('/')
     def index():
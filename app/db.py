@@ -1,11 +1,22 @@
 import os
+import time
+import threading
 import snowflake.connector
+from flask import g, has_request_context
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection():
-    conn = snowflake.connector.connect(
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _connect():
+    return snowflake.connector.connect(
         user=os.getenv("SNOWFLAKE_USER"),
         password=os.getenv("SNOWFLAKE_PASSWORD"),
         account=os.getenv("SNOWFLAKE_ACCOUNT"),
@@ -16,4 +27,297 @@ def get_connection():
         ocsp_response_cache_filename=None,  # Disable OCSP caching
         insecure_mode=True  # Skip certificate validation - use with caution
     )
-    return conn
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class _PoolEntry:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Thread-safe pool of Snowflake connections.
+
+    Idle connections are health-checked before being handed out, evicted once
+    they sit idle longer than ``idle_timeout`` (never below ``min_size``) and
+    recycled once they are older than ``max_lifetime``.
+    """
+
+    def __init__(self, connect=_connect, min_size=1, max_size=10, timeout=30,
+                 idle_timeout=600, max_lifetime=3600, health_check_interval=30):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Invalid pool size: need 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+
+        self._idle = []  # LIFO stack so hot connections are reused first
+        self._in_use = {}  # id(conn) -> _PoolEntry
+        self._opening = 0
+        self._cond = threading.Condition()
+
+        self._created = 0
+        self._closed = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._health_check_failures = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    # --- internals (called with self._cond held unless noted) ---
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _expired(self, entry, now):
+        return self.max_lifetime and now - entry.created_at >= self.max_lifetime
+
+    def _close_entry(self, entry):
+        # Called without the lock: closing may block on the network
+        try:
+            entry.conn.close()
+        except Exception as e:
+            print(f"Error closing pooled connection: {str(e)}")
+        with self._cond:
+            self._closed += 1
+
+    def _evict_idle(self, now):
+        """Pop idle entries that are past idle_timeout or max_lifetime."""
+        evicted = []
+        keep = []
+        # Oldest entries sit at the bottom of the stack
+        for entry in self._idle:
+            surplus = len(self._idle) - len(evicted) + len(self._in_use) > self.min_size
+            too_idle = self.idle_timeout and now - entry.last_used >= self.idle_timeout and surplus
+            if self._expired(entry, now) or too_idle:
+                evicted.append(entry)
+            else:
+                keep.append(entry)
+        self._idle = keep
+        return evicted
+
+    def _is_healthy(self, entry, now):
+        # Called without the lock
+        try:
+            if entry.conn.is_closed():
+                return False
+            if now - entry.last_used >= self.health_check_interval:
+                cursor = entry.conn.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                finally:
+                    cursor.close()
+            return True
+        except Exception as e:
+            print(f"Pooled connection failed health check: {str(e)}")
+            return False
+
+    # --- public API ---
+
+    def acquire(self):
+        """Borrow a raw connection, blocking up to ``timeout`` seconds."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            to_close = []
+            entry = None
+            open_new = False
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    to_close.extend(self._evict_idle(now))
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size() < self.max_size:
+                        self._opening += 1
+                        open_new = True
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"Timed out after {self.timeout}s waiting for a Snowflake connection "
+                            f"(max_size={self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            for stale in to_close:
+                self._close_entry(stale)
+
+            if open_new:
+                try:
+                    entry = _PoolEntry(self._connect())
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._created += 1
+            elif not self._is_healthy(entry, time.monotonic()):
+                with self._cond:
+                    self._health_check_failures += 1
+                self._close_entry(entry)
+                continue
+
+            with self._cond:
+                entry.last_used = time.monotonic()
+                self._in_use[id(entry.conn)] = entry
+                self._acquired += 1
+                if waited:
+                    wait = entry.last_used - started
+                    self._waits += 1
+                    self._wait_seconds += wait
+                    self._max_wait_seconds = max(self._max_wait_seconds, wait)
+            return entry.conn
+
+    def release(self, conn, discard=False):
+        """Return a borrowed connection; ``discard`` closes it instead."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+            if entry is None:
+                return
+            now = time.monotonic()
+            entry.last_used = now
+            keep = not discard and not self._expired(entry, now)
+            if keep:
+                try:
+                    keep = not conn.is_closed()
+                except Exception:
+                    keep = False
+            if keep:
+                self._idle.append(entry)
+            self._cond.notify()
+        if not keep:
+            self._close_entry(entry)
+
+    def warm(self):
+        """Open connections until ``min_size`` are available."""
+        conns = []
+        try:
+            with self._cond:
+                missing = self.min_size - self._size()
+            for _ in range(max(0, missing)):
+                conns.append(self.acquire())
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    def close_all(self):
+        """Close every idle connection; in-use ones close when released."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._close_entry(entry)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "opening": self._opening,
+                "total_created": self._created,
+                "total_closed": self._closed,
+                "total_acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "health_check_failures": self._health_check_failures,
+                "waits": self._waits,
+                "total_wait_seconds": round(self._wait_seconds, 6),
+                "avg_wait_seconds": round(self._wait_seconds / self._waits, 6) if self._waits else 0.0,
+                "max_wait_seconds": round(self._max_wait_seconds, 6),
+            }
+
+
+class PooledConnection:
+    """Proxy around a pooled connection whose ``close()`` returns it to the pool.
+
+    Request-scoped leases ignore ``close()``; the app teardown hook releases
+    them once the request finishes.
+    """
+
+    def __init__(self, pool, conn, request_scoped=False):
+        self._pool = pool
+        self._conn = conn
+        self._request_scoped = request_scoped
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    @property
+    def raw(self):
+        """The underlying snowflake.connector connection."""
+        return self._conn
+
+    def close(self):
+        if not self._request_scoped:
+            self.release()
+
+    def release(self, discard=False):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._conn, discard=discard)
+
+
+pool = ConnectionPool(
+    min_size=_env_int("SNOWFLAKE_POOL_MIN_SIZE", 1),
+    max_size=_env_int("SNOWFLAKE_POOL_MAX_SIZE", 10),
+    timeout=_env_int("SNOWFLAKE_POOL_TIMEOUT", 30),
+    idle_timeout=_env_int("SNOWFLAKE_POOL_IDLE_TIMEOUT", 600),
+    max_lifetime=_env_int("SNOWFLAKE_POOL_MAX_LIFETIME", 3600),
+    health_check_interval=_env_int("SNOWFLAKE_POOL_HEALTH_CHECK_INTERVAL", 30),
+)
+
+
+def get_connection():
+    """Borrow a Snowflake connection from the pool.
+
+    Inside a Flask request every call returns the same connection, stored on
+    ``flask.g`` and released by the teardown hook. Outside a request (scripts,
+    background threads) each call gets its own lease, returned on ``close()``.
+    """
+    if has_request_context():
+        conn = g.get("_db_conn")
+        if conn is None:
+            conn = PooledConnection(pool, pool.acquire(), request_scoped=True)
+            g._db_conn = conn
+        return conn
+    return PooledConnection(pool, pool.acquire())
+
+
+def release_request_connection(exc=None):
+    conn = g.pop("_db_conn", None)
+    if conn is None:
+        return
+    discard = False
+    if exc is not None:
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+    conn.release(discard=discard)
+
+
+def init_db(app):
+    app.teardown_appcontext(release_request_connection)
@@ -0,0 +1,540 @@
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.db import get_connection
+from app.helpers.answer_cache import corpus_version
+from app.helpers.skills import SKILLS_COLUMN, canonical_skill
+
+ANALYTICS_QUERY_TIMEOUT_SECONDS = int(os.getenv("ANALYTICS_QUERY_TIMEOUT_SECONDS", 30))
+ANALYTICS_MAX_WORKERS = int(os.getenv("ANALYTICS_MAX_WORKERS", 4))
+# "counters" reads Analytics_Counters, "scan" aggregates the Employees table
+ANALYTICS_SOURCE = os.getenv("ANALYTICS_SOURCE", "counters")
+# Past this age a snapshot is refreshed in the background, picking up writes made by other processes
+ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS", 300))
+# Writes arriving within this window are folded into one rebuild
+ANALYTICS_SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("ANALYTICS_SNAPSHOT_DEBOUNCE_SECONDS", 2))
+SNAPSHOT_NAME = "dashboard"
+ANALYTICS_TOP_N = int(os.getenv("ANALYTICS_TOP_N", 10))
+ANALYTICS_MAX_TOP_N = int(os.getenv("ANALYTICS_MAX_TOP_N", 100))
+# Sankey nodes kept per side before the rest are folded into "Other"; 0 keeps every node
+ANALYTICS_SANKEY_MAX_NODES = int(os.getenv("ANALYTICS_SANKEY_MAX_NODES", 25))
+OTHER_EDUCATION = "Other educations"
+OTHER_JOB_TITLE = "Other job titles"
+
+EMPLOYEE_FILTERS = ("job_titles", "skills", "created_from", "created_to")
+DEFAULT_OPTIONS = {
+    "top_n": ANALYTICS_TOP_N,
+    "min_edge_weight": 1,
+    "max_nodes": ANALYTICS_SANKEY_MAX_NODES,
+    "job_titles": [],
+    "skills": [],
+    "created_from": None,
+    "created_to": None,
+}
+
+
+class AnalyticsError(Exception):
+    """Raised when one or more analytics sections failed or timed out."""
+
+    def __init__(self, message, debug):
+        super().__init__(message)
+        self.debug = debug
+
+
+def _int_option(args, name: str, default: int, low: int, high: int) -> int:
+    value = args.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _date_option(args, name: str) -> Optional[str]:
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def parse_options(args) -> Tuple[Tuple[str, ...], Dict]:
+    """Validate the ``GET /api/analytics`` query string into ``(sections, options)``.
+
+    ``args`` is a werkzeug MultiDict; ``job_title`` and ``skill`` may repeat.
+    Raises ValueError with a message for the client.
+    """
+    sections = SECTIONS
+    if args.get("sections"):
+        requested = [name.strip() for name in args["sections"].split(",") if name.strip()]
+        unknown = [name for name in requested if name not in SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+        sections = tuple(name for name in SECTIONS if name in requested)
+
+    options = {
+        "top_n": _int_option(args, "top_n", ANALYTICS_TOP_N, 1, ANALYTICS_MAX_TOP_N),
+        "min_edge_weight": _int_option(args, "min_edge_weight", 1, 1, 10 ** 9),
+        "max_nodes": _int_option(args, "max_nodes", ANALYTICS_SANKEY_MAX_NODES, 0, 10 ** 6),
+        "job_titles": [t for t in args.getlist("job_title") if t],
+        "skills": [s for s in args.getlist("skill") if s],
+        "created_from": _date_option(args, "created_from"),
+        "created_to": _date_option(args, "created_to"),
+    }
+    if options["created_from"] and options["created_to"] and options["created_from"] > options["created_to"]:
+        raise ValueError("created_from must not be after created_to")
+    return sections, options
+
+
+def has_filters(options: Dict) -> bool:
+    """Filters narrow the employees counted, which the counters cannot answer."""
+    return any(options.get(name) for name in EMPLOYEE_FILTERS)
+
+
+def employee_filter(options: Dict) -> Tuple[str, list]:
+    """WHERE clause (or '') and params for the employee filters in ``options``."""
+    conditions, params = [], []
+    if options.get("job_titles"):
+        conditions.append(f"LOWER(JOB_TITLE) IN ({', '.join(['LOWER(%s)'] * len(options['job_titles']))})")
+        params += options["job_titles"]
+    for skill in options.get("skills") or []:
+        # Every requested skill, by canonical name as in top_skills
+        conditions.append(f"ARRAY_CONTAINS(%s::VARIANT, PARSE_JSON({SKILLS_COLUMN}))")
+        params.append(canonical_skill(skill))
+    if options.get("created_from"):
+        conditions.append("CREATED_AT >= %s::DATE")
+        params.append(options["created_from"])
+    if options.get("created_to"):
+        conditions.append("CREATED_AT < DATEADD(day, 1, %s::DATE)")
+        params.append(options["created_to"])
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+def build_sankey(rows, max_nodes: int = 0) -> Dict:
+    """Turn (education, job_title, count) rows into Sankey nodes and links.
+
+    With ``max_nodes`` each side keeps its ``max_nodes - 1`` heaviest nodes
+    and folds the rest into one "Other" node, merging the links that end up
+    between the same pair. Nodes are shared by name and numbered in order of
+    first appearance.
+    """
+    frame = pd.DataFrame(list(rows), columns=["source", "target", "value"])
+    if frame.empty:
+        return {"nodes": [], "links": []}
+    frame = frame.astype({"source": object, "target": object})
+
+    if max_nodes:
+        for column, other in (("source", OTHER_EDUCATION), ("target", OTHER_JOB_TITLE)):
+            totals = frame.groupby(column, sort=False, dropna=False)["value"].sum()
+            if len(totals) > max_nodes:
+                keep = totals.nlargest(max_nodes - 1, keep="first").index
+                frame[column] = frame[column].where(frame[column].isin(keep), other)
+        frame = frame.groupby(["source", "target"], sort=False, dropna=False, as_index=False)["value"].sum()
+
+    # Interleave so nodes are numbered as source, target, source, target ... like the rows
+    names = np.empty(len(frame) * 2, dtype=object)
+    names[0::2] = frame["source"].to_numpy()
+    names[1::2] = frame["target"].to_numpy()
+    codes, uniques = pd.factorize(names, use_na_sentinel=False)
+    return {
+        "nodes": [{"name": None if pd.isna(name) else name} for name in uniques],
+        "links": [
+            {"source": source, "target": target, "value": value}
+            for source, target, value in zip(codes[0::2].tolist(), codes[1::2].tolist(), frame["value"].tolist())
+        ],
+    }
+
+
+SECTIONS = ("job_title_distribution", "experience_level_distribution", "top_skills", "education_to_job_title")
+
+# Section name -> rows -> response value
+SECTION_VALUES = {
+    "job_title_distribution": lambda rows, options: [
+        {'job_title': row[0], 'total_employees': row[1]} for row in rows
+    ],
+    "experience_level_distribution": lambda rows, options: [
+        {'experience_level': row[0], 'total_employees': row[1]} for row in rows
+    ],
+    "top_skills": lambda rows, options: [{'skill': row[0], 'total_employees': row[1]} for row in rows],
+    "education_to_job_title": lambda rows, options: build_sankey(rows, options["max_nodes"]),
+}
+
+
+def scan_query(name: str, options: Dict) -> Tuple[str, list]:
+    """SQL aggregating the (filtered) Employees table for one section."""
+    where, params = employee_filter(options)
+    if name == "job_title_distribution":
+        return f"""
+            SELECT JOB_TITLE, COUNT(*) AS total_employees
+            FROM Employees{where}
+            GROUP BY JOB_TITLE
+            ORDER BY total_employees DESC
+        """, params
+    if name == "experience_level_distribution":
+        return f"""
+            SELECT
+              CASE
+                WHEN JOB_TITLE ILIKE %s THEN 'Junior'
+                WHEN JOB_TITLE ILIKE %s THEN 'Senior'
+                WHEN JOB_TITLE ILIKE %s THEN 'Managerial'
+                ELSE 'Mid-Level'
+              END AS experience_level,
+              COUNT(*) AS total_employees
+            FROM Employees{where}
+            GROUP BY experience_level
+        """, ["%Junior%", "%Senior%", "%Manager%"] + params
+    if name == "top_skills":
+        return f"""
+            SELECT
+              TRIM(f.value::STRING, '"') AS skill,
+              COUNT(*) AS total_employees
+            FROM Employees,
+            LATERAL FLATTEN(input => PARSE_JSON({SKILLS_COLUMN})) f{where}
+            GROUP BY skill
+            ORDER BY total_employees DESC
+            LIMIT %s
+        """, params + [options["top_n"]]
+    if name == "education_to_job_title":
+        return f"""
+            SELECT edu.value:title::STRING AS education, JOB_TITLE, COUNT(*) AS count
+            FROM Employees, LATERAL FLATTEN(input => PARSE_JSON(EDUCATIONS)) edu{where}
+            GROUP BY education, JOB_TITLE
+            HAVING COUNT(*) >= %s
+            ORDER BY count DESC
+        """, params + [options["min_edge_weight"]]
+    raise ValueError(f"Unknown section: {name}")
+
+
+def counter_query(name: str, options: Dict) -> Tuple[str, list]:
+    """The same section from the counters kept by employee writes: O(distinct values) rows."""
+    if name == "job_title_distribution":
+        return """
+            SELECT NULLIF(key1, ''), total
+            FROM Analytics_Counters
+            WHERE dimension = 'job_title' AND total > 0
+            ORDER BY total DESC
+        """, []
+    if name == "experience_level_distribution":
+        return """
+            SELECT key1, total
+            FROM Analytics_Counters
+            WHERE dimension = 'experience_level' AND total > 0
+        """, []
+    if name == "top_skills":
+        return """
+            SELECT key1, total
+            FROM Analytics_Counters
+            WHERE dimension = 'skill' AND total > 0
+            ORDER BY total DESC
+            LIMIT %s
+        """, [options["top_n"]]
+    if name == "education_to_job_title":
+        return """
+            SELECT NULLIF(key1, ''), NULLIF(key2, ''), total
+            FROM Analytics_Counters
+            WHERE dimension = 'education_job_title' AND total >= %s
+            ORDER BY total DESC
+        """, [options["min_edge_weight"]]
+    raise ValueError(f"Unknown section: {name}")
+
+
+def section_query(name: str, source: str, options: Dict) -> Tuple[str, list]:
+    return counter_query(name, options) if source == "counters" else scan_query(name, options)
+
+
+@functools.lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(max_workers=max(1, ANALYTICS_MAX_WORKERS), thread_name_prefix="analytics")
+
+
+def _run_section(name: str, timeout: int, source: str, options: Dict):
+    sql, params = section_query(name, source, options)
+    started = time.time()
+    # Outside a request each worker leases its own pooled connection
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # Snowflake cancels the statement itself once the timeout passes
+        cursor.execute(sql, params, timeout=timeout)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    return SECTION_VALUES[name](rows, options), len(rows), time.time() - started
+
+
+def run_sections(sections: Iterable[str] = SECTIONS, timeout: int = ANALYTICS_QUERY_TIMEOUT_SECONDS,
+                 source: Optional[str] = None, options: Optional[Dict] = None) -> Tuple[Dict, Dict]:
+    """Run the analytics queries concurrently and return (sections, debug).
+
+    ``options`` come from ``parse_options`` (defaults when omitted).
+    ``source`` picks the counter tables or a scan of Employees; by default
+    ANALYTICS_SOURCE, or a scan when ``options`` filter employees.
+    ``debug`` has the source and each section's latency and row count. Raises
+    AnalyticsError, carrying the same debug block, if any section fails or
+    does not finish within ``timeout`` seconds.
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    if source is None:
+        source = "scan" if has_filters(options) else ANALYTICS_SOURCE
+    started = time.time()
+    futures = {name: get_executor().submit(_run_section, name, timeout, source, options) for name in sections}
+    wait(futures.values(), timeout=timeout)
+
+    data, timings, errors = {}, {}, {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            errors[name] = f"timed out after {timeout}s"
+            timings[name] = {"seconds": None, "error": errors[name]}
+            continue
+        try:
+            data[name], rows, seconds = future.result()
+            timings[name] = {"seconds": round(seconds, 3), "rows": rows}
+        except Exception as e:
+            errors[name] = str(e)
+            timings[name] = {"seconds": None, "error": errors[name]}
+
+    debug = {"source": source, "sections": timings, "total_seconds": round(time.time() - started, 3)}
+    if errors:
+        raise AnalyticsError("; ".join(f"{name}: {error}" for name, error in errors.items()), debug)
+    return data, debug
+
+
+def _utc(value: datetime) -> datetime:
+    # TIMESTAMP_NTZ comes back naive; snapshots are always written in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class AnalyticsSnapshot:
+    """The last computed analytics sections, kept in memory and in ``Analytics_Snapshots``.
+
+    ``get`` answers from the snapshot whenever there is one. A snapshot is
+    stale once employees were written in this process (``mark_stale``), when
+    it was built from another ``Corpus_Version`` than the one each read sees
+    (writes from other workers and the bulk_load CLI) or when it is older
+    than ``max_age``; a stale snapshot is still served while a single
+    background thread rebuilds it, or reloads the stored row when another
+    process already rebuilt it. Only a read with nothing in memory or in the
+    table computes the sections on the caller's thread.
+    """
+
+    def __init__(self, compute=run_sections, max_age: float = ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS,
+                 debounce: float = ANALYTICS_SNAPSHOT_DEBOUNCE_SECONDS, connect=None):
+        self.compute = compute
+        self.max_age = max_age
+        self.debounce = debounce
+        self.connect = connect or (lambda: get_connection())
+        self._snapshot = None
+        self._version = 0
+        self._corpus_version = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._rebuilds = 0
+        self._reloads = 0
+        self._failures = 0
+
+    # --- storage ---
+
+    def _load(self) -> Optional[dict]:
+        conn = self.connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT data, generated_at FROM Analytics_Snapshots WHERE name = %s", (SNAPSHOT_NAME,)
+            )
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+        if not row:
+            return None
+        stored = json.loads(row[0])
+        return {"sections": stored["sections"], "debug": stored.get("debug"), "generated_at": _utc(row[1]),
+                "corpus_version": stored.get("corpus_version")}
+
+    def _store(self, snapshot: dict):
+        conn = self.connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                MERGE INTO Analytics_Snapshots t
+                USING (SELECT %s AS name, %s AS data, %s::TIMESTAMP_NTZ AS generated_at) s
+                ON t.name = s.name
+                WHEN MATCHED THEN UPDATE SET data = s.data, generated_at = s.generated_at
+                WHEN NOT MATCHED THEN INSERT (name, data, generated_at) VALUES (s.name, s.data, s.generated_at)
+            """, (
+                SNAPSHOT_NAME,
+                json.dumps({"sections": snapshot["sections"], "debug": snapshot["debug"],
+                            "corpus_version": snapshot["corpus_version"]}),
+                snapshot["generated_at"].replace(tzinfo=None),
+            ))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _read_corpus_version(self) -> Optional[int]:
+        try:
+            conn = self.connect()
+            cursor = conn.cursor()
+            try:
+                version = corpus_version(cursor)
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            print(f"Could not read corpus version: {str(e)}")
+            return None
+        with self._lock:
+            self._corpus_version = version
+        return version
+
+    # --- building ---
+
+    def _is_stale(self, snapshot: dict) -> bool:
+        age = (datetime.now(timezone.utc) - snapshot["generated_at"]).total_seconds()
+        behind = self._corpus_version is not None and snapshot.get("corpus_version") != self._corpus_version
+        return snapshot["version"] != self._version or behind or age >= self.max_age
+
+    def rebuild(self) -> dict:
+        """Compute the sections now, store them and return the new snapshot."""
+        version = self._version
+        # Read before computing so writes committed meanwhile leave it stale
+        corpus = self._read_corpus_version()
+        sections, debug = self.compute()
+        snapshot = {"sections": sections, "debug": debug, "generated_at": datetime.now(timezone.utc),
+                    "version": version, "corpus_version": corpus}
+        try:
+            self._store(snapshot)
+        except Exception as e:
+            # Still serve it from memory; other processes keep their own copy
+            print(f"Could not store analytics snapshot: {str(e)}")
+        with self._lock:
+            self._rebuilds += 1
+            current = self._snapshot
+            if current is None or current["generated_at"] <= snapshot["generated_at"]:
+                self._snapshot = snapshot
+        return snapshot
+
+    def _refresh(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot["version"] == self._version:
+            # Only aged out: another process may have rebuilt it already
+            stored = self._load()
+            if stored is not None and stored["generated_at"] > snapshot["generated_at"]:
+                stored["version"] = snapshot["version"]
+                if not self._is_stale(stored):
+                    with self._lock:
+                        self._snapshot = stored
+                        self._reloads += 1
+                    return
+        self.rebuild()
+
+    def _run(self):
+        while True:
+            time.sleep(self.debounce)
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f"Analytics snapshot refresh failed: {str(e)}")
+                with self._lock:
+                    self._failures += 1
+                    self._refreshing = False
+                return
+            with self._lock:
+                snapshot = self._snapshot
+                # Writes made while the rebuild ran need one more pass
+                if snapshot is None or snapshot["version"] == self._version:
+                    self._refreshing = False
+                    return
+
+    def _schedule(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._run, name="analytics-snapshot", daemon=True).start()
+
+    # --- public API ---
+
+    def mark_stale(self):
+        """Call after employees are written; the snapshot is rebuilt in the background."""
+        with self._lock:
+            self._version += 1
+        self._schedule()
+
+    def get(self, refresh: bool = False) -> Tuple[dict, str]:
+        """Return ``(snapshot, status)`` with status HIT, STALE, MISS or BYPASS.
+
+        ``refresh`` rebuilds on the caller's thread. Raises AnalyticsError
+        when the sections have to be computed and a query fails.
+        """
+        if refresh:
+            return self.rebuild(), "BYPASS"
+
+        self._read_corpus_version()
+        snapshot = self._snapshot
+        if snapshot is None:
+            try:
+                stored = self._load()
+            except Exception as e:
+                print(f"Could not load analytics snapshot: {str(e)}")
+                stored = None
+            if stored is None:
+                with self._lock:
+                    self._misses += 1
+                return self.rebuild(), "MISS"
+            # Writes made in this process before the load are not known to be in it
+            stored["version"] = self._version if self._version == 0 else -1
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = stored
+                snapshot = self._snapshot
+
+        if self._is_stale(snapshot):
+            with self._lock:
+                self._stale_hits += 1
+            self._schedule()
+            return snapshot, "STALE"
+        with self._lock:
+            self._hits += 1
+        return snapshot, "HIT"
+
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = self._snapshot
+            served = self._hits + self._stale_hits + self._misses
+            return {
+                "generated_at": snapshot["generated_at"].isoformat() if snapshot else None,
+                "stale": self._is_stale(snapshot) if snapshot else None,
+                "refreshing": self._refreshing,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "rebuilds": self._rebuilds,
+                "reloads": self._reloads,
+                "failures": self._failures,
+                "hit_rate": round(self._hits / served, 4) if served else 0.0,
+            }
+
+
+analytics_snapshot = AnalyticsSnapshot()
@@ -0,0 +1,171 @@
+import json
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from app.helpers.skills import SKILLS_COLUMN
+
+# Analytics_Counters.dimension values; NULL keys are stored as '' so MERGE can match them
+DIMENSIONS = ("job_title", "experience_level", "skill", "education_job_title")
+
+# Full recompute of every counter, the same aggregations GET /api/analytics used to scan for
+RECOMPUTE_SQL = """
+    SELECT 'job_title', COALESCE(JOB_TITLE, ''), '', COUNT(*)
+    FROM Employees
+    GROUP BY 2
+    UNION ALL
+    SELECT 'experience_level',
+      CASE
+        WHEN JOB_TITLE ILIKE '%Junior%' THEN 'Junior'
+        WHEN JOB_TITLE ILIKE '%Senior%' THEN 'Senior'
+        WHEN JOB_TITLE ILIKE '%Manager%' THEN 'Managerial'
+        ELSE 'Mid-Level'
+      END, '', COUNT(*)
+    FROM Employees
+    GROUP BY 2
+    UNION ALL
+    SELECT 'skill', COALESCE(TRIM(f.value::STRING, '"'), ''), '', COUNT(*)
+    FROM Employees, LATERAL FLATTEN(input => PARSE_JSON(COALESCE(SKILLS_NORMALIZED, SKILLS))) f
+    GROUP BY 2
+    UNION ALL
+    SELECT 'education_job_title', COALESCE(edu.value:title::STRING, ''), COALESCE(JOB_TITLE, ''), COUNT(*)
+    FROM Employees, LATERAL FLATTEN(input => PARSE_JSON(EDUCATIONS)) edu
+    GROUP BY 2, 3
+"""
+
+APPLY_DELTAS_SQL = """
+    MERGE INTO Analytics_Counters AS t
+    USING (
+        SELECT column1 AS dimension, column2 AS key1, column3 AS key2, column4 AS delta
+        FROM VALUES {values}
+    ) AS s
+    ON t.dimension = s.dimension AND t.key1 = s.key1 AND t.key2 = s.key2
+    WHEN MATCHED THEN UPDATE SET t.total = t.total + s.delta, t.updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT (dimension, key1, key2, total) VALUES (s.dimension, s.key1, s.key2, s.delta)
+"""
+
+
+def experience_level(job_title) -> str:
+    """Python twin of the ILIKE bucketing in RECOMPUTE_SQL."""
+    title = (job_title or "").lower()
+    if "junior" in title:
+        return "Junior"
+    if "senior" in title:
+        return "Senior"
+    if "manager" in title:
+        return "Managerial"
+    return "Mid-Level"
+
+
+def parse_variant_list(value):
+    """A VARIANT array as read by PARSE_JSON, or None.
+
+    VARIANT columns come back as JSON text, and PUT /api/employees/<id>
+    stores JSON strings, which PARSE_JSON unwraps.
+    """
+    for _ in range(2):
+        if not isinstance(value, str):
+            break
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, list) else None
+
+
+def _as_string(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return json.dumps(value, separators=(",", ":"))
+
+
+def employee_counts(rows: Iterable[Tuple]) -> Counter:
+    """Counter contributions of ``(job_title, skills, educations)`` employee rows.
+
+    ``skills`` is the normalized list where the row has one.
+    """
+    counts = Counter()
+    for job_title, skills, educations in rows:
+        title = job_title or ""
+        counts[("job_title", title, "")] += 1
+        counts[("experience_level", experience_level(job_title), "")] += 1
+        for skill in parse_variant_list(skills) or []:
+            counts[("skill", _as_string(skill).strip('"'), "")] += 1
+        for education in parse_variant_list(educations) or []:
+            degree = education.get("title") if isinstance(education, dict) else None
+            counts[("education_job_title", _as_string(degree), title)] += 1
+    return counts
+
+
+def employee_counts_where(cursor, where: str, params=()) -> Counter:
+    """Counter contributions of the employees matching ``where``, read inside the caller's transaction."""
+    cursor.execute(f"SELECT job_title, {SKILLS_COLUMN}, educations FROM Employees WHERE {where}", params)
+    return employee_counts(cursor.fetchall())
+
+
+def lock_employee_counts(cursor, where: str, params=()) -> Counter:
+    """``employee_counts_where`` after taking the Employees write lock.
+
+    Call it right after BEGIN. The no-op UPDATE holds the table's DML lock
+    until the caller commits or rolls back, so concurrent UPDATE, MERGE and
+    DELETE writers wait instead of changing the rows between this read and
+    the one after the write.
+    """
+    cursor.execute(f"UPDATE Employees SET updated_at = updated_at WHERE {where}", params)
+    return employee_counts_where(cursor, where, params)
+
+
+def counter_deltas(before: Counter, after: Counter) -> Dict[Tuple[str, str, str], int]:
+    """Non-zero ``after - before`` per counter key, negatives included."""
+    deltas = {}
+    for key in before.keys() | after.keys():
+        delta = after.get(key, 0) - before.get(key, 0)
+        if delta:
+            deltas[key] = delta
+    return deltas
+
+
+def apply_deltas(cursor, before: Counter, after: Counter) -> int:
+    """Add ``after - before`` to Analytics_Counters in one MERGE; the caller commits.
+
+    Pooled connections autocommit, so the caller opens the transaction with
+    BEGIN, reads ``before`` with ``lock_employee_counts`` and ``after`` with
+    ``employee_counts_where`` on the same cursor; a rollback then undoes the
+    counters together with the employee statements. Returns the number of
+    counters changed.
+    """
+    deltas = counter_deltas(before, after)
+    if not deltas:
+        return 0
+    params = []
+    for (dimension, key1, key2), delta in sorted(deltas.items()):
+        params += [dimension, key1, key2, delta]
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(deltas))
+    cursor.execute(APPLY_DELTAS_SQL.format(values=values), params)
+    return len(deltas)
+
+
+def reconcile(cursor, fix: bool = False) -> List[Dict]:
+    """Compare Analytics_Counters with a full recompute and return the mismatches.
+
+    With ``fix`` the table is rewritten from the recompute; the caller commits.
+    """
+    cursor.execute(RECOMPUTE_SQL)
+    expected = {(d, k1, k2): total for d, k1, k2, total in cursor.fetchall()}
+    cursor.execute("SELECT dimension, key1, key2, total FROM Analytics_Counters WHERE total <> 0")
+    stored = {(d, k1, k2): total for d, k1, k2, total in cursor.fetchall()}
+
+    mismatches = [
+        {"dimension": key[0], "key1": key[1], "key2": key[2],
+         "expected": expected.get(key, 0), "stored": stored.get(key, 0)}
+        for key in sorted(expected.keys() | stored.keys())
+        if expected.get(key, 0) != stored.get(key, 0)
+    ]
+    if fix:
+        cursor.execute("BEGIN")
+        cursor.execute("DELETE FROM Analytics_Counters")
+        cursor.execute(f"INSERT INTO Analytics_Counters (dimension, key1, key2, total) {RECOMPUTE_SQL}")
+    return mismatches
@@ -0,0 +1,136 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Single-row table; MERGE creates the row on the first write of a fresh schema
+BUMP_CORPUS_VERSION_SQL = """
+    MERGE INTO Corpus_Version AS t
+    USING (SELECT 1 AS id) AS s ON t.id = s.id
+    WHEN MATCHED THEN UPDATE SET t.version = t.version + 1, t.updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT (id, version) VALUES (1, 1)
+"""
+
+
+def corpus_version(cursor) -> int:
+    """Current Corpus_Version row, shared by every worker and CLI process."""
+    cursor.execute("SELECT version FROM Corpus_Version")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def bump_corpus_version(cursor):
+    """Invalidate cached answers everywhere once the caller's transaction commits.
+
+    Call it inside the transaction that changes Employees or Content_Chunks,
+    so the new version becomes visible together with the rows.
+    """
+    cursor.execute(BUMP_CORPUS_VERSION_SQL)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    question = re.sub(r"[^\w\s]", " ", (question or "").lower())
+    return " ".join(question.split())
+
+
+class AnswerCache:
+    """LRU + TTL cache of RAG answers tagged with the corpus version.
+
+    Lookups match the normalized question exactly, then optionally the most
+    similar cached question embedding at or above ``similarity_threshold``.
+    Callers pass the ``corpus_version`` read for the request; entries from
+    any other version are dropped, whichever process bumped it.
+    """
+
+    def __init__(self, max_entries: int = 500, ttl: float = 600, similarity_threshold: Optional[float] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._bypasses = 0
+        self._version = None
+
+    def _key(self, question, params):
+        return (normalize_question(question), tuple(sorted(params.items())))
+
+    def _expired(self, entry, now, version):
+        return entry["version"] != version or (self.ttl and now - entry["created_at"] >= self.ttl)
+
+    def _purge(self, now, version):
+        for key in [key for key, entry in self._entries.items() if self._expired(entry, now, version)]:
+            del self._entries[key]
+
+    def get(self, question: str, params: dict, version: int, embedding=None) -> Optional[dict]:
+        now = time.time()
+        key = self._key(question, params)
+        with self._lock:
+            self._version = version
+            self._purge(now, version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._exact_hits += 1
+                return entry["value"]
+
+            if embedding is not None and self.similarity_threshold is not None:
+                candidates = [
+                    (k, e) for k, e in self._entries.items()
+                    if k[1] == key[1] and e["embedding"] is not None
+                ]
+                if candidates:
+                    query = np.asarray(embedding, dtype=np.float32)
+                    query = query / (np.linalg.norm(query) or 1.0)
+                    scores = np.vstack([e["embedding"] for _, e in candidates]) @ query
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.similarity_threshold:
+                        best_key = candidates[best][0]
+                        self._entries.move_to_end(best_key)
+                        self._semantic_hits += 1
+                        return candidates[best][1]["value"]
+
+            self._misses += 1
+            return None
+
+    def put(self, question: str, params: dict, value: dict, version: int, embedding=None):
+        """Store ``value``; pass the ``version`` read before computing it so a
+        concurrent corpus change is not masked."""
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        with self._lock:
+            self._entries[self._key(question, params)] = {
+                "value": value,
+                "embedding": embedding,
+                "version": version,
+                "created_at": time.time(),
+            }
+            self._entries.move_to_end(self._key(question, params))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_bypass(self):
+        with self._lock:
+            self._bypasses += 1
+
+    def stats(self):
+        with self._lock:
+            hits = self._exact_hits + self._semantic_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "corpus_version": self._version,
+                "exact_hits": self._exact_hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "bypasses": self._bypasses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
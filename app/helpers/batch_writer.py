@@ -0,0 +1,165 @@
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Optional, Sequence
+
+
+class BatchWriter:
+    """Buffers rows for one table and writes them with multi-row INSERTs.
+
+    Rows are flushed by a daemon thread once ``batch_size`` rows are pending or
+    ``flush_interval`` seconds have passed, and once more at interpreter exit.
+    At most ``max_queue`` rows are buffered; further rows are dropped and
+    counted. When ``fallback_path`` is set, rows that cannot be written are
+    appended there as JSON lines and replayed after the next successful write.
+    Each INSERT is committed on its own, so only the failed batch and the
+    ones after it go to the fallback file.
+    """
+
+    def __init__(self, table: str, columns: Sequence[str], batch_size: int = 50, flush_interval: float = 2.0,
+                 max_queue: int = 10000, fallback_path: Optional[str] = None):
+        self.table = table
+        self.columns = list(columns)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max(1, max_queue)
+        self.fallback_path = fallback_path
+        self._pending = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._dropped = 0
+        self._fallback_rows = 0
+        self._replayed = 0
+        atexit.register(self.flush)
+
+    def _insert_sql(self, count):
+        row = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        return f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES " + ", ".join([row] * count)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"batch-writer-{self.table}", daemon=True)
+            self._thread.start()
+
+    def add(self, row: Sequence) -> bool:
+        """Queue one row; returns False if it was dropped because the queue is full."""
+        if len(row) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values for {self.table}, got {len(row)}")
+        with self._cond:
+            if len(self._pending) >= self.max_queue:
+                self._dropped += 1
+                return False
+            self._pending.append(tuple(row))
+            self._ensure_thread()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _take(self):
+        with self._cond:
+            rows, self._pending = self._pending, []
+        return rows
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self.flush()
+
+    def write(self, rows) -> int:
+        """Insert ``rows`` now, committing each chunk of ``batch_size``.
+
+        Returns how many leading rows were committed; ``rows[written:]`` were
+        not written.
+        """
+        from app.db import get_connection
+
+        conn = None
+        cursor = None
+        written = 0
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                cursor.execute(self._insert_sql(len(batch)), [value for row in batch for value in row])
+                conn.commit()
+                written += len(batch)
+                with self._cond:
+                    self._batches += 1
+                    self._written += len(batch)
+        except Exception as e:
+            print(f"Error writing {len(rows) - written} of {len(rows)} rows to {self.table}: {str(e)}")
+            with self._cond:
+                self._failed += len(rows) - written
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+        return written
+
+    def _save_fallback(self, rows):
+        try:
+            with open(self.fallback_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(list(row), default=str) + "\n")
+            with self._cond:
+                self._fallback_rows += len(rows)
+        except OSError as e:
+            print(f"Error saving {len(rows)} {self.table} rows to {self.fallback_path}: {str(e)}")
+
+    def _replay_fallback(self):
+        if not self.fallback_path or not os.path.exists(self.fallback_path):
+            return
+        # Claim the file atomically so other processes keep appending to a fresh one
+        claimed = f"{self.fallback_path}.{os.getpid()}.replay"
+        try:
+            os.replace(self.fallback_path, claimed)
+            with open(claimed, encoding="utf-8") as f:
+                rows = [tuple(json.loads(line)) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"Error reading {claimed}: {str(e)}")
+            return
+        written = self.write(rows) if rows else 0
+        with self._cond:
+            self._replayed += written
+        if written < len(rows):
+            self._save_fallback(rows[written:])
+        os.remove(claimed)
+
+    def flush(self):
+        with self._write_lock:
+            rows = self._take()
+            if not rows:
+                return
+            written = self.write(rows)
+            if written == len(rows):
+                self._replay_fallback()
+            elif self.fallback_path:
+                # Earlier batches are committed; replaying them would insert duplicates
+                self._save_fallback(rows[written:])
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": len(self._pending),
+                "max_queue": self.max_queue,
+                "written": self._written,
+                "failed": self._failed,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "fallback_rows": self._fallback_rows,
+                "replayed": self._replayed,
+            }
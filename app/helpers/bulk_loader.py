@@ -0,0 +1,383 @@
+"""Set-based bulk loading of employees and their content chunks.
+
+Rows are written to compressed files, PUT to a temporary stage and copied
+into temporary tables with COPY INTO; a single MERGE then upserts Employees
+and one DELETE + INSERT ... SELECT replaces their Content_Chunks. The dry-run
+target replays the same steps against a SQLite stand-in built from
+migration/schema.sql, so files and row counts can be checked locally.
+"""
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+from app.helpers.answer_cache import bump_corpus_version
+from app.helpers.analytics_counters import apply_deltas, employee_counts_where, lock_employee_counts
+from app.helpers.chunking import compile_to_chunk
+from app.helpers.embeddings import embed_chunks
+from app.helpers.skills import normalize_skills
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "migration", "schema.sql")
+
+VARIANT_COLUMNS = ["skills", "skills_normalized", "professional_experiences", "educations", "publications", "distinctions", "certifications"]
+EMPLOYEE_COLUMNS = (
+    ["seq", "id", "full_name", "email", "job_title", "promotion_years", "profile"]
+    + VARIANT_COLUMNS + ["file_url", "user_id"]
+)
+CHUNK_COLUMNS = ["employee_seq", "email", "user_id", "type", "ordinal", "content_hash", "chunk_text"]
+FORMATS = ("csv", "parquet")
+# NULL marker in CSV files, so empty strings survive the round trip
+CSV_NULL = "\\N"
+# Employee ids per embed_chunks() call, keeping the IN list bounded
+EMBED_BATCH_EMPLOYEES = 1000
+
+# Column types for the temporary load tables; VARIANT values travel as JSON text
+_LOAD_TYPES = {"seq": "INTEGER", "id": "INTEGER", "promotion_years": "INTEGER", "user_id": "INTEGER",
+               "employee_seq": "INTEGER", "ordinal": "INTEGER"}
+
+# Keep only the last row per email so duplicates in one load do not collide
+_LATEST_EMPLOYEES = "SELECT * FROM employees_load WHERE seq IN (SELECT MAX(seq) FROM employees_load GROUP BY email)"
+
+# Rows whose id and email belong to two different employees cannot be matched
+# to a single target, so they are rejected before the MERGE
+REJECT_CONFLICTS_SQL = """
+    DELETE FROM employees_load
+    USING Employees by_id, Employees by_email
+    WHERE by_id.id = employees_load.id AND by_email.email = employees_load.email AND by_id.id <> by_email.id
+"""
+
+DELETE_CHUNKS_SQL = """
+    DELETE FROM Content_Chunks
+    WHERE employee_id IN (
+        SELECT e.id FROM Employees e JOIN employees_load l ON e.email = l.email
+    )
+"""
+
+INSERT_CHUNKS_SQL = f"""
+    INSERT INTO Content_Chunks (employee_id, user_id, type, ordinal, content_hash, chunk_text)
+    SELECT e.id, c.user_id, c.type, c.ordinal, c.content_hash, c.chunk_text
+    FROM chunks_load c
+    JOIN ({_LATEST_EMPLOYEES}) l ON l.seq = c.employee_seq
+    JOIN Employees e ON e.email = l.email
+"""
+
+
+def _load_table_ddl(table, columns, create="CREATE OR REPLACE TEMPORARY TABLE"):
+    cols = ", ".join(f"{c} {_LOAD_TYPES.get(c, 'VARCHAR')}" for c in columns)
+    return f"{create} {table} ({cols})"
+
+
+def iter_employee_file(path: str) -> Iterator[dict]:
+    """Yield employees from an NDJSON file, a JSON array or {"employees": [...]}."""
+    with open(path, encoding="utf-8") as f:
+        if not path.endswith((".ndjson", ".jsonl")):
+            try:
+                data = json.load(f)
+                yield from data["employees"] if isinstance(data, dict) else data
+                return
+            except ValueError:
+                # More than one JSON document: treat as NDJSON
+                f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_load_files(employees: Iterable[dict], user_id: int, directory: str, fmt: str = "csv") -> Dict:
+    """Validate employees, build their chunks and write both to load files.
+
+    Rows are streamed to disk, so memory stays flat however large the input.
+    Returns the file paths, row counts and the rows that were skipped.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    writer_cls = _CsvWriter if fmt == "csv" else _ParquetWriter
+    suffix = ".csv.gz" if fmt == "csv" else ".parquet"
+    employees_path = os.path.join(directory, "employees" + suffix)
+    chunks_path = os.path.join(directory, "chunks" + suffix)
+    report = {"format": fmt, "employees_file": employees_path, "chunks_file": chunks_path,
+              "employee_rows": 0, "chunk_rows": 0, "skipped": []}
+
+    with writer_cls(employees_path, EMPLOYEE_COLUMNS) as employee_out, writer_cls(chunks_path, CHUNK_COLUMNS) as chunk_out:
+        for seq, employee in enumerate(employees, start=1):
+            if not isinstance(employee, dict) or not all(employee.get(k) for k in ("email", "full_name", "job_title")):
+                report["skipped"].append({"row": seq, "error": "Missing required fields (email, full_name, job_title)"})
+                continue
+            employee = {**employee, "skills_normalized": normalize_skills(employee.get("skills"))}
+            employee_out.write([
+                seq, employee.get("id"), employee["full_name"], employee["email"], employee["job_title"],
+                employee.get("promotion_years"), employee.get("profile"),
+                *[json.dumps(employee.get(c), default=str) if employee.get(c) is not None else None for c in VARIANT_COLUMNS],
+                employee.get("file_url"), user_id,
+            ])
+            report["employee_rows"] += 1
+            for chunk in compile_to_chunk(data=employee, employee_id=None, user_id=user_id):
+                chunk_out.write([seq, employee["email"], user_id, chunk["type"], chunk["ordinal"],
+                                 chunk["content_hash"], chunk["chunk_text"]])
+                report["chunk_rows"] += 1
+
+    report["bytes"] = os.path.getsize(employees_path) + os.path.getsize(chunks_path)
+    return report
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, row):
+        self._writer.writerow([CSV_NULL if v is None else v for v in row])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Buffers rows into Parquet row groups; needs the optional pyarrow package."""
+    ROW_GROUP = 10000
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(f"Parquet output needs pyarrow: {str(e)}")
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(c, pa.int64() if c in _LOAD_TYPES else pa.string()) for c in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="snappy")
+        self._rows = []
+
+    def _flush(self):
+        if self._rows:
+            columns = list(zip(*self._rows))
+            self._writer.write_table(self._pa.table(
+                [self._pa.array(list(values), type=field.type) for values, field in zip(columns, self._schema)],
+                schema=self._schema))
+            self._rows = []
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.ROW_GROUP:
+            self._flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._flush()
+        self._writer.close()
+
+
+class SnowflakeTarget:
+    """PUT files to a temporary stage, COPY INTO temporary tables and MERGE."""
+    name = "snowflake"
+
+    def __init__(self, conn, embed: bool = True):
+        self.conn = conn
+        self.embed = embed
+
+    def _file_format(self, fmt):
+        if fmt == "csv":
+            # csv.writer never escapes backslashes, so Snowflake must not unescape them either
+            return ("FILE_FORMAT = (TYPE = CSV COMPRESSION = GZIP SKIP_HEADER = 1 "
+                    "FIELD_OPTIONALLY_ENCLOSED_BY = '\"' ESCAPE_UNENCLOSED_FIELD = NONE "
+                    "EMPTY_FIELD_AS_NULL = FALSE NULL_IF = ('\\\\N'))")
+        return "FILE_FORMAT = (TYPE = PARQUET) MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE"
+
+    def load(self, files: Dict, timings: Dict) -> Dict:
+        cursor = self.conn.cursor()
+        try:
+            started = time.time()
+            cursor.execute("CREATE TEMPORARY STAGE IF NOT EXISTS bulk_load_stage")
+            cursor.execute(_load_table_ddl("employees_load", EMPLOYEE_COLUMNS))
+            cursor.execute(_load_table_ddl("chunks_load", CHUNK_COLUMNS))
+            for table, path in (("employees_load", files["employees_file"]), ("chunks_load", files["chunks_file"])):
+                prefix = table.split("_")[0]
+                cursor.execute(f"PUT 'file://{os.path.abspath(path)}' @bulk_load_stage/{prefix} "
+                               "AUTO_COMPRESS = FALSE OVERWRITE = TRUE")
+                cursor.execute(f"COPY INTO {table} FROM @bulk_load_stage/{prefix} "
+                               f"{self._file_format(files['format'])} ON_ERROR = ABORT_STATEMENT PURGE = TRUE")
+            timings["stage_copy"] = round(time.time() - started, 3)
+
+            started = time.time()
+            # Stage DDL commits implicitly, so the transaction starts once the files are copied
+            cursor.execute("BEGIN")
+            cursor.execute(REJECT_CONFLICTS_SQL)
+            rejected = cursor.rowcount or 0
+            # Analytics counters move by the difference the MERGE makes to the loaded employees
+            touched = "email IN (SELECT email FROM employees_load) OR id IN (SELECT id FROM employees_load)"
+            counts_before = lock_employee_counts(cursor, touched)
+            cursor.execute(f"""
+                MERGE INTO Employees AS target
+                USING (
+                    SELECT *
+                    FROM (
+                        -- Each row matches one employee: by id first, then by email
+                        SELECT l.seq, COALESCE(by_id.id, by_email.id) AS target_id,
+                               l.full_name, l.email, l.job_title, l.promotion_years, l.profile,
+                               {', '.join(f'PARSE_JSON(l.{c}) AS {c}' for c in VARIANT_COLUMNS)},
+                               l.file_url, l.user_id
+                        FROM employees_load l
+                        LEFT JOIN Employees by_id ON by_id.id = l.id
+                        LEFT JOIN Employees by_email ON by_email.email = l.email
+                        QUALIFY ROW_NUMBER() OVER (PARTITION BY l.email ORDER BY l.seq DESC) = 1
+                    )
+                    QUALIFY target_id IS NULL OR ROW_NUMBER() OVER (PARTITION BY target_id ORDER BY seq DESC) = 1
+                ) AS source
+                ON target.id = source.target_id
+                WHEN MATCHED THEN UPDATE SET
+                    {', '.join(f'target.{c} = source.{c}' for c in EMPLOYEE_COLUMNS[2:])},
+                    target.updated_at = CURRENT_TIMESTAMP()
+                WHEN NOT MATCHED THEN INSERT ({', '.join(EMPLOYEE_COLUMNS[2:])})
+                    VALUES ({', '.join(f'source.{c}' for c in EMPLOYEE_COLUMNS[2:])})
+            """)
+            merged = cursor.fetchone() or (0, 0)
+            apply_deltas(cursor, counts_before, employee_counts_where(cursor, touched))
+            timings["merge"] = round(time.time() - started, 3)
+
+            started = time.time()
+            cursor.execute(DELETE_CHUNKS_SQL)
+            deleted = cursor.rowcount or 0
+            cursor.execute(INSERT_CHUNKS_SQL)
+            inserted = cursor.rowcount or 0
+            timings["chunks"] = round(time.time() - started, 3)
+
+            embedded = 0
+            if self.embed:
+                started = time.time()
+                # Only the loaded employees' chunks; pending rows of other writers are not ours to embed
+                cursor.execute("SELECT id FROM Employees WHERE email IN (SELECT email FROM employees_load)")
+                employee_ids = [row[0] for row in cursor.fetchall()]
+                for start in range(0, len(employee_ids), EMBED_BATCH_EMPLOYEES):
+                    embedded += embed_chunks(cursor, employee_ids[start:start + EMBED_BATCH_EMPLOYEES])
+                timings["embed"] = round(time.time() - started, 3)
+
+            bump_corpus_version(cursor)
+            self.conn.commit()
+            return {"employees_inserted": merged[0], "employees_updated": merged[1], "employees_rejected": rejected,
+                    "chunks_deleted": deleted, "chunks_inserted": inserted, "chunks_embedded": embedded}
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._cleanup(cursor)
+
+    def _cleanup(self, cursor):
+        # The pooled session outlives this load; temporary objects would last as long
+        try:
+            cursor.execute("DROP TABLE IF EXISTS employees_load")
+            cursor.execute("DROP TABLE IF EXISTS chunks_load")
+            cursor.execute("REMOVE @bulk_load_stage")
+        except Exception as e:
+            print(f"Error cleaning up bulk load tables: {str(e)}")
+        finally:
+            cursor.close()
+
+
+def stand_in_schema(path: str = SCHEMA_PATH) -> str:
+    """Translate migration/schema.sql into SQLite DDL for dry runs."""
+    with open(path, encoding="utf-8") as f:
+        sql = re.sub(r"--[^\n]*", "", f.read())
+    sql = re.sub(r"\bINT(?:EGER)?\s+(?:PRIMARY KEY\s+AUTOINCREMENT|AUTOINCREMENT\s+PRIMARY KEY)",
+                 "INTEGER PRIMARY KEY AUTOINCREMENT", sql)
+    sql = re.sub(r"VECTOR\([^)]*\)", "BLOB", sql)
+    sql = sql.replace("CURRENT_TIMESTAMP()", "CURRENT_TIMESTAMP")
+    statements = [s.strip().rstrip(";") for s in re.split(r"(?=CREATE TABLE)", sql) if s.strip()]
+    return ";\n".join(statements) + ";"
+
+
+class SqliteStandInTarget:
+    """Dry run: load the same files into a local SQLite copy of the schema."""
+    name = "sqlite-stand-in"
+
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path)
+        if not self.conn.execute("SELECT name FROM sqlite_master WHERE name = 'Employees'").fetchone():
+            self.conn.executescript(stand_in_schema())
+
+    def _copy(self, table, columns, files, key):
+        if files["format"] != "csv":
+            import pyarrow.parquet as pq
+            rows = (tuple(r[c] for c in columns) for r in pq.read_table(files[key]).to_pylist())
+        else:
+            f = gzip.open(files[key], "rt", encoding="utf-8", newline="")
+            reader = csv.reader(f)
+            if next(reader) != columns:
+                raise ValueError(f"{files[key]} does not have the expected header")
+            rows = (tuple(None if v == CSV_NULL else v for v in row) for row in reader)
+        self.conn.execute(_load_table_ddl(table, columns, create="CREATE TEMP TABLE"))
+        self.conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", rows)
+
+    def load(self, files: Dict, timings: Dict) -> Dict:
+        cur = self.conn.cursor()
+        try:
+            started = time.time()
+            self._copy("employees_load", EMPLOYEE_COLUMNS, files, "employees_file")
+            self._copy("chunks_load", CHUNK_COLUMNS, files, "chunks_file")
+            timings["stage_copy"] = round(time.time() - started, 3)
+
+            started = time.time()
+            updated = cur.execute(
+                f"SELECT COUNT(*) FROM ({_LATEST_EMPLOYEES}) l JOIN Employees e ON e.email = l.email"
+            ).fetchone()[0]
+            total = cur.execute(f"SELECT COUNT(*) FROM ({_LATEST_EMPLOYEES})").fetchone()[0]
+            columns = EMPLOYEE_COLUMNS[2:]
+            cur.execute(f"""
+                INSERT INTO Employees ({', '.join(columns)})
+                SELECT {', '.join(columns)} FROM ({_LATEST_EMPLOYEES}) WHERE true
+                ON CONFLICT(email) DO UPDATE SET
+                    {', '.join(f'{c} = excluded.{c}' for c in columns)},
+                    updated_at = CURRENT_TIMESTAMP
+            """)
+            timings["merge"] = round(time.time() - started, 3)
+
+            started = time.time()
+            deleted = cur.execute(DELETE_CHUNKS_SQL).rowcount
+            inserted = cur.execute(INSERT_CHUNKS_SQL).rowcount
+            timings["chunks"] = round(time.time() - started, 3)
+
+            cur.execute("DROP TABLE employees_load")
+            cur.execute("DROP TABLE chunks_load")
+            self.conn.commit()
+            return {"employees_inserted": total - updated, "employees_updated": updated, "employees_rejected": 0,
+                    "chunks_deleted": deleted, "chunks_inserted": inserted, "chunks_embedded": 0}
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+
+def bulk_load(employees: Iterable[dict], user_id: int, target, fmt: str = "csv",
+              workdir: Optional[str] = None) -> Dict:
+    """Write load files for ``employees`` and load them through ``target``."""
+    directory = tempfile.mkdtemp(prefix="prosterio_bulk_", dir=workdir)
+    timings = {}
+    try:
+        started = time.time()
+        files = write_load_files(employees, user_id, directory, fmt)
+        timings["write_files"] = round(time.time() - started, 3)
+        result = target.load(files, timings) if files["employee_rows"] else {}
+        return {
+            "target": target.name,
+            "format": fmt,
+            "employee_rows": files["employee_rows"],
+            "chunk_rows": files["chunk_rows"],
+            "file_bytes": files["bytes"],
+            "skipped": files["skipped"],
+            **result,
+            "timings": timings,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -1,6 +1,11 @@
 from typing import Dict, List, Any
+import hashlib
 import json # Import json for handling variant types if needed
 
+
+def content_hash(chunk_text: str) -> str:
+    return hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()
+
 # Assuming 'id' passed is the employee_id and we also need user_id
 # Adjust the signature if 'id' represents user_id or if pm_email is still needed
 def compile_to_chunk(data: Dict[str, Any], employee_id: int, user_id: int):
@@ -16,12 +21,22 @@ def compile_to_chunk(data: Dict[str, Any], employee_id: int, user_id: int):
     distinctions = data.get("distinctions", [])
     certifications = data.get("certifications", [])
     chunks = []
+    ordinals = {}
     def add_chunk(chunk_type: str, content: str):
-        """Helper function to create and add a chunk dictionary."""
+        """Helper function to create and add a chunk dictionary.
+
+        (employee_id, type, ordinal) is the chunk's stable key and content_hash
+        lets sync_chunks() skip chunks whose text did not change.
+        """
         formatted_content = content.replace("\n", ". ").strip()
+        chunk_text = f"{chunk_type.upper()} of {full_name}: {formatted_content}"
+        ordinal = ordinals.get(chunk_type.upper(), 0)
+        ordinals[chunk_type.upper()] = ordinal + 1
         chunks.append({
-            "chunk_text": f"{chunk_type.upper()} of {full_name}: {formatted_content}",
+            "chunk_text": chunk_text,
             "type": chunk_type.upper(),
+            "ordinal": ordinal,
+            "content_hash": content_hash(chunk_text),
             "user_id": user_id,
             "employee_id": employee_id,
         })
@@ -71,3 +86,87 @@ def compile_to_chunk(data: Dict[str, Any], employee_id: int, user_id: int):
         add_chunk("CERTIFICATIONS", cert_content)
         
     return chunks
+
+
+def diff_chunks(existing: List[tuple], desired: List[Dict[str, Any]]):
+    """Compare stored chunks with freshly compiled ones for one employee.
+
+    ``existing`` rows are (id, type, ordinal, content_hash). Returns
+    (inserts, updates, delete_ids, unchanged) where inserts are chunk dicts,
+    updates are (id, chunk) pairs whose text changed, and rows without a key
+    (written before chunks had ordinals) or with no counterpart are deleted.
+    """
+    by_key = {}
+    delete_ids = []
+    for chunk_id, chunk_type, ordinal, chunk_hash in existing:
+        key = (chunk_type, ordinal)
+        if ordinal is None or key in by_key:
+            delete_ids.append(chunk_id)
+        else:
+            by_key[key] = (chunk_id, chunk_hash)
+
+    inserts, updates, unchanged = [], [], 0
+    for chunk in desired:
+        current = by_key.pop((chunk["type"], chunk["ordinal"]), None)
+        if current is None:
+            inserts.append(chunk)
+        elif current[1] != chunk["content_hash"]:
+            updates.append((current[0], chunk))
+        else:
+            unchanged += 1
+    delete_ids.extend(chunk_id for chunk_id, _ in by_key.values())
+    return inserts, updates, delete_ids, unchanged
+
+
+def sync_chunks(cursor, chunks_by_employee: Dict[int, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """Bring Content_Chunks in line with ``chunks_by_employee`` touching only changed rows.
+
+    Updated chunks get their embedding cleared so embed_chunks() recomputes
+    just those; unchanged chunks keep their stored vectors.
+    Returns counts of inserted, updated, deleted and unchanged chunks.
+    """
+    stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    employee_ids = list(chunks_by_employee)
+    if not employee_ids:
+        return stats
+
+    cursor.execute(
+        f"SELECT id, employee_id, type, ordinal, content_hash FROM Content_Chunks "
+        f"WHERE employee_id IN ({', '.join(['%s'] * len(employee_ids))})",
+        employee_ids
+    )
+    existing = {employee_id: [] for employee_id in employee_ids}
+    for chunk_id, employee_id, chunk_type, ordinal, chunk_hash in cursor.fetchall():
+        existing.setdefault(employee_id, []).append((chunk_id, chunk_type, ordinal, chunk_hash))
+
+    inserts, updates, delete_ids = [], [], []
+    for employee_id, chunks in chunks_by_employee.items():
+        employee_inserts, employee_updates, employee_deletes, unchanged = diff_chunks(existing[employee_id], chunks)
+        inserts += employee_inserts
+        updates += employee_updates
+        delete_ids += employee_deletes
+        stats["unchanged"] += unchanged
+
+    if delete_ids:
+        cursor.execute(
+            f"DELETE FROM Content_Chunks WHERE id IN ({', '.join(['%s'] * len(delete_ids))})",
+            delete_ids
+        )
+    if updates:
+        cursor.executemany("""
+            UPDATE Content_Chunks
+            SET chunk_text = %s, content_hash = %s, user_id = %s,
+                embedding = NULL, embedding_model = NULL, embedded_at = NULL
+            WHERE id = %s
+        """, [(chunk["chunk_text"], chunk["content_hash"], chunk["user_id"], chunk_id) for chunk_id, chunk in updates])
+    if inserts:
+        cursor.executemany("""
+            INSERT INTO Content_Chunks (employee_id, user_id, type, ordinal, content_hash, chunk_text)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [
+            (chunk["employee_id"], chunk["user_id"], chunk["type"], chunk["ordinal"], chunk["content_hash"], chunk["chunk_text"])
+            for chunk in inserts
+        ])
+
+    stats.update(inserted=len(inserts), updated=len(updates), deleted=len(delete_ids))
+    return stats
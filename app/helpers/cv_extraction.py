@@ -0,0 +1,153 @@
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Tuple
+
+from app.helpers.cv_preprocess import CV_TOKEN_BUDGET, preprocess_cv
+from app.helpers.pdf_text import CV_MAX_PAGES, extract_pdf_pages
+
+# 0 parses PDFs on the calling thread instead of a process pool
+CV_PARSE_PROCESSES = int(os.getenv("CV_PARSE_PROCESSES", min(4, os.cpu_count() or 1)))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 4))
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 60))
+# Bump when the text extraction or preprocessing rules change, so cached
+# extractions made from differently prepared text are not reused
+PARSE_VERSION = 2
+
+
+def parse_settings() -> str:
+    """Everything besides the PDF itself that shapes the text ``parse_pdf`` returns."""
+    return f"v{PARSE_VERSION}:pages={CV_MAX_PAGES}:tokens={CV_TOKEN_BUDGET}"
+
+
+def parse_pdf(data: bytes) -> Tuple[str, float, dict]:
+    """Prompt-ready text of a PDF, the seconds spent and the preprocessing report; runs in a pool process."""
+    started = time.time()
+    pages = extract_pdf_pages(data)
+    if not any(pages):
+        raise ValueError("No text found in PDF (scanned or empty document)")
+    text, report = preprocess_cv(pages)
+    return text, time.time() - started, report
+
+
+class RateLimiter:
+    """Spaces calls at least ``60 / per_minute`` seconds apart across threads."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until the next slot; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _InlineExecutor:
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@functools.lru_cache(maxsize=None)
+def get_parse_pool():
+    if CV_PARSE_PROCESSES <= 0:
+        return _InlineExecutor()
+    # Never fork the server itself: it already runs the DB pool, job and refresh
+    # threads, and a forked child can inherit one of their locks held
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload([__name__])
+    return ProcessPoolExecutor(max_workers=CV_PARSE_PROCESSES, mp_context=context)
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm_pool():
+    return ThreadPoolExecutor(max_workers=max(1, GEMINI_MAX_CONCURRENCY), thread_name_prefix="gemini")
+
+
+gemini_rate_limiter = RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
+
+
+def _timed_generate(generate, text):
+    waited = gemini_rate_limiter.acquire()
+    started = time.time()
+    data = generate(text)
+    return data, waited, time.time() - started
+
+
+def extract_files(files: List[Tuple[str, bytes]], generate: Callable[[str], dict]) -> List[dict]:
+    """Extract several CVs concurrently; results keep the order of ``files``.
+
+    PDFs are parsed and preprocessed on the process pool and each text goes to
+    ``generate`` on the bounded Gemini executor as soon as it is ready. A
+    failure only affects its own file, which gets an ``error`` instead of
+    ``data``. Every result has per-stage ``timings`` in seconds; parsed files
+    also carry the regex-found ``contacts`` and a ``preprocess`` report with
+    token counts before and after.
+    """
+    started = time.time()
+    results = [{"filename": filename, "timings": {}} for filename, _ in files]
+
+    def fail(index, e):
+        results[index]["error"] = str(e)
+        results[index]["timings"]["total"] = round(time.time() - started, 3)
+
+    parse_futures = {}
+    for index, (_, data) in enumerate(files):
+        try:
+            parse_futures[get_parse_pool().submit(parse_pdf, data)] = index
+        except BrokenProcessPool as e:
+            get_parse_pool.cache_clear()
+            fail(index, e)
+
+    llm_futures = {}
+    for future in as_completed(parse_futures):
+        index = parse_futures[future]
+        try:
+            text, parse_seconds, report = future.result()
+        except BrokenProcessPool as e:
+            # A crashed worker breaks the whole pool; the next request gets a fresh one
+            get_parse_pool.cache_clear()
+            fail(index, e)
+            continue
+        except Exception as e:
+            fail(index, e)
+            continue
+        results[index]["contacts"] = report.pop("contacts")
+        results[index]["preprocess"] = report
+        timings = results[index]["timings"]
+        timings["parse"] = round(parse_seconds, 3)
+        timings["parse_wait"] = round(max(0.0, time.time() - started - parse_seconds), 3)
+        llm_futures[get_llm_pool().submit(_timed_generate, generate, text)] = index
+
+    for future in as_completed(llm_futures):
+        index = llm_futures[future]
+        try:
+            data, waited, llm_seconds = future.result()
+        except Exception as e:
+            fail(index, e)
+            continue
+        timings = results[index]["timings"]
+        timings["rate_limit_wait"] = round(waited, 3)
+        timings["llm"] = round(llm_seconds, 3)
+        timings["total"] = round(time.time() - started, 3)
+        results[index]["data"] = data
+
+    return results
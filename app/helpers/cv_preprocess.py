@@ -0,0 +1,113 @@
+import os
+import re
+from typing import Dict, List, Tuple
+
+from app.helpers.retrieval import estimate_tokens
+
+# Approximate tokens of CV text sent to Gemini; the rest of a long CV is cut
+CV_TOKEN_BUDGET = int(os.getenv("CV_TOKEN_BUDGET", 4000))
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-zA-Z]{2,}")
+URL_RE = re.compile(
+    r"(?:https?://|www\.)[^\s|,;]+|(?:linkedin\.com|github\.com|gitlab\.com|behance\.net|medium\.com)/[^\s|,;]+",
+    re.IGNORECASE
+)
+# At least 9 digits so year ranges such as "2016 - 2020" are not taken for phone numbers
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{7,}\d(?![\w/])")
+
+# Only explicit page labels: a bare number may be a year ("2020") or a month ("09/2020")
+_BOILERPLATE = re.compile(
+    r"^(?:"
+    r"page\s*\d+(?:\s*(?:/|of)\s*\d+)?|\d{1,3}\s*(?:/|of)\s*\d{1,3}"
+    r"|curriculum\s+vitae|r[eé]sum[eé]|cv"
+    r"|references?\s+(?:are\s+)?available\s+(?:up)?on\s+request"
+    r"|confidential"
+    r")$",
+    re.IGNORECASE
+)
+_PAGE_EDGE_LINES = 2
+_SEPARATORS = re.compile(r"(?:\s*[|,;•·]\s*){2,}")
+
+
+def _digits(value: str) -> int:
+    return sum(c.isdigit() for c in value)
+
+
+def extract_contacts(text: str) -> Dict[str, List[str]]:
+    """Emails, phone numbers and profile/web URLs found in the text, in order, without duplicates."""
+    emails = list(dict.fromkeys(EMAIL_RE.findall(text)))
+    without_emails = EMAIL_RE.sub(" ", text)
+    urls = list(dict.fromkeys(u.rstrip(".") for u in URL_RE.findall(without_emails)))
+    without_urls = URL_RE.sub(" ", without_emails)
+    phones = list(dict.fromkeys(
+        p.strip() for p in PHONE_RE.findall(without_urls) if 9 <= _digits(p) <= 15
+    ))
+    return {"emails": emails, "phones": phones, "urls": urls}
+
+
+def _strip_contacts(line: str, contacts: Dict[str, List[str]]) -> str:
+    for value in contacts["emails"] + contacts["urls"] + contacts["phones"]:
+        line = line.replace(value, " ")
+    line = _SEPARATORS.sub(" | ", line)
+    return line.strip(" |,;•·")
+
+
+def preprocess_cv(pages: List[str], token_budget: int = CV_TOKEN_BUDGET) -> Tuple[str, Dict]:
+    """Shrink normalized CV pages before they go into the extraction prompt.
+
+    Lines repeated at the top or bottom of several pages (headers, footers)
+    are kept once, page numbers and boilerplate lines are dropped, emails,
+    phones and URLs are pulled out by regex into a single ``Contact:`` line,
+    and the text is cut at a line boundary once it reaches ``token_budget``.
+    Returns the text and a report with the contacts and token counts before
+    and after.
+    """
+    raw = "\n".join(pages)
+    contacts = extract_contacts(raw)
+
+    # Headers and footers sit at the top or bottom of a page and repeat across pages
+    pages_by_line = {}
+    for page_number, page in enumerate(pages):
+        page_lines = page.splitlines()
+        for line in page_lines[:_PAGE_EDGE_LINES] + page_lines[-_PAGE_EDGE_LINES:]:
+            pages_by_line.setdefault(line.lower(), set()).add(page_number)
+
+    lines, seen, removed = [], set(), 0
+    for page_number, page in enumerate(pages):
+        page_lines = page.splitlines()
+        for index, line in enumerate(page_lines):
+            key = line.lower()
+            at_edge = index < _PAGE_EDGE_LINES or index >= len(page_lines) - _PAGE_EDGE_LINES
+            # A bare number is a page number only at the edge of the page it numbers
+            page_label = at_edge and line.strip() == str(page_number + 1)
+            if page_label or _BOILERPLATE.match(line.strip()) or (key in seen and len(pages_by_line.get(key, ())) > 1):
+                removed += 1
+                continue
+            seen.add(key)
+            line = _strip_contacts(line, contacts)
+            if line:
+                lines.append(line)
+            else:
+                removed += 1
+
+    contact = " | ".join(contacts["emails"] + contacts["phones"] + contacts["urls"])
+    if contact:
+        lines.insert(0, f"Contact: {contact}")
+
+    kept, used, truncated = [], 0, False
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            truncated = True
+            break
+        kept.append(line)
+        used += cost
+
+    text = "\n".join(kept)
+    return text, {
+        "tokens_before": estimate_tokens(raw),
+        "tokens_after": estimate_tokens(text),
+        "lines_removed": removed,
+        "truncated": truncated,
+        "contacts": contacts,
+    }
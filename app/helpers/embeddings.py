@@ -0,0 +1,71 @@
+from typing import Iterable, Optional
+
+# Model used for every stored chunk embedding. Bumping it makes existing
+# vectors stale: retrieval falls back to embedding those rows on the fly until
+# they are refreshed by embed_chunks() or the backfill command.
+EMBED_MODEL = "snowflake-arctic-embed-l-v2.0"
+EMBED_DIMENSIONS = 1024
+
+def chunk_embedding_sql(alias: str = "") -> str:
+    """SQL expression for a chunk's vector.
+
+    The stored vector is used when it matches the current model, otherwise it
+    is computed on the fly. Expects `chunk_text`, `embedding` and
+    `embedding_model` columns on ``alias`` (or unqualified in scope when no
+    alias is given) and one %s for the model.
+    """
+    prefix = f"{alias}." if alias else ""
+    return f"""
+    CASE WHEN {prefix}embedding IS NOT NULL AND {prefix}embedding_model = %s
+         THEN {prefix}embedding
+         ELSE SNOWFLAKE.CORTEX.EMBED_TEXT_1024(%s, {prefix}chunk_text)
+    END
+"""
+
+
+def embed_chunks(cursor, employee_ids: Optional[Iterable[int]] = None, limit: Optional[int] = None) -> int:
+    """Fill in missing or stale chunk embeddings.
+
+    Only rows whose embedding is NULL or was produced by another model are
+    touched. Restrict to ``employee_ids`` when given; ``limit`` caps the number
+    of rows updated so a backfill can proceed in batches.
+    Returns the number of rows updated.
+    """
+    filters = ["(embedding IS NULL OR embedding_model IS NULL OR embedding_model <> %s)"]
+    params = [EMBED_MODEL]
+    if employee_ids is not None:
+        ids = [int(employee_id) for employee_id in employee_ids]
+        if not ids:
+            return 0
+        filters.append("employee_id IN ({})".format(','.join(['%s'] * len(ids))))
+        params.extend(ids)
+
+    target = "SELECT id FROM Content_Chunks WHERE " + " AND ".join(filters)
+    if limit:
+        target += " ORDER BY id LIMIT %s"
+        params.append(int(limit))
+
+    cursor.execute(f"""
+        UPDATE Content_Chunks
+        SET embedding = SNOWFLAKE.CORTEX.EMBED_TEXT_1024(%s, chunk_text),
+            embedding_model = %s,
+            embedded_at = CURRENT_TIMESTAMP()
+        WHERE id IN ({target})
+    """, [EMBED_MODEL, EMBED_MODEL] + params)
+    return cursor.rowcount or 0
+
+
+def backfill_embeddings(conn, batch_size: int = 500) -> int:
+    """Embed every chunk that is missing a current embedding, committing per batch."""
+    total = 0
+    cursor = conn.cursor()
+    try:
+        while True:
+            updated = embed_chunks(cursor, limit=batch_size)
+            conn.commit()
+            total += updated
+            print(f"Embedded {updated} chunks ({total} total)")
+            if updated < batch_size:
+                return total
+    finally:
+        cursor.close()
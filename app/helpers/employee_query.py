@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from app.helpers.answer_cache import corpus_version
+from app.helpers.skills import SKILLS_COLUMN, canonical_skill
+
+EMPLOYEES_PAGE_LIMIT = int(os.getenv("EMPLOYEES_PAGE_LIMIT", 50))
+EMPLOYEES_PAGE_MAX_LIMIT = int(os.getenv("EMPLOYEES_PAGE_MAX_LIMIT", 500))
+EMPLOYEES_COUNT_CACHE_SECONDS = float(os.getenv("EMPLOYEES_COUNT_CACHE_SECONDS", 30))
+
+DEFAULT_FIELDS = ("id", "full_name", "job_title", "email", "file_url")
+VARIANT_FIELDS = ("skills", "skills_normalized", "professional_experiences", "educations", "publications", "distinctions", "certifications")
+# file_data (BINARY) is never listed; CVs are served per employee
+SELECTABLE_FIELDS = DEFAULT_FIELDS + ("promotion_years", "profile", "user_id", "created_at", "updated_at") + VARIANT_FIELDS
+
+
+def parse_fields(value: Optional[str]) -> List[str]:
+    """Validate a comma-separated ``fields`` projection; id and full_name are always included."""
+    if not value:
+        return list(DEFAULT_FIELDS)
+    requested = [f.strip().lower() for f in value.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in SELECTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    fields = ["id", "full_name"]
+    fields += [f for f in requested if f not in fields]
+    return fields
+
+
+def parse_cursor(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Parse ``after=<full_name>,<id>``; names may contain commas, the id may not."""
+    if not value:
+        return None
+    name, sep, employee_id = value.rpartition(",")
+    if not sep:
+        raise ValueError("after must be '<full_name>,<id>'")
+    try:
+        return name, int(employee_id)
+    except ValueError:
+        raise ValueError("after must end with an integer employee id")
+
+
+def make_cursor(row: dict) -> str:
+    return f"{row['full_name']},{row['id']}"
+
+
+def filter_clause(job_title: Optional[str] = None, user_id: Optional[int] = None,
+                  skill: Optional[str] = None) -> Tuple[str, list]:
+    conditions, params = [], []
+    if job_title:
+        conditions.append("LOWER(job_title) = LOWER(%s)")
+        params.append(job_title)
+    if skill:
+        # Matched on canonical names, so "python3" finds employees listing "Python (Advanced)"
+        conditions.append(f"ARRAY_CONTAINS(%s::VARIANT, PARSE_JSON({SKILLS_COLUMN}))")
+        params.append(canonical_skill(skill))
+    if user_id is not None:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    return " AND ".join(conditions), params
+
+
+def build_page_query(fields: List[str], job_title: Optional[str] = None, user_id: Optional[int] = None,
+                     after: Optional[Tuple[str, int]] = None, limit: Optional[int] = None,
+                     skill: Optional[str] = None) -> Tuple[str, list]:
+    """SELECT for one keyset page ordered by (full_name, id).
+
+    One extra row is fetched so the caller can tell whether a next page exists.
+    """
+    where, params = filter_clause(job_title, user_id, skill)
+    conditions = [where] if where else []
+    if after is not None:
+        conditions.append("(full_name > %s OR (full_name = %s AND id > %s))")
+        params += [after[0], after[0], after[1]]
+    sql = f"SELECT {', '.join(fields)} FROM employees"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY full_name ASC, id ASC"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit + 1)
+    return sql, params
+
+
+def to_employee(fields: List[str], row) -> dict:
+    employee = {}
+    for field, value in zip(fields, row):
+        if field in VARIANT_FIELDS and isinstance(value, str):
+            value = json.loads(value)
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        employee[field] = value
+    return employee
+
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def count_employees(cursor, job_title: Optional[str] = None, user_id: Optional[int] = None,
+                    skill: Optional[str] = None) -> int:
+    """COUNT(*) for a filter, cached per process until an employee write or the TTL."""
+    key = ((job_title or "").lower(), user_id, canonical_skill(skill) if skill else None)
+    version = corpus_version(cursor)
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[1] == version and now - cached[2] < EMPLOYEES_COUNT_CACHE_SECONDS:
+            return cached[0]
+
+    where, params = filter_clause(job_title, user_id, skill)
+    cursor.execute("SELECT COUNT(*) FROM employees" + (f" WHERE {where}" if where else ""), params)
+    total = cursor.fetchone()[0]
+    with _count_lock:
+        if len(_count_cache) >= 1000:
+            _count_cache.clear()
+        _count_cache[key] = (total, version, now)
+    return total
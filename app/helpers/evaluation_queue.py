@@ -0,0 +1,106 @@
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class EvaluationQueue:
+    """Runs answer evaluations on a small pool of background workers.
+
+    ``submit`` returns an evaluation id right away; the status and scores can be
+    read back with ``get`` while they are still tracked in memory. Only a
+    ``sample_rate`` fraction of answers is evaluated, and submissions are
+    dropped rather than queued once ``max_pending`` jobs are waiting.
+    """
+
+    def __init__(self, evaluate: Callable[[str, dict], dict], workers: int = 2, max_pending: int = 100,
+                 sample_rate: float = 1.0, max_tracked: int = 1000):
+        self.evaluate = evaluate
+        self.workers = max(1, workers)
+        self.sample_rate = sample_rate
+        self.max_tracked = max_tracked
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._statuses = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._submitted = 0
+        self._skipped = 0
+        self._dropped = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _track(self, evaluation_id, **status):
+        with self._lock:
+            entry = self._statuses.setdefault(evaluation_id, {"id": evaluation_id})
+            entry.update(status)
+            self._statuses.move_to_end(evaluation_id)
+            while len(self._statuses) > self.max_tracked:
+                self._statuses.popitem(last=False)
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(self.workers - len(self._threads)):
+                thread = threading.Thread(target=self._run, name=f"evaluation-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, payload: dict) -> Optional[str]:
+        """Queue ``payload`` for evaluation; returns None when it is not sampled."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self._skipped += 1
+            return None
+
+        evaluation_id = str(uuid.uuid4())
+        self._ensure_workers()
+        # Tracked before it is queued so a fast worker's status is never overwritten
+        with self._lock:
+            self._submitted += 1
+        self._track(evaluation_id, status="pending", submitted_at=time.time())
+        try:
+            self._queue.put_nowait((evaluation_id, payload))
+        except queue.Full:
+            with self._lock:
+                self._submitted -= 1
+                self._dropped += 1
+            self._track(evaluation_id, status="dropped", error="Evaluation queue is full")
+        return evaluation_id
+
+    def _run(self):
+        while True:
+            evaluation_id, payload = self._queue.get()
+            self._track(evaluation_id, status="running")
+            try:
+                scores = self.evaluate(evaluation_id, payload)
+                self._track(evaluation_id, status="done", scores=scores, completed_at=time.time())
+                with self._lock:
+                    self._completed += 1
+            except Exception as e:
+                print(f"Evaluation {evaluation_id} failed: {str(e)}")
+                self._track(evaluation_id, status="failed", error=str(e), completed_at=time.time())
+                with self._lock:
+                    self._failed += 1
+            finally:
+                self._queue.task_done()
+
+    def get(self, evaluation_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._statuses.get(evaluation_id)
+            return dict(entry) if entry else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "sample_rate": self.sample_rate,
+                "queued": self._queue.qsize(),
+                "submitted": self._submitted,
+                "skipped": self._skipped,
+                "dropped": self._dropped,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
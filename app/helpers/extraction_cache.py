@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_MB", 64)) * 1024 * 1024
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH") or os.path.join(
+    tempfile.gettempdir(), "prosterio_extractions.sqlite3"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extractions_used_at ON extractions (used_at);
+"""
+
+
+def extraction_key(pdf_bytes: bytes, prompt: str, model: str, parse_settings: str) -> str:
+    """Cache key for one CV: the PDF content plus everything that shapes the answer,
+    including the parsing and preprocessing settings the prompt text came from."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    settings_hash = hashlib.sha256(parse_settings.encode("utf-8")).hexdigest()[:16]
+    return f"{hashlib.sha256(pdf_bytes).hexdigest()}:{prompt_hash}:{model}:{settings_hash}"
+
+
+class ExtractionCache:
+    """Structured CV data keyed by ``extraction_key``, bounded by total bytes.
+
+    Entries live in a local SQLite file so they survive restarts and are
+    shared by every process on the host. Reads refresh an entry's ``used_at``;
+    once the stored JSON grows past ``max_bytes`` the least recently used
+    entries are removed. Changing the prompt, the model or the parsing settings
+    changes the key, so old answers are never served and simply age out.
+    """
+
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._stores = 0
+        self._evictions = 0
+
+    def _db(self):
+        # Called with self._lock held; opened lazily so importing the module touches no files
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def get(self, key: str, refresh: bool = False) -> Optional[dict]:
+        """Stored data for ``key``; ``refresh`` skips the lookup so the caller re-extracts."""
+        with self._lock:
+            if refresh:
+                self._refreshes += 1
+                return None
+            db = self._db()
+            row = db.execute("SELECT data FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            db.execute("UPDATE extractions SET used_at = ? WHERE key = ?", (time.time(), key))
+            self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, data: dict):
+        payload = json.dumps(data, default=str)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO extractions (key, data, size, created_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._stores += 1
+            self._evict(db)
+
+    def _evict(self, db):
+        # Called with self._lock held
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = []
+        for key, size in db.execute("SELECT key, size FROM extractions ORDER BY used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            removed.append((key,))
+            total -= size
+        db.executemany("DELETE FROM extractions WHERE key = ?", removed)
+        self._evictions += len(removed)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "refreshes": self._refreshes,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+extraction_cache = ExtractionCache()
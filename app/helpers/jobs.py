@@ -0,0 +1,411 @@
+import json
+import os
+import queue
+import shutil
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+
+from flask import jsonify, request
+
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", 2))
+JOBS_MAX_PENDING = int(os.getenv("JOBS_MAX_PENDING", 100))
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", 3))
+JOBS_RETENTION_HOURS = float(os.getenv("JOBS_RETENTION_HOURS", 72))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH") or os.path.join(tempfile.gettempdir(), "prosterio_jobs.sqlite3")
+
+PRIORITIES = {"high": 0, "normal": 5, "low": 9}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    user_id INTEGER,
+    payload TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    summary TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+_JOB_COLUMNS = ("id", "kind", "priority", "status", "user_id", "payload", "done", "total", "summary", "error",
+                "attempts", "worker", "created_at", "started_at", "finished_at", "updated_at")
+
+
+class JobQueueFull(Exception):
+    """Raised when ``max_pending`` jobs are already waiting."""
+
+
+class JobStore:
+    """SQLite-backed record of jobs and their partial results.
+
+    The file lives on local disk so queued and interrupted jobs can be picked
+    up again when the process restarts. Uploaded files are kept next to it,
+    one directory per job, until the job finishes.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        self.files_dir = os.path.splitext(path)[0] + "_files"
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        # Called with self._lock held; opened lazily so importing the module touches no files
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _row(self, row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(zip(_JOB_COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+        return job
+
+    def create(self, kind: str, payload: dict, user_id=None, priority: int = PRIORITIES["normal"],
+               total: Optional[int] = None, job_id: Optional[str] = None) -> dict:
+        now = time.time()
+        job_id = job_id or str(uuid.uuid4())
+        with self._lock:
+            self._db().execute(
+                "INSERT INTO jobs (id, kind, priority, status, user_id, payload, total, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?, ?, ?, ?)",
+                (job_id, kind, priority, user_id, json.dumps(payload, default=str), total, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db().execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def results(self, job_id: str, offset: int = 0) -> List:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT result FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq", (job_id, offset)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def claim(self, job_id: str, worker: str) -> Optional[dict]:
+        """Mark a pending job as running; None if another worker got it first."""
+        now = time.time()
+        with self._lock:
+            claimed = self._db().execute(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                "started_at = COALESCE(started_at, ?), updated_at = ? WHERE id = ? AND status = 'pending'",
+                (worker, now, now, job_id)
+            ).rowcount
+        return self.get(job_id) if claimed else None
+
+    def progress(self, job_id: str, done: Optional[int] = None, total: Optional[int] = None,
+                 results: Iterable = ()):
+        """Record progress and append partial results in one transaction."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN")
+            try:
+                if results:
+                    start = db.execute("SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)).fetchone()[0]
+                    db.executemany(
+                        "INSERT INTO job_results (job_id, seq, result) VALUES (?, ?, ?)",
+                        [(job_id, start + i, json.dumps(r, default=str)) for i, r in enumerate(results)]
+                    )
+                db.execute(
+                    "UPDATE jobs SET done = COALESCE(?, done), total = COALESCE(?, total), updated_at = ? WHERE id = ?",
+                    (done, total, time.time(), job_id)
+                )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def finish(self, job_id: str, status: str, summary=None, error: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET status = ?, summary = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(summary, default=str) if summary is not None else None, error, now, now, job_id)
+            )
+        shutil.rmtree(os.path.join(self.files_dir, job_id), ignore_errors=True)
+
+    def requeue(self, job_id: str):
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET status = 'pending', worker = NULL, updated_at = ? WHERE id = ?", (time.time(), job_id)
+            )
+
+    def unfinished(self) -> List[dict]:
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE status IN ('pending', 'running') "
+                "ORDER BY priority, created_at"
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def purge(self, older_than: float):
+        """Drop finished jobs (and their results) that finished before ``older_than``."""
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs WHERE status IN ('done', 'failed') "
+                "AND finished_at < ?)", (older_than,)
+            )
+            return db.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                              (older_than,)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def save_file(self, job_id: str, filename: str, data) -> str:
+        """Write an upload (bytes or a werkzeug FileStorage) for a job; returns its path."""
+        directory = os.path.join(self.files_dir, job_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{len(os.listdir(directory))}_{os.path.basename(filename or 'upload')}")
+        if isinstance(data, bytes):
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            data.save(path)
+        return path
+
+
+class Job:
+    """Handle passed to a job handler.
+
+    ``done`` and ``results`` hold the progress recorded before an interruption,
+    so a resumed handler can skip work it has already committed.
+    """
+
+    def __init__(self, store: JobStore, record: dict):
+        self._store = store
+        self.id = record["id"]
+        self.kind = record["kind"]
+        self.user_id = record["user_id"]
+        self.payload = record["payload"]
+        self.done = record["done"]
+        self.total = record["total"]
+        self.attempts = record["attempts"]
+        self.results = store.results(self.id)
+
+    def progress(self, done: Optional[int] = None, total: Optional[int] = None, results: Iterable = ()):
+        results = list(results)
+        self._store.progress(self.id, done=done, total=total, results=results)
+        self.results += results
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+
+
+class JobQueue:
+    """Runs registered job handlers on a bounded pool of background workers.
+
+    ``submit`` records the job in the store and returns it right away; workers
+    take jobs in priority order (lower runs first, FIFO within a priority).
+    Handlers are called with a ``Job`` and report progress and partial results
+    through it; their return value becomes the job's ``summary``. Jobs left
+    pending or running by a process that is gone are queued again by
+    ``resume``, up to ``max_attempts`` runs each.
+    """
+
+    def __init__(self, store: JobStore, workers: int = JOBS_WORKERS, max_pending: int = JOBS_MAX_PENDING,
+                 max_attempts: int = JOBS_MAX_ATTEMPTS):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers = {}
+        self._queue = queue.PriorityQueue()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._threads = []
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+
+    def register(self, kind: str, handler: Callable[[Job], Optional[dict]]):
+        self._handlers[kind] = handler
+
+    def _enqueue(self, job: dict):
+        with self._lock:
+            self._seq += 1
+            self._queue.put((job["priority"], self._seq, job["id"]))
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(self.workers - len(self._threads)):
+                thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind: str, payload: dict, user_id=None, priority: str = "normal",
+               total: Optional[int] = None, files: Iterable = ()) -> dict:
+        """Queue a job; ``files`` are (filename, bytes or FileStorage) pairs stored
+        with the job and listed in ``payload["files"]``. Raises JobQueueFull."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        if self._queue.qsize() >= self.max_pending:
+            with self._lock:
+                self._rejected += 1
+            raise JobQueueFull("Too many jobs are waiting; try again later")
+
+        job_id = str(uuid.uuid4())
+        files = list(files)
+        if files:
+            payload = {**payload, "files": [
+                {"filename": filename, "path": self.store.save_file(job_id, filename, data)}
+                for filename, data in files
+            ]}
+        job = self.store.create(kind, payload, user_id=user_id, priority=PRIORITIES[priority],
+                                total=total, job_id=job_id)
+        with self._lock:
+            self._submitted += 1
+        self._ensure_workers()
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id: str, results_offset: int = 0) -> Optional[dict]:
+        job = self.store.get(job_id)
+        if job:
+            job["results"] = self.store.results(job_id, results_offset)
+        return job
+
+    def resume(self) -> int:
+        """Queue jobs left unfinished by earlier processes; returns how many were queued."""
+        resumed = 0
+        for job in self.store.unfinished():
+            if job["status"] == "running":
+                if job["worker"] == self.worker_id or _worker_alive(job["worker"]):
+                    continue
+                if job["attempts"] >= self.max_attempts:
+                    self.store.finish(job["id"], "failed", error="Interrupted too many times")
+                    continue
+                self.store.requeue(job["id"])
+            self._enqueue(job)
+            resumed += 1
+        if resumed:
+            self._ensure_workers()
+        return resumed
+
+    def _run(self):
+        while True:
+            _, _, job_id = self._queue.get()
+            try:
+                record = self.store.claim(job_id, self.worker_id)
+                if record is None:
+                    continue
+                handler = self._handlers.get(record["kind"])
+                if handler is None:
+                    self.store.finish(job_id, "failed", error=f"No handler for job kind {record['kind']}")
+                    continue
+                try:
+                    summary = handler(Job(self.store, record))
+                    self.store.finish(job_id, "done", summary=summary)
+                    with self._lock:
+                        self._completed += 1
+                except Exception as e:
+                    print(f"Job {job_id} ({record['kind']}) failed: {str(e)}")
+                    self.store.finish(job_id, "failed", error=str(e))
+                    with self._lock:
+                        self._failed += 1
+            except Exception as e:
+                print(f"Job worker error on {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "workers": self.workers,
+                "queued": self._queue.qsize(),
+                "max_pending": self.max_pending,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+        stats["stored"] = self.store.counts()
+        return stats
+
+
+def _worker_alive(worker: Optional[str]) -> bool:
+    """Whether the process that claimed a job is still running on this host."""
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+job_queue = JobQueue(JobStore())
+
+
+def wants_async() -> bool:
+    """Whether the client asked for a background job (``?async=1`` or ``Prefer: respond-async``)."""
+    return (request.args.get("async", "").lower() in ("1", "true", "yes")
+            or "respond-async" in request.headers.get("Prefer", ""))
+
+
+def submit_from_request(kind: str, payload: dict, user_id, total: Optional[int] = None, files: Iterable = (),
+                        **extra):
+    """Submit a job for the current request and build the 202 response (or a 400/503 error)."""
+    try:
+        job = job_queue.submit(kind, payload, user_id=user_id, priority=request.args.get("priority", "normal"),
+                               total=total, files=files)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    response = jsonify({"job_id": job["id"], "status": job["status"], "status_url": f"/api/jobs/{job['id']}", **extra})
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return response, 202
+
+
+def init_jobs(app):
+    """Drop old finished jobs and resume the ones an earlier process left behind."""
+    if app.config.get("TESTING"):
+        return
+    try:
+        job_queue.store.purge(time.time() - JOBS_RETENTION_HOURS * 3600)
+        resumed = job_queue.resume()
+        if resumed:
+            print(f"Resumed {resumed} background jobs")
+    except Exception as e:
+        print(f"Could not resume background jobs: {str(e)}")
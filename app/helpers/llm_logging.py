@@ -0,0 +1,44 @@
+import os
+import tempfile
+from app.helpers.batch_writer import BatchWriter
+
+# Process-wide sink for LLM_EVALUATIONS: rows are queued on the request thread
+# and written in multi-row INSERTs by a background worker
+llm_log_writer = BatchWriter(
+    "LLM_EVALUATIONS",
+    [
+        "RUN_ID",
+        "TIMESTAMP",
+        "USER_INPUT",
+        "MODEL_RESPONSE",
+        "LATENCY_SECONDS",
+        "TOKEN_COUNT",
+        "MODEL_NAME",
+        "STATUS",
+        "ERROR_MESSAGE",
+        "TIME_TO_FIRST_TOKEN_SECONDS"
+    ],
+    batch_size=int(os.getenv("LLM_LOG_BATCH_SIZE", 50)),
+    flush_interval=int(os.getenv("LLM_LOG_FLUSH_MS", 2000)) / 1000,
+    max_queue=int(os.getenv("LLM_LOG_MAX_QUEUE", 10000)),
+    fallback_path=os.getenv("LLM_LOG_FALLBACK_PATH") or os.path.join(tempfile.gettempdir(), "prosterio_llm_evaluations.jsonl")
+)
+
+# Fungsi untuk menyimpan data ke Snowflake
+def log_to_snowflake(run_id, timestamp, user_input, response, latency, token_count, model, status="success", error=None, time_to_first_token=None):
+    """Queue one LLM_EVALUATIONS row; returns False if the sink dropped it."""
+    queued = llm_log_writer.add((
+        run_id,
+        timestamp,
+        user_input,
+        response,
+        latency,
+        token_count,
+        model,
+        status,
+        error,
+        time_to_first_token
+    ))
+    if not queued:
+        print(f"LLM log queue full, dropped run_id: {run_id}")
+    return queued
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from typing import Iterable, Optional
+
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_MB", 512)) * 1024 * 1024
+# CV bytes are copied out of Snowflake in slices of this size
+PDF_READ_CHUNK_BYTES = int(os.getenv("PDF_READ_CHUNK_KB", 4096)) * 1024
+# Served by the app's static route at /static/pdfs/
+PDF_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "public", "pdfs")
+# The directory also holds tracked and legacy uploads; only files named like this are the cache's
+_CACHE_FILENAME = re.compile(r"^[0-9a-f]{64}\.pdf$")
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class PdfCache:
+    """Content-addressed disk cache of CV PDFs, bounded by total bytes.
+
+    Files are stored as ``<sha256>.pdf`` so identical CVs share one file and a
+    cached copy never goes stale. Reads bump the file's mtime; when the cache
+    grows past ``max_bytes`` the least recently used files are removed.
+    Several processes may share the directory: writes are atomic renames and
+    eviction re-scans the directory. Other files in it are neither counted
+    nor removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk, scanned lazily
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def filename(self, sha256: str) -> str:
+        return f"{sha256}.pdf"
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.directory, self.filename(sha256))
+
+    def _scan(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if _CACHE_FILENAME.match(entry.name) and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def get(self, sha256: Optional[str]) -> Optional[str]:
+        """Path of the cached file for ``sha256``, or None on a miss."""
+        if sha256 and self._touch(sha256):
+            with self._lock:
+                self._hits += 1
+            return self.path(sha256)
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, data: bytes, sha256: Optional[str] = None) -> str:
+        """Store ``data`` and return its sha256."""
+        sha256 = sha256 or sha256_hex(data)
+        if self._touch(sha256):
+            return sha256
+        return self.put_chunks([data])
+
+    def put_chunks(self, chunks: Iterable[bytes]) -> str:
+        """Store a file streamed as ``chunks`` without holding it in memory; returns its sha256."""
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            if self._touch(sha256):
+                os.remove(tmp)
+                return sha256
+            os.replace(tmp, self.path(sha256))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._evict(keep=self.path(sha256))
+        return sha256
+
+    def _touch(self, sha256):
+        try:
+            os.utime(self.path(sha256))
+            return True
+        except OSError:
+            return False
+
+    def _evict(self, keep):
+        # Called with self._lock held
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                self._evictions += 1
+            except OSError:
+                pass
+        self._size = total
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+pdf_cache = PdfCache(PDF_CACHE_DIR)
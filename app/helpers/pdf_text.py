@@ -0,0 +1,56 @@
+import io
+import os
+import re
+import unicodedata
+from typing import Iterator, List
+
+# Pages after this are ignored; CVs rarely need more and the rest only adds prompt tokens
+CV_MAX_PAGES = int(os.getenv("CV_MAX_PAGES", 10))
+
+# Bullet glyphs, including the private-use Symbol-font bullets Word exports (\uf0a7, \uf0b7)
+_BULLETS = re.compile(r"^[\u2022\u2023\u2043\u2219\u25aa\u25ab\u25cf\u25e6\u2218\u27a2\uf0a7\uf0b7]+\s*")
+_SPACES = re.compile(r"[^\S\n]+")
+_LINE_BREAK_HYPHEN = re.compile(r"(\w)-\n(?=\w)")
+
+
+def iter_page_text(data: bytes, max_pages: int = CV_MAX_PAGES) -> Iterator[str]:
+    """Text of each page of an in-memory PDF, parsed one page at a time."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    for index in range(min(len(reader.pages), max_pages)):
+        yield reader.pages[index].extract_text() or ""
+
+
+def normalize_text(text: str) -> str:
+    """Compact extracted text without changing its words.
+
+    Ligatures and full-width forms are folded (NFKC), soft hyphens removed,
+    words split as ``customer-\\ncentric`` rejoined (keeping the hyphen, since
+    CVs hyphenate compounds far more often than they break words), bullet
+    glyphs reduced to ``-`` and runs of whitespace and blank lines collapsed.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("\u00ad", "")
+    lines = []
+    for line in text.splitlines():
+        line = _SPACES.sub(" ", line).strip()
+        if not line:
+            continue
+        bullet = _BULLETS.match(line)
+        if bullet and bullet.end() < len(line):
+            line = "- " + line[bullet.end():]
+        lines.append(line)
+    return _LINE_BREAK_HYPHEN.sub(r"\1-", "\n".join(lines))
+
+
+def extract_pdf_pages(data: bytes, max_pages: int = CV_MAX_PAGES) -> List[str]:
+    """Normalized text of each of the first ``max_pages`` pages of a PDF held in memory."""
+    return [normalize_text(page) for page in iter_page_text(data, max_pages)]
+
+
+def extract_pdf_text(data: bytes, max_pages: int = CV_MAX_PAGES) -> str:
+    """Normalized text of the first ``max_pages`` pages of a PDF held in memory."""
+    text = "\n".join(page for page in extract_pdf_pages(data, max_pages) if page)
+    if not text:
+        raise ValueError("No text found in PDF (scanned or empty document)")
+    return text
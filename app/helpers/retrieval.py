@@ -0,0 +1,106 @@
+import os
+from typing import Dict, List
+
+from app.helpers.embeddings import EMBED_MODEL, chunk_embedding_sql
+
+# Retrieval defaults, overridable per request
+RAG_TOP_K_EMPLOYEES = int(os.getenv("RAG_TOP_K_EMPLOYEES", 5))
+RAG_SCORE_MODE = os.getenv("RAG_SCORE_MODE", "max")  # "max" or "mean_top_n"
+RAG_SCORE_TOP_N = int(os.getenv("RAG_SCORE_TOP_N", 3))
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", 3000))
+
+SCORE_MODES = ("max", "mean_top_n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for prompt budgeting."""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def retrieve_employees_sql(cursor, question: str, top_k: int, score_mode: str, top_n: int) -> List[Dict]:
+    """Score every chunk in Snowflake and return the top-k employees.
+
+    Each employee's score is the best chunk similarity (``max``) or the mean of
+    the ``top_n`` best chunks (``mean_top_n``). Employees are returned best
+    first with their chunks ordered by similarity.
+    """
+    score_column = "best_score" if score_mode == "max" else "mean_top_n_score"
+    cursor.execute(f"""
+        WITH question AS (
+            SELECT snowflake.cortex.embed_text_1024(%s, %s) AS q_embedding
+        ),
+        scored AS (
+            SELECT c.employee_id, c.chunk_text,
+                   vector_cosine_similarity({chunk_embedding_sql('c')}, question.q_embedding) AS score
+            FROM "PROSTERIO"."PUBLIC"."CONTENT_CHUNKS" c, question
+            WHERE c.employee_id IS NOT NULL
+        ),
+        ranked AS (
+            SELECT employee_id, chunk_text, score,
+                   ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY score DESC) AS rn
+            FROM scored
+        ),
+        employee_scores AS (
+            SELECT employee_id,
+                   MAX(score) AS best_score,
+                   AVG(CASE WHEN rn <= %s THEN score END) AS mean_top_n_score
+            FROM ranked
+            GROUP BY employee_id
+        ),
+        top_employees AS (
+            SELECT employee_id, {score_column} AS employee_score
+            FROM employee_scores
+            ORDER BY employee_score DESC, employee_id
+            LIMIT %s
+        )
+        SELECT t.employee_id, t.employee_score, r.chunk_text, r.score
+        FROM top_employees t
+        JOIN ranked r ON r.employee_id = t.employee_id
+        ORDER BY t.employee_score DESC, t.employee_id, r.rn
+    """, (EMBED_MODEL, question, EMBED_MODEL, EMBED_MODEL, top_n, top_k))
+
+    employees = []
+    by_id = {}
+    for employee_id, employee_score, chunk_text, chunk_score in cursor.fetchall():
+        employee = by_id.get(employee_id)
+        if employee is None:
+            employee = {"employee_id": employee_id, "score": float(employee_score), "chunks": []}
+            by_id[employee_id] = employee
+            employees.append(employee)
+        employee["chunks"].append({"chunk_text": chunk_text, "score": float(chunk_score)})
+    return employees
+
+
+def assemble_context(employees: List[Dict], token_budget: int):
+    """Build the prompt context from ranked employees within ``token_budget``.
+
+    The best chunk of every employee is taken first, in rank order, so the
+    budget is spread across candidates before adding supporting chunks.
+    Returns ``(context, tokens_used, employees_summary)``.
+    """
+    selected = {employee["employee_id"]: [] for employee in employees}
+    used = 0
+    rounds = max((len(employee["chunks"]) for employee in employees), default=0)
+    for position in range(rounds):
+        for employee in employees:
+            if position >= len(employee["chunks"]):
+                continue
+            text = employee["chunks"][position]["chunk_text"]
+            cost = estimate_tokens(text)
+            # Skip chunks that do not fit; a shorter one further down may still fit
+            if used + cost <= token_budget:
+                selected[employee["employee_id"]].append(text)
+                used += cost
+
+    parts = []
+    summary = []
+    for employee in employees:
+        texts = selected[employee["employee_id"]]
+        if texts:
+            parts.append(" ".join(texts))
+        summary.append({
+            "employee_id": employee["employee_id"],
+            "score": round(employee["score"], 6),
+            "chunks_used": len(texts),
+        })
+    return "\n".join(parts), used, summary
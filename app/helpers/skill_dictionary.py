@@ -0,0 +1,108 @@
+# Canonical skill names and the spellings CVs use for them. Matching ignores
+# case, punctuation other than + # ., version suffixes ("python3") and level
+# qualifiers ("(Advanced)"), so only genuinely different spellings are listed.
+# An alias must name exactly one skill: "tf" (TensorFlow or Terraform) or "pm"
+# are left out rather than merging employees who do not share the skill.
+# Extend or override per deployment with SKILL_DICTIONARY_PATH (JSON, same shape).
+SKILL_ALIASES = {
+    # Languages
+    "Python": ["py", "python programming", "cpython"],
+    "Java": ["java se", "java ee", "j2ee", "jakarta ee", "core java"],
+    "JavaScript": ["js", "java script", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["ts"],
+    "C": ["ansi c", "c language"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["csharp", "c sharp"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rustlang"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Scala": [],
+    "R": ["r programming", "r language", "rstudio"],
+    "MATLAB": ["matlab simulink"],
+    "Bash": ["bash scripting"],
+    "PowerShell": ["power shell"],
+    "SQL": ["structured query language", "sql queries"],
+    "PL/SQL": ["plsql", "pl sql"],
+    "HTML": ["html5", "html 5"],
+    "CSS": ["css3", "css 3"],
+    "Sass": ["scss"],
+    "Dart": [],
+    "VBA": ["excel vba", "visual basic for applications"],
+    # Frameworks and libraries
+    "React": ["react.js", "reactjs", "react js"],
+    "React Native": ["react-native"],
+    "Angular": ["angular.js", "angularjs", "angular js"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Next.js": ["nextjs"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "NestJS": ["nest.js"],
+    "Django": ["django rest framework", "drf"],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring": [],
+    "Spring Boot": ["springboot"],
+    ".NET": ["dotnet", "dot net", "asp.net", "asp.net core", ".net core"],
+    "Laravel": [],
+    "Ruby on Rails": ["rails", "ror"],
+    "Flutter": [],
+    "jQuery": ["jquery"],
+    "Bootstrap": [],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Pandas": [],
+    "NumPy": ["numpy"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "TensorFlow": ["tensor flow"],
+    "PyTorch": ["torch"],
+    "LangChain": ["lang chain"],
+    # Data and platforms
+    "PostgreSQL": ["postgres", "postgre sql", "psql"],
+    "MySQL": ["my sql"],
+    "Oracle Database": ["oracle db"],
+    "SQL Server": ["mssql", "ms sql", "microsoft sql server", "t-sql", "tsql"],
+    "MongoDB": ["mongo", "mongo db"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "Snowflake": [],
+    "Apache Spark": ["spark", "pyspark"],
+    "Apache Kafka": ["kafka"],
+    "Apache Airflow": ["airflow"],
+    "Hadoop": ["apache hadoop", "hdfs"],
+    "Power BI": ["powerbi", "microsoft power bi"],
+    "Tableau": [],
+    "Microsoft Excel": ["excel", "ms excel"],
+    "Microsoft Office": ["ms office", "office 365", "microsoft 365"],
+    "AWS": ["amazon web services", "amazon aws"],
+    "Microsoft Azure": ["azure", "ms azure"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": ["docker compose"],
+    "Kubernetes": ["k8s", "kube"],
+    "Terraform": [],
+    "Ansible": [],
+    "Jenkins": [],
+    "Git": [],
+    "GitHub": [],
+    "GitLab": [],
+    "Bitbucket": [],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Linux": ["ubuntu", "debian", "centos", "red hat", "rhel"],
+    "REST APIs": ["rest", "rest api", "restful", "restful api", "restful apis", "restful services"],
+    "GraphQL": ["graph ql"],
+    # Practices
+    "Machine Learning": ["ml"],
+    "Deep Learning": [],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": [],
+    "Data Analysis": ["data analytics"],
+    "Agile": ["agile methodologies", "agile methodology"],
+    "Scrum": ["scrum master"],
+    "Project Management": [],
+    "UI/UX Design": ["ui ux", "ux ui", "ux", "ui design", "ux design"],
+    "Figma": [],
+    "Microservices": ["micro services", "microservice architecture"],
+    "Unit Testing": ["unit tests"],
+    "Test-Driven Development": ["tdd"],
+}
@@ -0,0 +1,142 @@
+import functools
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from app.helpers.skill_dictionary import SKILL_ALIASES
+
+SKILL_DICTIONARY_PATH = os.getenv("SKILL_DICTIONARY_PATH")
+# Readers fall back to the raw skills of rows the backfill has not reached yet
+SKILLS_COLUMN = "COALESCE(skills_normalized, skills)"
+
+_PARENTHESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_PARTS = re.compile(r"\s*[/,;|]\s*")
+_NON_TOKEN = re.compile(r"[^a-z0-9+#.]+")
+_VERSION_SUFFIX = re.compile(r"^(.*?[a-z+#])\s*v?\d+(?:\.\d+)*x?$")
+_VERSION = re.compile(r"v?\d+(?:\.\d+)*x?")
+# Words that qualify a skill without changing it: "Advanced Python", "Python programming"
+_QUALIFIERS = frozenset("""
+advanced intermediate basic basics beginner expert proficient proficiency fluent native good strong
+excellent solid working knowledge of experience experienced familiarity familiar with in and the
+programming language languages framework frameworks library libraries development skills skill
+""".split())
+_TERMINAL = ""
+
+
+def _tokens(text: str) -> List[str]:
+    text = _NON_TOKEN.sub(" ", unicodedata.normalize("NFKC", text).lower())
+    return [token.rstrip(".") for token in text.split() if token.rstrip(".")]
+
+
+class SkillNormalizer:
+    """Maps free-text skills to canonical names with a precompiled token trie.
+
+    Every canonical name and alias is tokenized into the trie once. A skill
+    is tokenized the same way (case, punctuation and parenthesized levels
+    ignored, ``python3`` read as ``python``) and matched longest-first from
+    each position, so the cost is linear in its length and independent of
+    the dictionary size. A skill maps to canonical names only when the
+    matches cover all its tokens apart from qualifiers such as "advanced"
+    or "programming"; anything else is kept as written, minus the
+    parenthesized part. "Python/Django" becomes both skills, but only when
+    every part is known, so "TCP/IP" stays whole.
+    """
+
+    def __init__(self, aliases: Dict[str, Iterable[str]]):
+        self.canonical_names = sorted(aliases)
+        self._trie = {}
+        self._vocabulary = set()
+        for canonical, names in aliases.items():
+            for name in [canonical, *names]:
+                tokens = [t for t in _tokens(name) if t not in _QUALIFIERS] or _tokens(name)
+                if not tokens:
+                    continue
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                    self._vocabulary.add(token)
+                node.setdefault(_TERMINAL, canonical)
+
+    def _known(self, token: str) -> str:
+        if token in self._vocabulary:
+            return token
+        versioned = _VERSION_SUFFIX.match(token)
+        if versioned and versioned.group(1) in self._vocabulary:
+            return versioned.group(1)
+        return token
+
+    def _match(self, text: str) -> Optional[List[str]]:
+        """Canonical names covering ``text``, or None when part of it is unknown."""
+        tokens = [self._known(t) for t in _tokens(text)]
+        found, position = [], 0
+        while position < len(tokens):
+            node, end, canonical = self._trie, None, None
+            for index in range(position, len(tokens)):
+                node = node.get(tokens[index])
+                if node is None:
+                    break
+                if _TERMINAL in node:
+                    end, canonical = index + 1, node[_TERMINAL]
+            if canonical is not None:
+                found.append(canonical)
+                position = end
+            elif tokens[position] in _QUALIFIERS or _VERSION.fullmatch(tokens[position]):
+                position += 1
+            else:
+                return None
+        return found or None
+
+    def normalize(self, skill) -> List[str]:
+        """Canonical names for one skill, or the cleaned skill itself when unknown."""
+        if skill is None:
+            return []
+        text = skill if isinstance(skill, str) else str(skill)
+        cleaned = " ".join(_PARENTHESES.sub(" ", text).split()).strip(" -:") or text.strip()
+        parts = [part for part in _PARTS.split(cleaned) if part.strip()]
+        if len(parts) > 1:
+            matched = [self._match(part) for part in parts]
+            if all(matched):
+                return [name for names in matched for name in names]
+        return self._match(cleaned) or ([cleaned] if cleaned else [])
+
+    def normalize_list(self, skills) -> Optional[List[str]]:
+        """Normalized, de-duplicated (case-insensitively) skills in their original order."""
+        if skills is None:
+            return None
+        if isinstance(skills, str):
+            skills = [skills]
+        result, seen = [], set()
+        for skill in skills:
+            for name in self.normalize(skill):
+                if name.lower() not in seen:
+                    seen.add(name.lower())
+                    result.append(name)
+        return result
+
+
+def load_skill_aliases(path: Optional[str] = SKILL_DICTIONARY_PATH) -> Dict[str, List[str]]:
+    """The bundled dictionary, extended or overridden by the JSON file at ``path``."""
+    aliases = {canonical: list(names) for canonical, names in SKILL_ALIASES.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for canonical, names in json.load(f).items():
+                aliases[canonical] = list(names)
+    return aliases
+
+
+@functools.lru_cache(maxsize=None)
+def get_skill_normalizer() -> SkillNormalizer:
+    return SkillNormalizer(load_skill_aliases())
+
+
+def normalize_skills(skills) -> Optional[List[str]]:
+    """Canonical skills for an employee's ``skills`` list; None stays None."""
+    return get_skill_normalizer().normalize_list(skills)
+
+
+def canonical_skill(skill: str) -> str:
+    """The canonical name a single skill filter should match."""
+    names = get_skill_normalizer().normalize(skill)
+    return names[0] if names else skill
@@ -0,0 +1,32 @@
+import json
+from flask import Response, request, stream_with_context
+
+
+def wants_stream() -> bool:
+    """True when the client asked for Server-Sent Events.
+
+    ``?stream=1`` (or ``true``/``yes``) opts in and ``?stream=0`` opts out;
+    otherwise an ``Accept: text/event-stream`` header decides.
+    """
+    flag = request.args.get('stream', '').lower()
+    if flag in ('1', 'true', 'yes'):
+        return True
+    if flag in ('0', 'false', 'no'):
+        return False
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events) -> Response:
+    """Stream an iterable of ``sse_event`` strings, keeping the request context alive."""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # disable proxy buffering so tokens arrive as they are generated
+        }
+    )
@@ -0,0 +1,290 @@
+import json
+import os
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.helpers.embeddings import EMBED_MODEL, EMBED_DIMENSIONS
+
+# embedded_at is set when a chunk is embedded but the row only becomes visible
+# when its transaction commits, so each refresh re-reads this many seconds
+# before the watermark to catch rows that committed late
+RAG_VECTOR_INDEX_OVERLAP_SECONDS = int(os.getenv("RAG_VECTOR_INDEX_OVERLAP_SECONDS", 900))
+
+
+def to_vector(value) -> np.ndarray:
+    """Convert a VECTOR value returned by the connector into a float32 array."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _Snapshot:
+    """Immutable view of the index; searches never see a half-applied refresh."""
+    __slots__ = ("matrix", "chunk_ids", "employee_ids", "texts", "by_employee", "group_starts", "group_ids")
+
+    def __init__(self, matrix, chunk_ids, employee_ids, texts):
+        self.matrix = matrix
+        self.chunk_ids = chunk_ids
+        self.employee_ids = employee_ids
+        self.texts = texts
+        # Row order grouping chunks by employee, used for per-employee aggregation
+        self.by_employee = np.argsort(employee_ids, kind="stable")
+        grouped = employee_ids[self.by_employee]
+        self.group_starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]]) if len(grouped) else np.empty(0, dtype=np.int64)
+        self.group_ids = grouped[self.group_starts]
+
+
+class VectorIndex:
+    """In-memory index of normalized chunk embeddings for cosine top-k search.
+
+    The index is loaded once from ``Content_Chunks`` and then refreshed
+    incrementally: rows embedded since ``overlap_seconds`` before the last
+    ``embedded_at`` watermark are upserted and chunk ids that no longer exist
+    are dropped.
+    """
+
+    def __init__(self, dimensions: int = EMBED_DIMENSIONS, dtype=np.float32, model: str = EMBED_MODEL,
+                 overlap_seconds: int = RAG_VECTOR_INDEX_OVERLAP_SECONDS):
+        self.dimensions = dimensions
+        self.dtype = np.dtype(dtype)
+        self.model = model
+        self.overlap_seconds = overlap_seconds
+        self.watermark = None
+        self.loaded_at = None
+        self.refreshed_at = None
+        self._snapshot = self._empty()
+        self._lock = threading.Lock()  # serializes writers only
+
+    def _empty(self):
+        return _Snapshot(
+            np.empty((0, self.dimensions), dtype=self.dtype),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64),
+            [],
+        )
+
+    @property
+    def is_warm(self) -> bool:
+        return self.loaded_at is not None
+
+    def __len__(self):
+        return len(self._snapshot.chunk_ids)
+
+    # --- mutation ---
+
+    def _to_arrays(self, rows):
+        # Later rows win when the same chunk id appears twice
+        rows = list({int(row[0]): row for row in rows}.values())
+        vectors = np.vstack([to_vector(row[3]) for row in rows]).astype(self.dtype, copy=False)
+        if vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-d embeddings, got {vectors.shape[1]}")
+        return (
+            _normalize(vectors).astype(self.dtype, copy=False),
+            np.array([int(row[0]) for row in rows], dtype=np.int64),
+            np.array([int(row[1]) for row in rows], dtype=np.int64),
+            [row[2] for row in rows],
+        )
+
+    def _merge(self, batches, live_ids=None):
+        with self._lock:
+            current = self._snapshot
+            keep = np.ones(len(current.chunk_ids), dtype=bool)
+            if live_ids is not None:
+                keep &= np.isin(current.chunk_ids, np.fromiter(live_ids, dtype=np.int64))
+            for _, ids, _, _ in batches:
+                keep &= ~np.isin(current.chunk_ids, ids)
+            if keep.all() and not batches:
+                return
+
+            kept = np.flatnonzero(keep)
+            self._snapshot = _Snapshot(
+                np.concatenate([current.matrix[kept]] + [b[0] for b in batches]),
+                np.concatenate([current.chunk_ids[kept]] + [b[1] for b in batches]),
+                np.concatenate([current.employee_ids[kept]] + [b[2] for b in batches]),
+                [current.texts[i] for i in kept] + [text for b in batches for text in b[3]],
+            )
+
+    def apply(self, rows: Iterable[Sequence], live_ids: Optional[Iterable[int]] = None):
+        """Upsert ``(chunk_id, employee_id, chunk_text, embedding)`` rows.
+
+        When ``live_ids`` is given, chunks whose id is not in it are removed.
+        Rows without an employee are skipped, as in SQL retrieval.
+        """
+        rows = [row for row in rows if row[1] is not None]
+        self._merge([self._to_arrays(rows)] if rows else [], live_ids)
+
+    def load(self, conn, batch_size: int = 5000):
+        """Replace the index with every chunk embedded with the current model."""
+        with self._lock:
+            self._snapshot = self._empty()
+        watermark = self._fetch_into(conn, None, batch_size)
+        self.watermark = watermark
+        self.loaded_at = self.refreshed_at = time.time()
+
+    def refresh(self, conn, batch_size: int = 5000):
+        """Apply rows changed since the watermark and drop deleted chunks."""
+        if not self.is_warm:
+            return self.load(conn, batch_size)
+        watermark = self._fetch_into(conn, self.watermark, batch_size)
+        # Read live ids after the changed rows so a chunk inserted in between is
+        # picked up by the next refresh instead of being dropped
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT id FROM Content_Chunks WHERE embedding_model = %s AND employee_id IS NOT NULL", (self.model,)
+            )
+            live_ids = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        self.apply([], live_ids=live_ids)
+        if watermark is not None:
+            self.watermark = watermark
+        self.refreshed_at = time.time()
+
+    def _fetch_into(self, conn, since, batch_size):
+        sql = """
+            SELECT id, employee_id, chunk_text, embedding, embedded_at
+            FROM Content_Chunks
+            WHERE embedding IS NOT NULL AND embedding_model = %s AND employee_id IS NOT NULL
+        """
+        params = [self.model]
+        if since is not None:
+            # Re-scan an overlap window for rows committed after the last refresh
+            # with an older embedded_at; upserts are idempotent
+            sql += " AND embedded_at >= DATEADD(second, %s, %s)"
+            params.extend([-self.overlap_seconds, since])
+        watermark = None
+        batches = []
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                # Convert per batch so raw Python float lists never pile up
+                batches.append(self._to_arrays(rows))
+                for row in rows:
+                    if row[4] is not None and (watermark is None or row[4] > watermark):
+                        watermark = row[4]
+        finally:
+            cursor.close()
+        self._merge(batches)
+        return watermark
+
+    # --- search ---
+
+    def search(self, query, k: int = 10) -> List[dict]:
+        """Return the ``k`` chunks most cosine-similar to ``query``, best first."""
+        snapshot = self._snapshot
+        if k <= 0 or len(snapshot.chunk_ids) == 0:
+            return []
+        query = _normalize(to_vector(query).astype(self.dtype, copy=False))
+        scores = snapshot.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {
+                "chunk_id": int(snapshot.chunk_ids[i]),
+                "employee_id": int(snapshot.employee_ids[i]),
+                "chunk_text": snapshot.texts[i],
+                "score": float(scores[i]),
+            }
+            for i in top
+        ]
+
+    def search_employees(self, query, k: int = 5, score_mode: str = "max", top_n: int = 3) -> List[dict]:
+        """Return the ``k`` best employees with their chunks ordered by similarity.
+
+        An employee's score is its best chunk similarity (``max``) or the mean
+        of its ``top_n`` best chunks (``mean_top_n``).
+        """
+        snapshot = self._snapshot
+        if k <= 0 or len(snapshot.chunk_ids) == 0:
+            return []
+        query = _normalize(to_vector(query).astype(self.dtype, copy=False))
+        scores = (snapshot.matrix @ query).astype(np.float64)
+
+        grouped = scores[snapshot.by_employee]
+        n_groups = len(snapshot.group_starts)
+        labels = np.repeat(np.arange(n_groups), np.diff(np.r_[snapshot.group_starts, len(grouped)]))
+        # Sort each employee's chunks by score, best first, keeping groups contiguous
+        order = np.lexsort((-grouped, labels))
+        ranks = np.arange(len(order)) - snapshot.group_starts[labels]
+        if score_mode == "mean_top_n":
+            take = ranks < max(1, top_n)
+            employee_scores = (np.bincount(labels, weights=np.where(take, grouped[order], 0.0), minlength=n_groups)
+                               / np.bincount(labels, weights=take, minlength=n_groups))
+        else:
+            employee_scores = grouped[order][snapshot.group_starts]
+
+        k = min(k, n_groups)
+        top = np.argpartition(-employee_scores, k - 1)[:k]
+        top = top[np.lexsort((snapshot.group_ids[top], -employee_scores[top]))]
+
+        ends = np.r_[snapshot.group_starts[1:], len(grouped)]
+        results = []
+        for group in top:
+            rows = snapshot.by_employee[order[snapshot.group_starts[group]:ends[group]]]
+            results.append({
+                "employee_id": int(snapshot.group_ids[group]),
+                "score": float(employee_scores[group]),
+                "chunks": [
+                    {"chunk_text": snapshot.texts[i], "score": float(scores[i])}
+                    for i in rows
+                ],
+            })
+        return results
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "warm": self.is_warm,
+            "chunks": len(snapshot.chunk_ids),
+            "bytes": int(snapshot.matrix.nbytes),
+            "watermark": str(self.watermark) if self.watermark is not None else None,
+            "loaded_at": self.loaded_at,
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+vector_index = VectorIndex()
+
+
+def _refresh_loop(interval):
+    from app.db import get_connection
+
+    while True:
+        conn = None
+        try:
+            conn = get_connection()
+            vector_index.refresh(conn)
+        except Exception as e:
+            print(f"Vector index refresh failed: {str(e)}")
+        finally:
+            if conn:
+                conn.close()
+        time.sleep(interval)
+
+
+def init_vector_index(app):
+    """Load the index in the background and keep it fresh, when enabled.
+
+    Controlled by ``RAG_VECTOR_INDEX`` (off by default) and
+    ``RAG_VECTOR_INDEX_REFRESH_SECONDS``. Until the first load finishes
+    retrieval keeps using the SQL path.
+    """
+    if app.config.get("TESTING") or os.getenv("RAG_VECTOR_INDEX", "").lower() not in ("1", "true", "yes"):
+        return
+    interval = int(os.getenv("RAG_VECTOR_INDEX_REFRESH_SECONDS", 60))
+    threading.Thread(target=_refresh_loop, args=(interval,), name="vector-index-refresh", daemon=True).start()
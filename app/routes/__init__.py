@@ -8,6 +8,8 @@ from .rag import rag_bp
 from .forgot_password import forgot_password_bp
 from .analytics import analytics_bp
 from .gdrive import gdrive_bp
+from .metrics import metrics_bp
+from .jobs import jobs_bp
 
 def register_routes(app):
     app.register_blueprint(auth_bp)
@@ -20,3 +22,5 @@ def register_routes(app):
     app.register_blueprint(rag_bp)
     app.register_blueprint(analytics_bp)
     app.register_blueprint(gdrive_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(jobs_bp)
@@ -1,6 +1,7 @@
-from flask import Blueprint, jsonify
-from app.db import get_connection
+from flask import Blueprint, request, jsonify
 from flasgger import swag_from
+from datetime import datetime, timezone
+from app.helpers.analytics import AnalyticsError, DEFAULT_OPTIONS, analytics_snapshot, parse_options, run_sections
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -8,6 +9,93 @@ analytics_bp = Blueprint('analytics', __name__)
 @swag_from({
     'tags': ['Analytics'],
     'summary': 'Get various analytics data',
+    'description': 'Served from the last analytics snapshot, which is rebuilt in the background after '
+                   'employee writes; a stale snapshot is returned while it is rebuilt. When the sections '
+                   'are computed, the four queries run concurrently and a section that fails or exceeds '
+                   'ANALYTICS_QUERY_TIMEOUT_SECONDS fails the request. sections only picks what is returned '
+                   'from the snapshot (X-Cache: HIT or STALE); requests with top_n, max_nodes, '
+                   'min_edge_weight or filters other than the defaults are computed for the request '
+                   '(X-Cache: BYPASS), and filters scan Employees instead of the counters.',
+    'parameters': [
+        {
+            'name': 'sections',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Comma-separated sections to return (default: all of job_title_distribution, '
+                           'experience_level_distribution, top_skills, education_to_job_title)'
+        },
+        {
+            'name': 'top_n',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Skills returned in top_skills (default ANALYTICS_TOP_N, at most ANALYTICS_MAX_TOP_N)'
+        },
+        {
+            'name': 'min_edge_weight',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Drop education to job title links with fewer employees (default 1)'
+        },
+        {
+            'name': 'max_nodes',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Sankey nodes kept per side; the rest are merged into "Other educations" / '
+                           '"Other job titles" (default ANALYTICS_SANKEY_MAX_NODES, 0 keeps all)'
+        },
+        {
+            'name': 'job_title',
+            'in': 'query',
+            'type': 'array',
+            'items': {'type': 'string'},
+            'collectionFormat': 'multi',
+            'required': False,
+            'description': 'Only count employees with one of these job titles (case-insensitive)'
+        },
+        {
+            'name': 'skill',
+            'in': 'query',
+            'type': 'array',
+            'items': {'type': 'string'},
+            'collectionFormat': 'multi',
+            'required': False,
+            'description': 'Only count employees listing every one of these skills'
+        },
+        {
+            'name': 'created_from',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': False,
+            'description': 'Only count employees created on or after this date'
+        },
+        {
+            'name': 'created_to',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date',
+            'required': False,
+            'description': 'Only count employees created on or before this date'
+        },
+        {
+            'name': 'debug',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Add a debug block with per-section latency and row counts of the last build'
+        },
+        {
+            'name': 'refresh',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Recompute the snapshot now (same as Cache-Control: no-cache)'
+        }
+    ],
     'responses': {
         200: {
             'description': 'Analytics data retrieved successfully',
@@ -68,10 +156,40 @@ analytics_bp = Blueprint('analytics', __name__)
                                 }
                             }
                         }
+                    },
+                    'generated_at': {'type': 'string', 'format': 'date-time'},
+                    'stale': {'type': 'boolean', 'description': 'A newer snapshot is being built'},
+                    'debug': {
+                        'type': 'object',
+                        'description': 'Only with ?debug=1',
+                        'properties': {
+                            'cache': {'type': 'string', 'enum': ['HIT', 'STALE', 'MISS', 'BYPASS']},
+                            'sections': {
+                                'type': 'object',
+                                'additionalProperties': {
+                                    'type': 'object',
+                                    'properties': {
+                                        'seconds': {'type': 'number'},
+                                        'rows': {'type': 'integer'},
+                                        'error': {'type': 'string'}
+                                    }
+                                }
+                            },
+                            'total_seconds': {'type': 'number'}
+                        }
                     }
                 }
             }
         },
+        400: {
+            'description': 'Invalid query parameter',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'error': {'type': 'string'}
+                }
+            }
+        },
         500: {
             'description': 'Internal server error',
             'schema': {
@@ -84,93 +202,40 @@ analytics_bp = Blueprint('analytics', __name__)
     }
 })
 def get_analytics():
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        # Job Title Distribution
-        cursor.execute("""
-            SELECT JOB_TITLE, COUNT(*) AS total_employees 
-            FROM Employees 
-            GROUP BY JOB_TITLE 
-            ORDER BY total_employees DESC
-        """)
-        job_title_distribution = [{'job_title': row[0], 'total_employees': row[1]} for row in cursor.fetchall()]
-
-        # Experience Level Distribution
-        cursor.execute("""
-            SELECT 
-              CASE 
-                WHEN JOB_TITLE ILIKE '%Junior%' THEN 'Junior' 
-                WHEN JOB_TITLE ILIKE '%Senior%' THEN 'Senior' 
-                WHEN JOB_TITLE ILIKE '%Manager%' THEN 'Managerial' 
-                ELSE 'Mid-Level' 
-              END AS experience_level, 
-              COUNT(*) AS total_employees 
-            FROM Employees 
-            GROUP BY experience_level
-        """)
-        experience_level_distribution = [{'experience_level': row[0], 'total_employees': row[1]} for row in cursor.fetchall()]
-
-        # Top Skills
-        cursor.execute("""
-            SELECT 
-              TRIM(f.value::STRING, '"') AS skill, 
-              COUNT(*) AS total_employees 
-            FROM Employees, 
-            LATERAL FLATTEN(input => PARSE_JSON(SKILLS)) f 
-            GROUP BY skill 
-            ORDER BY total_employees DESC 
-            LIMIT 10
-        """)
-        top_skills = [{'skill': row[0], 'total_employees': row[1]} for row in cursor.fetchall()]
-
-        # Education to Job Title Distribution
-        cursor.execute("""
-            SELECT edu.value:title::STRING AS education, JOB_TITLE, COUNT(*) AS count 
-            FROM Employees, LATERAL FLATTEN(input => PARSE_JSON(EDUCATIONS)) edu 
-            GROUP BY education, JOB_TITLE
-        """)
-        education_job_data = cursor.fetchall()
-
-        # Transform education_job_data into nodes and links
-        nodes = []
-        links = []
-        node_indices = {}
-
-        for education, job_title, count in education_job_data:
-            # Add education node if not exists
-            if education not in node_indices:
-                node_indices[education] = len(nodes)
-                nodes.append({"name": education})
-
-            # Add job title node if not exists
-            if job_title not in node_indices:
-                node_indices[job_title] = len(nodes)
-                nodes.append({"name": job_title})
-
-            # Add link
-            links.append({
-                "source": node_indices[education],
-                "target": node_indices[job_title],
-                "value": count
-            })
-
-        education_to_job_title = {
-            "nodes": nodes,
-            "links": links
-        }
-
-        return jsonify({
-            'job_title_distribution': job_title_distribution,
-            'experience_level_distribution': experience_level_distribution,
-            'top_skills': top_skills,
-            'education_to_job_title': education_to_job_title
-        }), 200
+        sections, options = parse_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes') \
+        or 'no-cache' in request.headers.get('Cache-Control', '').lower()
 
+    try:
+        if options == DEFAULT_OPTIONS:
+            # Served from the snapshot; employee writes rebuild it in the background
+            snapshot, status = analytics_snapshot.get(refresh=refresh)
+        else:
+            # Custom top-N, pruning or filters are computed for this request only
+            data, debug = run_sections(sections, options=options)
+            snapshot = {'sections': data, 'debug': debug, 'generated_at': datetime.now(timezone.utc)}
+            status = 'BYPASS'
+    except AnalyticsError as e:
+        body = {'error': str(e)}
+        if _wants_debug():
+            body['debug'] = e.debug
+        return jsonify(body), 500
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
+
+    body = {name: snapshot['sections'][name] for name in sections}
+    body['generated_at'] = snapshot['generated_at'].isoformat()
+    body['stale'] = status == 'STALE'
+    if _wants_debug():
+        body['debug'] = dict(snapshot['debug'] or {}, cache=status)
+    response = jsonify(body)
+    response.headers['X-Cache'] = status
+    return response, 200
+
+def _wants_debug():
+    return request.args.get('debug', '').lower() in ('1', 'true', 'yes')
 
 # Don't forget to register this blueprint in your main app file
\ No newline at end of file
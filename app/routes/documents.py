@@ -1,13 +1,16 @@
-from flask import Blueprint, request, jsonify
-import google.generativeai as genai
-from langchain_community.document_loaders import PyPDFLoader
+from flask import Blueprint, request, jsonify, g
 from dotenv import load_dotenv
-import os, tempfile, re, json
+import os, re, json, time
 from app.db import get_connection
+from app.helpers.cv_extraction import GEMINI_MAX_CONCURRENCY, extract_files, parse_settings
+from app.helpers.extraction_cache import extraction_cache, extraction_key
+from app.helpers.jobs import job_queue, wants_async, submit_from_request
 
 load_dotenv()
 documents_bp = Blueprint("documents", __name__, url_prefix="/api/documents")
 
+GEMINI_MODEL = "gemini-1.5-pro-latest"
+
 # Prompt template to guide Gemini
 PROMPT_TEMPLATE = """
 **Only extract data that appears in the CV text; do not invent or infer missing details. Use null for any missing single-value field and an empty list [] for any missing array. Strictly adhere to the date formats and data types described above.**
@@ -77,6 +80,22 @@ def extract_with_gemini():
         required: true
         description: Upload one or more PDF files
         collectionFormat: multi
+      - name: async
+        in: query
+        type: boolean
+        required: false
+        description: Extract in a background job and return 202 with a job_id to poll at /api/jobs/<id>
+      - name: priority
+        in: query
+        type: string
+        enum: [high, normal, low]
+        required: false
+        description: Job priority when async (default normal)
+      - name: refresh
+        in: query
+        type: boolean
+        required: false
+        description: Ignore cached extractions of these PDFs and call Gemini again (also Cache-Control no-cache)
     responses:
       200:
         description: A list of extracted CV data or errors per file
@@ -165,12 +184,52 @@ def extract_with_gemini():
                           type: string
                   error:
                     type: string
+                  contacts:
+                    type: object
+                    description: Emails, phones and URLs found by regex in the PDF text
+                    properties:
+                      emails:
+                        type: array
+                        items:
+                          type: string
+                      phones:
+                        type: array
+                        items:
+                          type: string
+                      urls:
+                        type: array
+                        items:
+                          type: string
+                  preprocess:
+                    type: object
+                    description: Prompt text reduction for this file
+                    properties:
+                      tokens_before:
+                        type: integer
+                      tokens_after:
+                        type: integer
+                      lines_removed:
+                        type: integer
+                      truncated:
+                        type: boolean
+                  cached:
+                    type: boolean
+                    description: Answered from the extraction cache (same PDF, prompt and model)
+                  timings:
+                    type: object
+                    description: Seconds per stage (parse_wait, parse, rate_limit_wait, llm, total)
+                    additionalProperties:
+                      type: number
             email_status:
               type: object
               additionalProperties:
                 type: boolean
+      202:
+        description: Extraction queued as a background job; per-file results appear in the job's results
       400:
         description: No PDF files uploaded
+      503:
+        description: Too many background jobs are waiting
       500:
         description: Internal server error or Gemini failure
     """
@@ -182,67 +241,119 @@ def extract_with_gemini():
     if not gemini_api_key:
         return jsonify({"error": "GEMINI_APIKEY not found"}), 500
 
+    # Many files take longer than a proxy allows; extract them in a job instead
+    if wants_async():
+        return submit_from_request(
+            "documents.extract", {"refresh": _wants_refresh()}, g.user_id, total=len(uploaded_files),
+            files=[(uploaded_file.filename, uploaded_file) for uploaded_file in uploaded_files]
+        )
+
     try:
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel("gemini-1.5-pro-latest")
-
-        results = []
-        emails = []
-        
-        for uploaded_file in uploaded_files:
-            try:
-                with tempfile.NamedTemporaryFile(delete=True, suffix=".pdf") as tmp:
-                    uploaded_file.save(tmp.name)
-
-                    loader = PyPDFLoader(tmp.name)
-                    pages = loader.load_and_split()
-                    text = " ".join([page.page_content.strip() for page in pages])
-
-                prompt = PROMPT_TEMPLATE.format(text=text)
-                response = model.generate_content(prompt)
-                response_text = response.text.strip()
-
-                # Safely extract JSON block from LLM response
-                match = re.search(r"\{.*\}", response_text, re.DOTALL)
-                if not match:
-                    raise ValueError("No valid JSON found in Gemini response.")
-                
-   
-                json_data = json.loads(match.group(0))
-                if json_data.get("email"):
-                  email = json_data.get('email')
-                  emails.append(email)
-                  
-                results.append({
-                    "filename": uploaded_file.filename,
-                    "data": json_data
-                })
-
-            except Exception as file_error:
-                results.append({
-                    "filename": uploaded_file.filename,
-                    "error": str(file_error)
-                })
-                
-        email_status = {}
-        if emails:
-            conn = get_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    SELECT email 
-                    FROM Employees 
-                    WHERE email IN ({})
-                """.format(','.join(['%s'] * len(emails))), emails)
-                email_status = {email: False for email in emails}
-                for row in cursor.fetchall():
-                    email_status[row[0]] = True
-            finally:
-                cursor.close()
-                conn.close()
-
-        return jsonify({"data": results, "email_status": email_status}), 200
+        # Files are parsed and sent to Gemini concurrently; results keep upload order
+        files = [(uploaded_file.filename, uploaded_file.read()) for uploaded_file in uploaded_files]
+        results = _extract(files, gemini_api_key, refresh=_wants_refresh())
+
+        return jsonify({"data": results, "email_status": _email_status(results)}), 200
 
     except Exception as e:
       
         return jsonify({"error": str(e)}), 500
+
+
+def _gemini_model(api_key):
+    # Heavy SDKs are imported on first use to keep app startup light
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+
+def _generator(model):
+    """CV text -> structured data via Gemini."""
+    def generate(text):
+        prompt = PROMPT_TEMPLATE.format(text=text)
+        response = model.generate_content(prompt)
+        response_text = response.text.strip()
+
+        # Safely extract JSON block from LLM response
+        match = re.search(r"\{.*\}", response_text, re.DOTALL)
+        if not match:
+            raise ValueError("No valid JSON found in Gemini response.")
+        return json.loads(match.group(0))
+    return generate
+
+
+def _wants_refresh():
+    return (request.values.get("refresh", "").lower() in ("1", "true", "yes")
+            or "no-cache" in request.headers.get("Cache-Control", ""))
+
+
+def _extract(files, gemini_api_key, refresh=False):
+    """extract_files() behind the extraction cache: re-uploaded CVs are answered
+    from the cache without parsing or calling Gemini, and only successful
+    extractions are stored."""
+    settings = parse_settings()
+    keys = [extraction_key(data, PROMPT_TEMPLATE, GEMINI_MODEL, settings) for _, data in files]
+    results = [None] * len(files)
+    misses = []
+    for index, ((filename, _), key) in enumerate(zip(files, keys)):
+        started = time.time()
+        cached = extraction_cache.get(key, refresh=refresh)
+        if cached is None:
+            misses.append(index)
+        else:
+            results[index] = {"filename": filename, "data": cached, "cached": True,
+                              "timings": {"total": round(time.time() - started, 3)}}
+
+    if misses:
+        generate = _generator(_gemini_model(gemini_api_key))
+        for index, result in zip(misses, extract_files([files[i] for i in misses], generate)):
+            # The regex match is exact; use it when Gemini left the email out
+            emails = result.get("contacts", {}).get("emails")
+            if "data" in result and emails and not result["data"].get("email"):
+                result["data"]["email"] = emails[0]
+            if "data" in result:
+                extraction_cache.put(keys[index], result["data"])
+            results[index] = {**result, "cached": False}
+    return results
+
+
+def _email_status(results):
+    """Map each extracted email to whether an employee with it already exists."""
+    emails = [r["data"]["email"] for r in results if r.get("data") and r["data"].get("email")]
+    email_status = {}
+    if emails:
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT email 
+                FROM Employees 
+                WHERE email IN ({})
+            """.format(','.join(['%s'] * len(emails))), emails)
+            email_status = {email: False for email in emails}
+            for row in cursor.fetchall():
+                email_status[row[0]] = True
+        finally:
+            cursor.close()
+            conn.close()
+    return email_status
+
+
+def _extract_job(job):
+    """Extract the uploaded CVs a few at a time, recording each group as partial results."""
+    gemini_api_key = os.getenv("GEMINI_APIKEY")
+    if not gemini_api_key:
+        raise RuntimeError("GEMINI_APIKEY not found")
+    files = job.payload["files"]
+    for start in range(job.done, len(files), GEMINI_MAX_CONCURRENCY):
+        group = []
+        for f in files[start:start + GEMINI_MAX_CONCURRENCY]:
+            with open(f["path"], "rb") as pdf:
+                group.append((f["filename"], pdf.read()))
+        job.progress(done=start + len(group),
+                     results=_extract(group, gemini_api_key, refresh=job.payload.get("refresh", False)))
+    return {"email_status": _email_status(job.results)}
+
+
+job_queue.register("documents.extract", _extract_job)
@@ -1,5 +1,5 @@
 # --- Imports ---
-from flask import Blueprint, request, jsonify, g, send_file, current_app
+from flask import Blueprint, Response, request, jsonify, g, send_file, current_app, stream_with_context
 # Replace psycopg2 with snowflake connector
 import snowflake.connector
 # Keep json for handling VARIANT data before insertion
@@ -7,21 +7,295 @@ import json
 # Replace get_connection with your Snowflake connection logic
 from app.db import get_connection
 from flasgger import swag_from
+from werkzeug.exceptions import HTTPException
 import json # Import json for handling VARIANT types
 import os
-from datetime import datetime
+import time
+from collections import Counter
 
-from app.helpers.chunking import compile_to_chunk
+from app.helpers.chunking import compile_to_chunk, sync_chunks
+from app.helpers.embeddings import embed_chunks
+from app.helpers.answer_cache import bump_corpus_version
+from app.helpers.analytics import analytics_snapshot
+from app.helpers.analytics_counters import apply_deltas, employee_counts_where, lock_employee_counts
+from app.helpers.skills import normalize_skills
+from app.helpers.pdf_cache import pdf_cache, PDF_READ_CHUNK_BYTES
+from app.helpers.jobs import job_queue, wants_async, submit_from_request
+from app.helpers.bulk_loader import FORMATS as BULK_LOAD_FORMATS, SnowflakeTarget, SqliteStandInTarget, bulk_load
+from app.helpers.employee_query import (
+    EMPLOYEES_PAGE_LIMIT, EMPLOYEES_PAGE_MAX_LIMIT, SELECTABLE_FIELDS,
+    parse_fields, parse_cursor, make_cursor, build_page_query, to_employee, count_employees
+)
+
+# Content-hash CV URLs never change, so browsers may keep them for a year
+CV_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Employees per MERGE statement for bulk imports
+EMPLOYEE_IMPORT_BATCH_SIZE = int(os.getenv("EMPLOYEE_IMPORT_BATCH_SIZE", 200))
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl', 'application/ndjson')
 
 employees_bp = Blueprint('employees', __name__, url_prefix='/api/employees')
 
+EMPLOYEE_MERGE_SQL = """
+    MERGE INTO employees AS target
+    USING (
+        SELECT
+            v.value[0]::INTEGER as id,
+            v.value[1]::VARCHAR as full_name,
+            v.value[2]::VARCHAR as email,
+            v.value[3]::VARCHAR as job_title,
+            v.value[4]::INTEGER as promotion_years,
+            v.value[5]::VARCHAR as profile,
+            PARSE_JSON(v.value[6]::VARCHAR) as skills,
+            PARSE_JSON(v.value[7]::VARCHAR) as professional_experiences,
+            PARSE_JSON(v.value[8]::VARCHAR) as educations,
+            PARSE_JSON(v.value[9]::VARCHAR) as publications,
+            PARSE_JSON(v.value[10]::VARCHAR) as distinctions,
+            PARSE_JSON(v.value[11]::VARCHAR) as certifications,
+            v.value[12]::VARCHAR as file_url,
+            v.value[13]::INTEGER as user_id,
+            PARSE_JSON(v.value[14]::VARCHAR) as skills_normalized
+        FROM TABLE(FLATTEN(input => PARSE_JSON(%s))) v
+    ) AS source
+    ON target.id = source.id OR target.email = source.email
+    WHEN MATCHED AND source.id IS NOT NULL THEN
+        UPDATE SET
+            target.full_name = source.full_name,
+            target.email = source.email,
+            target.job_title = source.job_title,
+            target.promotion_years = source.promotion_years,
+            target.profile = source.profile,
+            target.skills = source.skills,
+            target.skills_normalized = source.skills_normalized,
+            target.professional_experiences = source.professional_experiences,
+            target.educations = source.educations,
+            target.publications = source.publications,
+            target.distinctions = source.distinctions,
+            target.certifications = source.certifications,
+            target.file_url = source.file_url,
+            target.user_id = source.user_id
+    WHEN NOT MATCHED THEN
+        INSERT (
+            full_name, email, job_title, promotion_years, profile,
+            skills, professional_experiences, educations,
+            publications, distinctions, certifications,
+            file_url, user_id, skills_normalized
+        ) VALUES (
+            source.full_name, source.email, source.job_title, source.promotion_years, source.profile,
+            source.skills, source.professional_experiences, source.educations,
+            source.publications, source.distinctions, source.certifications,
+            source.file_url, source.user_id, source.skills_normalized
+        )
+"""
+
+def _prepare_employee(employee, user_id):
+    """Validate one employee payload; returns (employee, error)."""
+    if not isinstance(employee, dict):
+        return None, "Employee must be a JSON object"
+    if not employee.get('email') or not employee.get('full_name') or not employee.get('job_title'):
+        return None, "Missing required fields (email, full_name, job_title)"
+    # Snowflake connector handles Python dicts/lists for VARIANT insertion
+    processed_employee = employee.copy()
+    for field in ['skills', 'professional_experiences', 'educations', 'publications', 'distinctions', 'certifications']:
+        processed_employee[field] = employee.get(field)
+    processed_employee['skills_normalized'] = normalize_skills(processed_employee['skills'])
+    processed_employee['user_id'] = user_id
+    return processed_employee, None
+
+def _merge_employee_batch(cursor, batch, user_id):
+    """MERGE one batch of validated employees and sync their content chunks.
+
+    Returns one result per employee, in input order, and the chunk counts
+    from sync_chunks(). Analytics counters are updated in the same
+    transaction, which the caller opens with BEGIN and commits.
+    """
+    # Order must match the order in the USING clause's VALUES alias
+    merge_data = [
+        (
+            emp.get('id'), emp['full_name'], emp['email'], emp['job_title'],
+            emp.get('promotion_years'), emp.get('profile'), emp.get('skills'),
+            emp.get('professional_experiences'), emp.get('educations'), emp.get('publications'),
+            emp.get('distinctions'), emp.get('certifications'), emp.get('file_url'), emp['user_id'],
+            emp.get('skills_normalized')
+        ) for emp in batch
+    ]
+    # Analytics counters move by the difference the MERGE makes to the employees it touches
+    emails = list({emp['email'] for emp in batch})
+    ids = [emp['id'] for emp in batch if emp.get('id')]
+    touched = f"email IN ({', '.join(['%s'] * len(emails))})"
+    if ids:
+        touched += f" OR id IN ({', '.join(['%s'] * len(ids))})"
+    counts_before = lock_employee_counts(cursor, touched, emails + ids)
+    cursor.execute(EMPLOYEE_MERGE_SQL, (json.dumps(merge_data, default=str),))
+    apply_deltas(cursor, counts_before, employee_counts_where(cursor, touched, emails + ids))
+
+    # Map emails to ids once so each employee is resolved in O(1)
+    cursor.execute(
+        f"SELECT id, email FROM employees WHERE email IN ({', '.join(['%s'] * len(emails))})",
+        emails
+    )
+    ids_by_email = {email: employee_id for employee_id, email in cursor.fetchall()}
+
+    results = []
+    chunks_by_employee = {}
+    for emp in batch:
+        employee_id = ids_by_email.get(emp['email'])
+        if not employee_id:
+            print(f"No employee ID found for email: {emp['email']}")
+            results.append({"email": emp['email'], "status": "failed", "error": "Employee not found after MERGE"})
+            continue
+        action = "updated" if emp.get('id') else "inserted"
+        results.append({"email": emp['email'], "employee_id": employee_id, "status": f"success ({action})"})
+        chunks_by_employee[employee_id] = compile_to_chunk(data={**emp, 'file_data': None}, employee_id=employee_id, user_id=user_id)
+
+    # Only chunks whose text changed lose their embedding
+    chunk_stats = sync_chunks(cursor, chunks_by_employee)
+    print(f"Content chunks for affected employees: {chunk_stats}")
+    if chunk_stats["inserted"] or chunk_stats["updated"]:
+        # Store chunk embeddings so retrieval only has to embed the question
+        embedded_count = embed_chunks(cursor, list(chunks_by_employee))
+        print(f"Embedded {embedded_count} content chunks for affected employees.")
+
+    return results, chunk_stats
+
+def _db_error_message(e):
+    if isinstance(e, snowflake.connector.Error):
+        return f"Snowflake DB Error: {e.errno} ({e.sqlstate}): {e.msg}"
+    return f"An unexpected error occurred: {str(e)}"
+
+def _import_ndjson(lines, batch_size, user_id):
+    """Parse NDJSON employees incrementally, MERGE and commit them in batches,
+    and yield one NDJSON result line per batch followed by a summary."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    totals = {"rows": 0, "succeeded": 0, "failed": 0, "batches": 0}
+
+    def flush(batch, failures, batch_number):
+        started = time.time()
+        results = list(failures)
+        chunk_stats = None
+        if batch:
+            try:
+                cursor.execute("BEGIN")
+                merged, chunk_stats = _merge_employee_batch(cursor, batch, user_id)
+                results += merged
+                bump_corpus_version(cursor)
+                conn.commit()
+                analytics_snapshot.mark_stale()
+            except Exception as e:
+                print(e)
+                conn.rollback()
+                chunk_stats = None
+                error_msg = _db_error_message(e)
+                results += [{"email": emp['email'], "status": "failed", "error": error_msg} for emp in batch]
+        succeeded = sum(1 for r in results if r["status"].startswith("success"))
+        totals["rows"] += len(results)
+        totals["succeeded"] += succeeded
+        totals["failed"] += len(results) - succeeded
+        totals["batches"] += 1
+        return json.dumps({
+            "batch": batch_number,
+            "rows": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "seconds": round(time.time() - started, 3),
+            "chunks": chunk_stats,
+            "results": results
+        }) + "\n"
+
+    try:
+        batch, failures = [], []
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                employee, error = _prepare_employee(json.loads(line), user_id)
+            except ValueError as e:
+                employee, error = None, f"Invalid JSON: {str(e)}"
+            if error:
+                failures.append({"line": line_number, "status": "failed", "error": error})
+            else:
+                batch.append(employee)
+            if len(batch) + len(failures) >= batch_size:
+                yield flush(batch, failures, totals["batches"] + 1)
+                batch, failures = [], []
+        if batch or failures:
+            yield flush(batch, failures, totals["batches"] + 1)
+        yield json.dumps({"done": True, **totals}) + "\n"
+    finally:
+        cursor.close()
+        conn.close()
+
+def _import_job(job):
+    """Background version of the JSON import: commits per batch so an
+    interrupted job resumes after the last committed batch."""
+    employees = job.payload["employees"]
+    conn = get_connection()
+    cursor = conn.cursor()
+    chunk_totals = {}
+    try:
+        for start in range(job.done, len(employees), EMPLOYEE_IMPORT_BATCH_SIZE):
+            batch = employees[start:start + EMPLOYEE_IMPORT_BATCH_SIZE]
+            try:
+                cursor.execute("BEGIN")
+                results, chunk_stats = _merge_employee_batch(cursor, batch, job.user_id)
+                bump_corpus_version(cursor)
+                conn.commit()
+                analytics_snapshot.mark_stale()
+                for key, count in chunk_stats.items():
+                    chunk_totals[key] = chunk_totals.get(key, 0) + count
+            except Exception as e:
+                print(e)
+                conn.rollback()
+                error_msg = _db_error_message(e)
+                results = [{"email": emp['email'], "status": "failed", "error": error_msg} for emp in batch]
+            job.progress(done=start + len(batch), results=results)
+    finally:
+        cursor.close()
+        conn.close()
+    succeeded = sum(1 for r in job.results if r["status"].startswith("success"))
+    return {"rows": len(job.results), "succeeded": succeeded, "failed": len(job.results) - succeeded,
+            "chunks": chunk_totals}
+
+job_queue.register("employees.import", _import_job)
+
 # --- Swag definition remains the same ---
 @employees_bp.route('', methods=['POST'])
 @swag_from({
     'tags': ['Employees'],
     'summary': 'Bulk create or update employees',
+    'description': 'Send {"employees": [...]} as JSON to import in one transaction, or send one employee object per line '
+                   'with Content-Type: application/x-ndjson to import incrementally. NDJSON imports commit every batch_size '
+                   'rows and stream back one JSON line per batch ({batch, rows, succeeded, failed, seconds, results}) '
+                   'followed by {done: true, rows, succeeded, failed, batches}. With ?async=1 (or Prefer: respond-async) '
+                   'a JSON import runs as a background job committed per batch; the 202 response carries job_id and '
+                   'status_url (GET /api/jobs/<id>) plus the rows rejected by validation.',
+    'consumes': ['application/json', 'application/x-ndjson'],
     'security': [{'Bearer': []}],
     'parameters': [
+        {
+            'name': 'async',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Run a JSON import as a background job and return 202'
+        },
+        {
+            'name': 'priority',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['high', 'normal', 'low'],
+            'required': False,
+            'description': 'Job priority when async (default normal)'
+        },
+        {
+            'name': 'batch_size',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': f'Employees per MERGE for NDJSON imports (default {EMPLOYEE_IMPORT_BATCH_SIZE})'
+        },
         {
             'name': 'body',
             'in': 'body',
@@ -122,42 +396,47 @@ employees_bp = Blueprint('employees', __name__, url_prefix='/api/employees')
                 }
             }
         },
-        400: {'description': 'Invalid input or database error'}
+        202: {'description': 'Import queued as a background job'},
+        400: {'description': 'Invalid input or database error'},
+        503: {'description': 'Too many background jobs are waiting'}
     }
 })
 def create_employee():
+    # Streaming import: one employee per line, merged and reported per batch
+    if request.mimetype in NDJSON_MIMETYPES:
+        batch_size = request.args.get('batch_size', EMPLOYEE_IMPORT_BATCH_SIZE, type=int)
+        if not batch_size or batch_size < 1:
+            return jsonify({"error": "batch_size must be a positive integer"}), 400
+        return Response(
+            stream_with_context(_import_ndjson(request.stream, batch_size, g.user_id)),
+            mimetype='application/x-ndjson'
+        )
+
     try: 
         data = request.get_json()
         if not data.get('employees'):
             return jsonify({"error": "No employees data provided"}), 400
 
-        employees_to_process = []
+        valid_employees = []
         validation_results = {} # Track validation failures
 
         for i, employee in enumerate(data['employees']):
-            email_key = employee.get('email', f'unknown_{i}')
-            if not employee.get('email') or not employee.get('full_name') or not employee.get('job_title'):
-                validation_results[email_key] = {"status": "failed", "error": "Missing required fields (email, full_name, job_title)"}
+            processed_employee, error = _prepare_employee(employee, g.user_id)
+            if error:
+                email_key = employee.get('email', f'unknown_{i}') if isinstance(employee, dict) else f'unknown_{i}'
+                validation_results[email_key] = {"status": "failed", "error": error}
                 continue
-
-            # Prepare data: Convert Python dicts/lists directly for VARIANT
-            # Snowflake connector handles Python dicts/lists for VARIANT insertion
-            processed_employee = employee.copy() # Avoid modifying original dict directly
-            for field in ['skills', 'professional_experiences', 'educations', 'publications', 'distinctions', 'certifications']:
-                # Keep as Python objects if not None, otherwise set to None
-                processed_employee[field] = employee.get(field)
-
-            # Add user_id from global context
-            processed_employee['user_id'] = g.user_id
-            employees_to_process.append(processed_employee)
-
-        # Filter out employees that failed validation
-        valid_employees = [emp for emp in employees_to_process if emp.get('email') not in validation_results]
+            valid_employees.append(processed_employee)
 
         if not valid_employees:
             final_results = [{"email": k, **v} for k, v in validation_results.items()]
             return jsonify({"message": "No valid employees to process", "results": final_results}), 400
 
+        # Large imports outlive proxy timeouts; run them as a job and poll /api/jobs/<id>
+        if wants_async():
+            rejected = [{"email": k, **v} for k, v in validation_results.items()]
+            return submit_from_request("employees.import", {"employees": valid_employees}, g.user_id,
+                                       total=len(valid_employees), rejected=rejected)
 
         conn = None # Initialize conn
         cursor = None # Initialize cursor
@@ -167,160 +446,32 @@ def create_employee():
             conn = get_connection() # Use your Snowflake connection function
             cursor = conn.cursor()
 
-            # --- Use MERGE for Bulk Insert/Update ---
-            # Prepare data for MERGE source (list of tuples)
-            # Order must match the order in the USING clause's VALUES alias
-            merge_data = [
-                (
-                    emp.get('id'), # Use None for inserts 0
-                    emp['full_name'], # 1
-                    emp['email'], # 2
-                    emp['job_title'],# 3
-                    emp.get('promotion_years'),# 4
-                    emp.get('profile'), # 5
-                    emp.get('skills'), # Pass Python list directly 6
-                    emp.get('professional_experiences'), # Pass Python list of dicts directly 7
-                    emp.get('educations'), #8
-                    emp.get('publications'), #9
-                    emp.get('distinctions'),#10
-                    emp.get('certifications'), #11
-                    emp.get('file_url'), #12
-                    emp['user_id'] #13
-                ) for emp in valid_employees
-            ]
-#  
-            # Construct the MERGE statement
-            # Note: Snowflake uses %s placeholders
-            merge_sql = """
-                MERGE INTO employees AS target
-                USING (
-                    SELECT
-                        v.value[0]::INTEGER as id,
-                        v.value[1]::VARCHAR as full_name,
-                        v.value[2]::VARCHAR as email,
-                        v.value[3]::VARCHAR as job_title,
-                        v.value[4]::INTEGER as promotion_years,
-                        v.value[5]::VARCHAR as profile,
-                        PARSE_JSON(v.value[6]::VARCHAR) as skills,
-                        PARSE_JSON(v.value[7]::VARCHAR) as professional_experiences,
-                        PARSE_JSON(v.value[8]::VARCHAR) as educations,
-                        PARSE_JSON(v.value[9]::VARCHAR) as publications,
-                        PARSE_JSON(v.value[10]::VARCHAR) as distinctions,
-                        PARSE_JSON(v.value[11]::VARCHAR) as certifications,
-                        v.value[12]::VARCHAR as file_url,
-                        v.value[13]::INTEGER as user_id
-                    FROM TABLE(FLATTEN(input => PARSE_JSON(%s))) v
-                ) AS source
-                ON target.id = source.id OR target.email = source.email
-                WHEN MATCHED AND source.id IS NOT NULL THEN
-                    UPDATE SET
-                        target.full_name = source.full_name,
-                        target.email = source.email,
-                        target.job_title = source.job_title,
-                        target.promotion_years = source.promotion_years,
-                        target.profile = source.profile,
-                        target.skills = source.skills,
-                        target.professional_experiences = source.professional_experiences,
-                        target.educations = source.educations,
-                        target.publications = source.publications,
-                        target.distinctions = source.distinctions,
-                        target.certifications = source.certifications,
-                        target.file_url = source.file_url,
-                        target.user_id = source.user_id
-                WHEN NOT MATCHED THEN
-                    INSERT (
-                        full_name, email, job_title, promotion_years, profile,
-                        skills, professional_experiences, educations,
-                        publications, distinctions, certifications,
-                        file_url, user_id
-                    ) VALUES (
-                        source.full_name, source.email, source.job_title, source.promotion_years, source.profile,
-                        source.skills, source.professional_experiences, source.educations,
-                        source.publications, source.distinctions, source.certifications,
-                        source.file_url, source.user_id
-                    )
-            """
-
-            # Convert the list of tuples/dicts to a JSON string to pass to the query
-            # Note: Snowflake connector might have more direct ways for VARIANT, check its docs
-            json_data_string = json.dumps(merge_data, default=str) # Use default=str for potential date/binary types
-
-            # Execute the MERGE statement
-            cursor.execute(merge_sql, (json_data_string,))
-            
-            # Fetch the affected rows
-            fetch_affected_rows_sql = """
-                SELECT id, email
-                FROM employees
-                WHERE email IN (
-                    {}
-                );
-            """.format(','.join(["'" + emp['email'] + "'" for emp in valid_employees]))
-            cursor.execute(fetch_affected_rows_sql)
-            merge_results = cursor.fetchall()
-            
-            # Process the results
-            affected_employee_ids = []
-            for employee_id, email in merge_results:
-                action = "inserted" if email not in results_map else "updated"
-                status = f"success ({action})"
-                results_map[email] = {"employee_id": employee_id, "status": status}
-                affected_employee_ids.append(str(employee_id))
-                
-            # Bulk delete content chunks for affected employees
-            if affected_employee_ids:
-                delete_content_chunks_sql = """
-                    DELETE FROM Content_Chunks
-                    WHERE employee_id IN ({})
-                """.format(','.join(affected_employee_ids))
-                cursor.execute(delete_content_chunks_sql)
-                deleted_count = cursor.rowcount
-                print(f"Deleted {deleted_count} content chunks for affected employees.")
-            
-            
-                
-            # Bulk insert content chunks for affected employees
-            list_of_content_chunks = []
-            for emp in valid_employees:
-                emp = dict(emp)
-                emp['file_data'] = None
-                email = emp['email']
-                employee_id = next((id for id, e in merge_results if e == email), None)
-                if not employee_id:
-                    print(f"No employee ID found for email: {email}")
-                    continue
-                content_chunks = compile_to_chunk(data=emp, employee_id=employee_id, user_id=g.user_id)
-                list_of_content_chunks.extend([
-                    (chunk['employee_id'], chunk['user_id'], chunk['type'], chunk['chunk_text'])
-                    for chunk in content_chunks
-                ])
-
-            if list_of_content_chunks:
-                insert_content_chunks_sql = """
-                    INSERT INTO Content_Chunks (
-                        employee_id, user_id, type, chunk_text
-                    ) VALUES (
-                        %s, %s, %s, %s
-                    )
-                """
-                cursor.executemany(insert_content_chunks_sql, list_of_content_chunks)
-                inserted_count = cursor.rowcount
-                print(f"Inserted {inserted_count} content chunks for affected employees.")
+            # MERGE in batches inside one transaction so the statement size stays bounded
+            final_results = []
+            chunk_totals = {}
+            cursor.execute("BEGIN")
+            for start in range(0, len(valid_employees), EMPLOYEE_IMPORT_BATCH_SIZE):
+                batch = valid_employees[start:start + EMPLOYEE_IMPORT_BATCH_SIZE]
+                merged, chunk_stats = _merge_employee_batch(cursor, batch, g.user_id)
+                final_results.extend(merged)
+                for key, count in chunk_stats.items():
+                    chunk_totals[key] = chunk_totals.get(key, 0) + count
 
             # Commit the transaction
+            bump_corpus_version(cursor)
             conn.commit()
-            final_results = [{"email": emp['email'], **results_map[emp['email']]} for emp in valid_employees if emp['email'] in results_map]
+            analytics_snapshot.mark_stale()
             return jsonify({
                 "message": "Bulk employee operation completed using MERGE",
+                "chunks": chunk_totals,
                 "results": final_results
             }), 201
 
-        except snowflake.connector.Error as e:
+        except Exception as e:
             print(e)
-            # Specific Snowflake error handling
             if conn:
                 conn.rollback()
-            error_msg = f"Snowflake DB Error: {e.errno} ({e.sqlstate}): {e.msg}"
+            error_msg = _db_error_message(e)
             # Mark all *valid* employees as failed if the MERGE fails
             for emp in valid_employees:
                 email_key = emp['email']
@@ -329,19 +480,6 @@ def create_employee():
             final_results = [{"email": k, **v} for k, v in results_map.items()]
             return jsonify({"error": error_msg, "results": final_results}), 400
 
-        except Exception as e:
-            print(e)
-            # General error handling
-            if conn:
-                conn.rollback()
-            error_msg = f"An unexpected error occurred: {str(e)}"
-            for emp in valid_employees:
-                email_key = emp['email']
-                if email_key not in results_map:
-                    results_map[email_key] = {"status": "failed", "error": error_msg}
-            final_results = [{"email": k, **v} for k, v in results_map.items()]
-            return jsonify({"error": error_msg, "results": final_results}), 400
-
         finally:
             if cursor:
                 cursor.close()
@@ -351,52 +489,169 @@ def create_employee():
         print(e)
         return jsonify({"error": str(e)}), 400
 
+def _ndjson_employees(lines):
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None  # reported as skipped
+
+@employees_bp.route('/bulk-load', methods=['POST'])
+@swag_from({
+    'tags': ['Employees'],
+    'summary': 'Bulk load employees through a Snowflake stage',
+    'description': 'For migrations and HR syncs. Rows are written to compressed files, PUT to a temporary stage, '
+                   'copied into temporary tables and merged into Employees/Content_Chunks in set-based statements. '
+                   'Existing employees are matched by email (or id) and updated. Send {"employees": [...]} as JSON '
+                   'or one employee per line as application/x-ndjson. dry_run loads into an in-memory SQLite stand-in.',
+    'consumes': ['application/json', 'application/x-ndjson'],
+    'security': [{'Bearer': []}],
+    'parameters': [
+        {'name': 'dry_run', 'in': 'query', 'type': 'boolean', 'required': False},
+        {'name': 'format', 'in': 'query', 'type': 'string', 'enum': list(BULK_LOAD_FORMATS), 'required': False,
+         'description': 'Load file format (default csv)'},
+        {'name': 'embed', 'in': 'query', 'type': 'boolean', 'required': False,
+         'description': 'Embed the new chunks before committing (default true)'},
+        {'name': 'body', 'in': 'body', 'required': True, 'schema': {'type': 'object'}}
+    ],
+    'responses': {
+        200: {
+            'description': 'Load report',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'target': {'type': 'string'},
+                    'employee_rows': {'type': 'integer'},
+                    'chunk_rows': {'type': 'integer'},
+                    'employees_inserted': {'type': 'integer'},
+                    'employees_updated': {'type': 'integer'},
+                    'employees_rejected': {'type': 'integer', 'description': 'Rows whose id and email belong to different employees'},
+                    'chunks_deleted': {'type': 'integer'},
+                    'chunks_inserted': {'type': 'integer'},
+                    'chunks_embedded': {'type': 'integer'},
+                    'skipped': {'type': 'array', 'items': {'type': 'object'}},
+                    'timings': {'type': 'object'}
+                }
+            }
+        },
+        400: {'description': 'Invalid input or database error'}
+    }
+})
+def bulk_load_employees():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in BULK_LOAD_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(BULK_LOAD_FORMATS)}"}), 400
+    dry_run = request.args.get('dry_run', '0').lower() in ('1', 'true', 'yes')
+    embed = request.args.get('embed', '1').lower() in ('1', 'true', 'yes')
+
+    if request.mimetype in NDJSON_MIMETYPES:
+        employees = _ndjson_employees(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not data or not data.get('employees'):
+            return jsonify({"error": "No employees data provided"}), 400
+        employees = data['employees']
+
+    try:
+        if dry_run:
+            return jsonify(bulk_load(employees, g.user_id, SqliteStandInTarget(), fmt=fmt))
+        conn = get_connection()
+        try:
+            report = bulk_load(employees, g.user_id, SnowflakeTarget(conn, embed=embed), fmt=fmt)
+        finally:
+            conn.close()
+        analytics_snapshot.mark_stale()
+        return jsonify(report)
+    except Exception as e:
+        print(e)
+        return jsonify({"error": _db_error_message(e)}), 400
+
 @employees_bp.route('', methods=['GET'])
 @swag_from({
     'tags': ['Employees'],
-    'summary': 'Get all employees',
+    'summary': 'Get employees',
+    'description': 'Without limit or after, returns every matching employee as a list. '
+                   'With either, returns one keyset page ordered by (full_name, id) plus next_cursor and total.',
     'security': [{'Bearer': []}],
+    'parameters': [
+        {'name': 'limit', 'in': 'query', 'type': 'integer', 'required': False,
+         'description': f'Page size (default {EMPLOYEES_PAGE_LIMIT}, max {EMPLOYEES_PAGE_MAX_LIMIT})'},
+        {'name': 'after', 'in': 'query', 'type': 'string', 'required': False,
+         'description': 'Cursor "<full_name>,<id>" from next_cursor of the previous page'},
+        {'name': 'fields', 'in': 'query', 'type': 'string', 'required': False,
+         'description': 'Comma-separated columns, e.g. "job_title,skills". id and full_name are always returned. '
+                        f'Allowed: {", ".join(SELECTABLE_FIELDS)}'},
+        {'name': 'job_title', 'in': 'query', 'type': 'string', 'required': False,
+         'description': 'Case-insensitive exact job title'},
+        {'name': 'skill', 'in': 'query', 'type': 'string', 'required': False,
+         'description': 'Employees with this skill after normalization, e.g. "python3" matches "Python (Advanced)"'},
+        {'name': 'user_id', 'in': 'query', 'type': 'integer', 'required': False,
+         'description': 'Only employees owned by this user'}
+    ],
     'responses': {
         200: {
-            'description': 'List of employees',
+            'description': 'List of employees, or a page when limit/after is given',
             'schema': {
-                'type': 'array',
-                'items': {
-                    'type': 'object',
-                    'properties': {
-                        'id': {'type': 'integer'},
-                        'full_name': {'type': 'string'},
-                        'job_title': {'type': 'string'},
-                        'email': {'type': 'string'},
-                        'file_url': {'type': 'string'},
-                    }
+                'type': 'object',
+                'properties': {
+                    'employees': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'id': {'type': 'integer'},
+                                'full_name': {'type': 'string'},
+                                'job_title': {'type': 'string'},
+                                'email': {'type': 'string'},
+                                'file_url': {'type': 'string'},
+                            }
+                        }
+                    },
+                    'next_cursor': {'type': 'string', 'description': 'Pass as after to get the next page; null on the last page'},
+                    'total': {'type': 'integer', 'description': 'Employees matching the filters (cached briefly)'}
                 }
             }
         },
+        400: {'description': 'Invalid query parameter'},
         401: {'description': 'Unauthorized'},
         500: {'description': 'Internal server error'}
     }
 })
 def get_employees():
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        after = parse_cursor(request.args.get('after'))
+        job_title = request.args.get('job_title') or None
+        skill = request.args.get('skill') or None
+        user_id = request.args.get('user_id', type=int)
+        if 'user_id' in request.args and user_id is None:
+            raise ValueError("user_id must be an integer")
+        paginate = 'limit' in request.args or after is not None
+        limit = request.args.get('limit', EMPLOYEES_PAGE_LIMIT, type=int) if paginate else None
+        if paginate and (limit is None or not 1 <= limit <= EMPLOYEES_PAGE_MAX_LIMIT):
+            raise ValueError(f"limit must be between 1 and {EMPLOYEES_PAGE_MAX_LIMIT}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT id, full_name, job_title, email, file_url
-            FROM employees ORDER BY full_name ASC
-        """)
-        rows = cursor.fetchall()
-        employees = [
-            {
-                "id": row[0],
-                "full_name": row[1],
-                "job_title": row[2],
-                "email": row[3],
-                "file_url": row[4]
-            }
-            for row in rows
-        ]
-        return jsonify(employees)
+        sql, params = build_page_query(fields, job_title, user_id, after, limit, skill)
+        cursor.execute(sql, params)
+        employees = [to_employee(fields, row) for row in cursor.fetchall()]
+        if not paginate:
+            return jsonify(employees)
+
+        next_cursor = None
+        if len(employees) > limit:
+            employees = employees[:limit]
+            next_cursor = make_cursor(employees[-1])
+        return jsonify({
+            "employees": employees,
+            "next_cursor": next_cursor,
+            "total": count_employees(cursor, job_title, user_id, skill)
+        })
     finally:
         cursor.close()
         conn.close()
@@ -418,15 +673,22 @@ def resign_employee(employee_id):
     conn = get_connection()
     cursor = conn.cursor()
     try:
+        cursor.execute("BEGIN")
+        counts_before = lock_employee_counts(cursor, "id = %s", (employee_id,))
         cursor.execute("DELETE FROM content_chunks WHERE employee_id = %s", (employee_id,))
         cursor.execute(f"DELETE FROM employees WHERE id = {employee_id}")
         res = cursor.fetchall()
         if cursor.rowcount == 0:
+            conn.rollback()
             return jsonify({'error': 'Employee not found'}), 404
+        apply_deltas(cursor, counts_before, Counter())
+        bump_corpus_version(cursor)
         conn.commit()
+        analytics_snapshot.mark_stale()
         return jsonify({'message': 'Employee resigned and content chunks removed'}), 200
     except Exception as e:
         print(e)
+        conn.rollback()
         return jsonify({'error': str(e)}), 500
     finally:
         cursor.close()
@@ -509,6 +771,7 @@ def resign_employee(employee_id):
                     },
                     'certifications': {'type': 'array', 'items': {'type': 'string'}},
                     'file_url': {'type': 'string'},
+                    'cv_url': {'type': 'string', 'description': 'Content-hash URL of GET /api/employees/<id>/cv, cacheable indefinitely'},
                 }
             }
         },
@@ -520,37 +783,25 @@ def get_employee_by_id(employee_id):
     try:
         conn = get_connection()
         cur = conn.cursor()
-        # Query to get employee by ID and user_id
-        cur.execute(f"SELECT id, full_name, email, job_title, promotion_years, profile, skills, professional_experiences, educations, publications, distinctions, certifications, file_url, file_data FROM EMPLOYEES WHERE ID = {employee_id}")
+        # Query metadata first; the CV bytes are only read on a cache miss
+        cur.execute(
+            "SELECT id, full_name, email, job_title, promotion_years, profile, skills, professional_experiences, educations, publications, distinctions, certifications, file_url, "
+            "file_sha256, file_size, file_data IS NOT NULL AS has_file FROM EMPLOYEES WHERE ID = %s",
+            (employee_id,)
+        )
         employees = cur.fetchall()
         if not employees:
             return jsonify({"error": "Employee not found"}), 404
         employee = employees[0]
-        # Create response without file_data first
-     
+
         file_url = employee[12]
-        # If file_data exists, save it to public folder and update URL
-        if employee[13] is not None:
+        cv_url = None
+        # Serve the CV from the content-addressed cache, filling it on a miss
+        if employee[15]:
             try:
-                # Convert to bytes if it's a bytearray
-                file_bytes = bytes(employee[13]) if isinstance(employee[13], bytearray) else employee[13]
-                
-                # Create public folder if it doesn't exist
-                public_folder = os.path.join(current_app.root_path, 'public', 'pdfs')
-                os.makedirs(public_folder, exist_ok=True)
-                
-                # Generate unique filename
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"employee_{employee_id}_{timestamp}.pdf"
-                filepath = os.path.join(public_folder, filename)
-                
-                # Save the file
-                with open(filepath, 'wb') as f:
-                    f.write(file_bytes)
-                
-                # Update the file_url in the database
-                file_url = f"{request.scheme}://{request.host}/static/pdfs/{filename}"
-                
+                file_sha256 = _cache_cv(conn, cur, employee_id, employee[13], employee[14])
+                file_url = f"{request.scheme}://{request.host}/static/pdfs/{pdf_cache.filename(file_sha256)}"
+                cv_url = f"/api/employees/{employee_id}/cv?v={file_sha256}"
             except Exception as e:
                 print(f"Error handling file data: {str(e)}")
                 return jsonify({"error": "Error processing file data"}), 500
@@ -568,7 +819,8 @@ def get_employee_by_id(employee_id):
             "publications": json.loads(employee[9]),
             "distinctions": json.loads(employee[10]),
             "certifications": json.loads(employee[11]),
-            "file_url": file_url
+            "file_url": file_url,
+            "cv_url": cv_url
         }
         return jsonify(result)
     except Exception as e:
@@ -579,6 +831,101 @@ def get_employee_by_id(employee_id):
         cur.close()
         conn.close()
 
+def _cv_chunks(cur, employee_id, file_size):
+    """Read file_data in PDF_READ_CHUNK_BYTES slices so a worker never holds a whole CV."""
+    if file_size is None:
+        cur.execute("SELECT LENGTH(file_data) FROM EMPLOYEES WHERE ID = %s", (employee_id,))
+        file_size = cur.fetchone()[0] or 0
+    for offset in range(0, file_size, PDF_READ_CHUNK_BYTES):
+        cur.execute(
+            "SELECT SUBSTR(file_data, %s, %s) FROM EMPLOYEES WHERE ID = %s",
+            (offset + 1, PDF_READ_CHUNK_BYTES, employee_id)
+        )
+        chunk = cur.fetchone()[0]
+        yield bytes(chunk) if isinstance(chunk, bytearray) else chunk
+
+def _cache_cv(conn, cur, employee_id, file_sha256, file_size):
+    """Make sure the employee's CV is in pdf_cache and return its sha256."""
+    if pdf_cache.get(file_sha256):
+        return file_sha256
+    cached_sha256 = pdf_cache.put_chunks(_cv_chunks(cur, employee_id, file_size))
+    if cached_sha256 != file_sha256:
+        # Rows written outside the API have no hash yet
+        cur.execute(
+            "UPDATE EMPLOYEES SET file_sha256 = %s, file_size = %s WHERE ID = %s",
+            (cached_sha256, os.path.getsize(pdf_cache.path(cached_sha256)), employee_id)
+        )
+        conn.commit()
+    return cached_sha256
+
+@employees_bp.route('/<int:employee_id>/cv', methods=['GET'])
+@swag_from({
+    'tags': ['Employees'],
+    'summary': 'Download employee CV',
+    'description': 'Streams the CV PDF. Supports Range requests (206) and If-None-Match (304). '
+                   'When v matches the current content hash the response may be cached indefinitely.',
+    'security': [{'Bearer': []}],
+    'produces': ['application/pdf'],
+    'parameters': [
+        {'name': 'employee_id', 'in': 'path', 'required': True, 'type': 'integer'},
+        {'name': 'v', 'in': 'query', 'required': False, 'type': 'string',
+         'description': 'Content hash from cv_url; makes the response immutable'},
+        {'name': 'Range', 'in': 'header', 'required': False, 'type': 'string'},
+        {'name': 'If-None-Match', 'in': 'header', 'required': False, 'type': 'string'}
+    ],
+    'responses': {
+        200: {'description': 'PDF file'},
+        206: {'description': 'Requested byte range'},
+        304: {'description': 'Not modified'},
+        404: {'description': 'Employee or CV not found'},
+        416: {'description': 'Range not satisfiable'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_employee_cv(employee_id):
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT file_sha256, file_size, file_data IS NOT NULL AS has_file FROM EMPLOYEES WHERE ID = %s",
+            (employee_id,)
+        )
+        row = cur.fetchone()
+        if not row:
+            return jsonify({"error": "Employee not found"}), 404
+        if not row[2]:
+            return jsonify({"error": "Employee has no CV"}), 404
+
+        file_sha256 = row[0]
+        if file_sha256 and file_sha256 in request.if_none_match:
+            # Revalidation needs neither the file nor the cache
+            response = current_app.response_class(status=304)
+            response.set_etag(file_sha256)
+        else:
+            file_sha256 = _cache_cv(conn, cur, employee_id, file_sha256, row[1])
+            response = send_file(
+                pdf_cache.path(file_sha256),
+                mimetype='application/pdf',
+                download_name=f"employee_{employee_id}_cv.pdf",
+                conditional=True,
+                etag=file_sha256
+            )
+
+        if request.args.get('v') == file_sha256:
+            response.headers['Cache-Control'] = f'private, max-age={CV_IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    except HTTPException:
+        # e.g. 416 for an unsatisfiable Range
+        raise
+    except Exception as e:
+        print(f"Error streaming CV: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+    finally:
+        cur.close()
+        conn.close()
+
 @employees_bp.route('/<int:employee_id>', methods=['PUT'])
 @swag_from({
     'tags': ['Employees'],
@@ -766,6 +1113,8 @@ def update_employee_by_id(employee_id):
             
             
             # Execute update
+            cur.execute("BEGIN")
+            counts_before = lock_employee_counts(cur, "id = %s", (employee_id,))
             cur.execute("""
                 UPDATE Employees SET
                     full_name = %s,
@@ -774,6 +1123,7 @@ def update_employee_by_id(employee_id):
                     promotion_years = %s,
                     profile = %s,
                     skills = %s,
+                    skills_normalized = %s,
                     professional_experiences = %s,
                     educations = %s,
                     publications = %s,
@@ -782,37 +1132,22 @@ def update_employee_by_id(employee_id):
                     user_id = %s,
                     updated_at = CURRENT_TIMESTAMP()
                 WHERE ID = %s
-            """, (data['full_name'], data['email'], data['job_title'], data['promotion_years'], data['profile'], json.dumps(data['skills']), json.dumps(data['professional_experiences']), json.dumps(data['educations']), json.dumps(data['publications']), json.dumps(data['distinctions']), json.dumps(data['certifications']), g.user_id, employee_id))
+            """, (data['full_name'], data['email'], data['job_title'], data['promotion_years'], data['profile'], json.dumps(data['skills']), json.dumps(normalize_skills(data['skills'])), json.dumps(data['professional_experiences']), json.dumps(data['educations']), json.dumps(data['publications']), json.dumps(data['distinctions']), json.dumps(data['certifications']), g.user_id, employee_id))
             res = cur.fetchall()
-            # Update content chunks with proper escaping
-            cur.execute(f"DELETE FROM Content_Chunks WHERE employee_id = {employee_id}")
-            
-            # Create new content chunks
+            apply_deltas(cur, counts_before, employee_counts_where(cur, "id = %s", (employee_id,)))
+            # Rewrite only the chunks whose text changed so unchanged ones keep their embeddings
             content_chunks = compile_to_chunk(data=data, employee_id=employee_id, user_id=g.user_id)
+            chunk_stats = sync_chunks(cur, {employee_id: content_chunks})
+            if chunk_stats["inserted"] or chunk_stats["updated"]:
+                embed_chunks(cur, [employee_id])
             
-            # Insert new chunks with proper escaping
-            chunk_values = []
-            for chunk in content_chunks:
-                chunk_text = chunk['chunk_text'].replace("'", "''")
-                chunk_type = chunk['type'].replace("'", "''")
-                chunk_values.append(f"""(
-                    {chunk['employee_id']}, 
-                    {g.user_id}, 
-                    '{chunk_type}', 
-                    '{chunk_text}'
-                )""")
-            
-            if chunk_values:
-                chunks_insert_query = f"""
-                    INSERT INTO Content_Chunks (employee_id, user_id, type, chunk_text)
-                    VALUES {', '.join(chunk_values)}
-                """
-                cur.execute(chunks_insert_query)
-            
+            bump_corpus_version(cur)
             conn.commit()
+            analytics_snapshot.mark_stale()
             return jsonify({
                 "message": "Employee updated successfully",
-                "employee_id": employee_id
+                "employee_id": employee_id,
+                "chunks": chunk_stats
             }), 200
             
         except json.JSONDecodeError as e:
@@ -1,13 +1,11 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
 import io
 import os
 # --- Imports ---
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 # Replace get_connection with your Snowflake connection logic
 from flasgger import swag_from
 from dotenv import load_dotenv
+from app.helpers.jobs import job_queue, wants_async, submit_from_request
 
 load_dotenv()
 
@@ -17,6 +15,10 @@ SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
 def get_google_drive_service():
     """Get Google Drive service instance."""
+    # The discovery client is slow to import, so load it on first upload
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
     # Load credentials from service account info
     credentials_info = {
         "type": "service_account",
@@ -59,6 +61,13 @@ def get_google_drive_service():
             'type': 'string',
             'required': True,
             'description': 'Name of the file'
+        },
+        {
+            'name': 'async',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Upload in a background job and return 202 with a job_id to poll at /api/jobs/<id>'
         }
     ],
     'responses': {
@@ -72,6 +81,9 @@ def get_google_drive_service():
                 }
             }
         },
+        202: {
+            'description': 'Upload queued as a background job; the job summary holds file_id and web_view_link'
+        },
         400: {
             'description': 'Bad request',
             'schema': {
@@ -116,6 +128,10 @@ def upload_file():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
             
+        if wants_async():
+            return submit_from_request("gdrive.upload", {"file_name": file_name}, g.user_id, total=1,
+                                       files=[(file.filename, file)])
+
         # Read file data
         file_data = file.read()
         
@@ -140,6 +156,8 @@ def upload_to_drive(file_data, file_name, mime_type='application/pdf'):
         dict: Contains file_id and web_view_link
     """
     try:
+        from googleapiclient.http import MediaIoBaseUpload
+
         drive_service = get_google_drive_service()
         
         # Create file metadata
@@ -177,4 +195,13 @@ def upload_to_drive(file_data, file_name, mime_type='application/pdf'):
         print(f"Error uploading to Google Drive: {str(e)}")
         raise
     
-    # 
\ No newline at end of file
+    #
+
+def _upload_job(job):
+    path = job.payload["files"][0]["path"]
+    with open(path, "rb") as f:
+        result = upload_to_drive(f.read(), job.payload["file_name"])
+    job.progress(done=1, results=[result])
+    return result
+
+job_queue.register("gdrive.upload", _upload_job)
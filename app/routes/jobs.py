@@ -0,0 +1,67 @@
+from flask import Blueprint, request, jsonify, g
+from flasgger import swag_from
+from app.helpers.jobs import job_queue
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@swag_from({
+    'tags': ['Jobs'],
+    'summary': 'Get the status, progress and partial results of a background job',
+    'description': 'Jobs are started by sending ?async=1 to POST /api/employees, /api/documents or /api/gdrive. '
+                   'Results are appended as the job progresses; pass results_offset to fetch only new ones.',
+    'security': [{'Bearer': []}],
+    'parameters': [
+        {'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True},
+        {
+            'name': 'results_offset',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Skip this many results (default 0)'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Job status',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'string'},
+                    'kind': {'type': 'string'},
+                    'status': {'type': 'string', 'enum': ['pending', 'running', 'done', 'failed']},
+                    'priority': {'type': 'integer'},
+                    'done': {'type': 'integer'},
+                    'total': {'type': 'integer'},
+                    'results': {'type': 'array', 'items': {'type': 'object'}},
+                    'results_offset': {'type': 'integer'},
+                    'summary': {'type': 'object'},
+                    'error': {'type': 'string'},
+                    'attempts': {'type': 'integer'},
+                    'created_at': {'type': 'number'},
+                    'started_at': {'type': 'number'},
+                    'finished_at': {'type': 'number'},
+                    'updated_at': {'type': 'number'}
+                }
+            }
+        },
+        400: {'description': 'Invalid results_offset'},
+        401: {'description': 'Unauthorized'},
+        404: {'description': 'Job not found'}
+    }
+})
+def get_job(job_id):
+    results_offset = request.args.get('results_offset', 0, type=int)
+    if results_offset is None or results_offset < 0:
+        return jsonify({"error": "results_offset must be a non-negative integer"}), 400
+
+    job = job_queue.get(job_id, results_offset=results_offset)
+    # Jobs are only visible to the user who submitted them
+    if not job or (job['user_id'] != g.user_id and g.get('user_role') != 'SUPERUSER'):
+        return jsonify({"error": "Job not found"}), 404
+
+    job.pop('payload', None)
+    job.pop('worker', None)
+    job.pop('user_id', None)
+    job['results_offset'] = results_offset
+    return jsonify(job), 200
@@ -0,0 +1,161 @@
+from flask import Blueprint, jsonify
+from flasgger import swag_from
+from app.db import pool
+from app.helpers.vector_index import vector_index
+from app.helpers.llm_logging import llm_log_writer
+from app.helpers.pdf_cache import pdf_cache
+from app.helpers.extraction_cache import extraction_cache
+from app.helpers.jobs import job_queue
+from app.helpers.analytics import analytics_snapshot
+from app.routes.rag import evaluation_queue, evaluation_writer, answer_cache
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+@metrics_bp.route('', methods=['GET'])
+@swag_from({
+    'tags': ['Metrics'],
+    'summary': 'Get runtime metrics used for capacity sizing',
+    'security': [{'Bearer': []}],
+    'responses': {
+        200: {
+            'description': 'Runtime metrics',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'db_pool': {
+                        'type': 'object',
+                        'properties': {
+                            'min_size': {'type': 'integer'},
+                            'max_size': {'type': 'integer'},
+                            'in_use': {'type': 'integer'},
+                            'idle': {'type': 'integer'},
+                            'opening': {'type': 'integer'},
+                            'total_created': {'type': 'integer'},
+                            'total_closed': {'type': 'integer'},
+                            'total_acquired': {'type': 'integer'},
+                            'timeouts': {'type': 'integer'},
+                            'health_check_failures': {'type': 'integer'},
+                            'waits': {'type': 'integer'},
+                            'total_wait_seconds': {'type': 'number'},
+                            'avg_wait_seconds': {'type': 'number'},
+                            'max_wait_seconds': {'type': 'number'}
+                        }
+                    },
+                    'vector_index': {
+                        'type': 'object',
+                        'properties': {
+                            'warm': {'type': 'boolean'},
+                            'chunks': {'type': 'integer'},
+                            'bytes': {'type': 'integer'},
+                            'watermark': {'type': 'string'},
+                            'loaded_at': {'type': 'number'},
+                            'refreshed_at': {'type': 'number'}
+                        }
+                    },
+                    'rag_evaluations': {
+                        'type': 'object',
+                        'properties': {
+                            'queue': {'type': 'object'},
+                            'writer': {'type': 'object'}
+                        }
+                    },
+                    'rag_answer_cache': {
+                        'type': 'object',
+                        'properties': {
+                            'entries': {'type': 'integer'},
+                            'max_entries': {'type': 'integer'},
+                            'corpus_version': {'type': 'integer'},
+                            'exact_hits': {'type': 'integer'},
+                            'semantic_hits': {'type': 'integer'},
+                            'misses': {'type': 'integer'},
+                            'bypasses': {'type': 'integer'},
+                            'hit_rate': {'type': 'number'}
+                        }
+                    },
+                    'cv_pdf_cache': {
+                        'type': 'object',
+                        'properties': {
+                            'bytes': {'type': 'integer'},
+                            'max_bytes': {'type': 'integer'},
+                            'hits': {'type': 'integer'},
+                            'misses': {'type': 'integer'},
+                            'evictions': {'type': 'integer'},
+                            'hit_rate': {'type': 'number'}
+                        }
+                    },
+                    'cv_extraction_cache': {
+                        'type': 'object',
+                        'properties': {
+                            'entries': {'type': 'integer'},
+                            'bytes': {'type': 'integer'},
+                            'max_bytes': {'type': 'integer'},
+                            'hits': {'type': 'integer'},
+                            'misses': {'type': 'integer'},
+                            'refreshes': {'type': 'integer'},
+                            'stores': {'type': 'integer'},
+                            'evictions': {'type': 'integer'},
+                            'hit_rate': {'type': 'number'}
+                        }
+                    },
+                    'analytics_snapshot': {
+                        'type': 'object',
+                        'properties': {
+                            'generated_at': {'type': 'string'},
+                            'stale': {'type': 'boolean'},
+                            'refreshing': {'type': 'boolean'},
+                            'hits': {'type': 'integer'},
+                            'stale_hits': {'type': 'integer'},
+                            'misses': {'type': 'integer'},
+                            'rebuilds': {'type': 'integer'},
+                            'reloads': {'type': 'integer'},
+                            'failures': {'type': 'integer'},
+                            'hit_rate': {'type': 'number'}
+                        }
+                    },
+                    'jobs': {
+                        'type': 'object',
+                        'properties': {
+                            'workers': {'type': 'integer'},
+                            'queued': {'type': 'integer'},
+                            'max_pending': {'type': 'integer'},
+                            'submitted': {'type': 'integer'},
+                            'rejected': {'type': 'integer'},
+                            'completed': {'type': 'integer'},
+                            'failed': {'type': 'integer'},
+                            'stored': {'type': 'object', 'description': 'Jobs in the local store by status'}
+                        }
+                    },
+                    'llm_log_sink': {
+                        'type': 'object',
+                        'properties': {
+                            'queued': {'type': 'integer'},
+                            'max_queue': {'type': 'integer'},
+                            'written': {'type': 'integer'},
+                            'failed': {'type': 'integer'},
+                            'dropped': {'type': 'integer'},
+                            'batches': {'type': 'integer'},
+                            'fallback_rows': {'type': 'integer'},
+                            'replayed': {'type': 'integer'}
+                        }
+                    }
+                }
+            }
+        },
+        401: {'description': 'Unauthorized'}
+    }
+})
+def get_metrics():
+    return jsonify({
+        'db_pool': pool.stats(),
+        'vector_index': vector_index.stats(),
+        'rag_evaluations': {
+            'queue': evaluation_queue.stats(),
+            'writer': evaluation_writer.stats()
+        },
+        'rag_answer_cache': answer_cache.stats(),
+        'cv_pdf_cache': pdf_cache.stats(),
+        'cv_extraction_cache': extraction_cache.stats(),
+        'analytics_snapshot': analytics_snapshot.stats(),
+        'jobs': job_queue.stats(),
+        'llm_log_sink': llm_log_writer.stats()
+    }), 200
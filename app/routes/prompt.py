@@ -1,22 +1,26 @@
 from flask import Blueprint, request, jsonify
-from groq import Groq
+import functools
 import os, time
 from flasgger import swag_from
-from langsmith import Client
-from langsmith.run_trees import RunTree
 import traceback  # Tambahkan untuk debugging yang lebih baik
 from dotenv import load_dotenv
 import uuid
 import json
-from app.db import get_connection
+from app.helpers.llm_logging import log_to_snowflake
+from app.helpers.sse import wants_stream, sse_event, sse_response
 
-# Inisialisasi Groq client
-client = Groq(
-    api_key=os.environ.get("GROQ_API_KEY"),
-)
+# Inisialisasi Groq client saat pertama kali dipakai
+@functools.lru_cache(maxsize=None)
+def get_client():
+    from groq import Groq
+    return Groq(
+        api_key=os.environ.get("GROQ_API_KEY"),
+    )
 
 prompt_bp = Blueprint('prompt', __name__, url_prefix='/api')
 
+MODEL_NAME = "gemma2-9b-it"
+
 # System prompt tetap sama seperti sebelumnya
 text_system = f"""
 You are an **AI Assistant for Project Managers**, integrated into the **Prosterio** platform. Your core mission is to **streamline tech talent management** using structured employee data and AI-enhanced insights. You support professional workflows by interacting with the data that has been uploaded, processed, and organized by authorized users.
@@ -115,65 +119,74 @@ Always respond with factual, platform-specific capabilities. Avoid hallucinating
 This ensures the assistant remains focused, safe, and aligned with its purpose in managing tech talent within Prosterio.
 """
 
-# Fungsi untuk menyimpan data ke Snowflake
-def log_to_snowflake(run_id, timestamp, user_input, response, latency, token_count, model, status="success", error=None):
+def stream_prompt(messages, max_tokens, run_id, timestamp, user_input):
+    """Yield Groq tokens as SSE events and log latency metrics once the stream ends."""
+    start_time = time.time()
+    time_to_first_token = None
+    parts = []
+    status, error_msg = "success", None
+    yield sse_event("start", {"run_id": run_id})
     try:
-        # Buat koneksi ke Snowflake
-        conn = get_connection()
-        
-        # Buat cursor
-        cursor = conn.cursor()
-        
-        # Siapkan kueri SQL
-        query = """
-        INSERT INTO LLM_EVALUATIONS (
-            RUN_ID, 
-            TIMESTAMP, 
-            USER_INPUT, 
-            MODEL_RESPONSE, 
-            LATENCY_SECONDS, 
-            TOKEN_COUNT, 
-            MODEL_NAME, 
-            STATUS,
-            ERROR_MESSAGE
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        
-        # Eksekusi kueri
-        cursor.execute(
-            query, 
-            (
-                run_id, 
-                timestamp, 
-                user_input, 
-                response, 
-                latency, 
-                token_count, 
-                model, 
-                status, 
-                error
-            )
+        stream = get_client().chat.completions.create(
+            model=MODEL_NAME,
+            messages=messages,
+            max_tokens=max_tokens,
+            stream=True,
         )
-        
-        # Commit perubahan
-        conn.commit()
-        
-        # Tutup cursor dan koneksi
-        cursor.close()
-        conn.close()
-        
-        print(f"Data berhasil disimpan ke Snowflake dengan run_id: {run_id}")
-        return True
-        
-    except Exception as e:
-        print(f"Error menyimpan data ke Snowflake: {str(e)}")
-        return False
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if time_to_first_token is None:
+                time_to_first_token = time.time() - start_time
+            parts.append(delta)
+            yield sse_event("token", {"text": delta})
+    except GeneratorExit:
+        # Client disconnected mid-stream
+        status = "cancelled"
+        raise
+    except Exception as api_error:
+        status, error_msg = "error", str(api_error)
+        print(f"Groq API error: {error_msg}")
+        yield sse_event("error", {"error": error_msg})
+    finally:
+        latency = time.time() - start_time
+        output_content = "".join(parts)
+        token_count = len(output_content.split())  # Estimasi kasar jumlah token
+        log_to_snowflake(
+            run_id=run_id,
+            timestamp=timestamp,
+            user_input=user_input,
+            response=output_content or None,
+            latency=latency,
+            token_count=token_count,
+            model=MODEL_NAME,
+            status=status,
+            error=error_msg,
+            time_to_first_token=time_to_first_token
+        )
+
+    if status == "success":
+        yield sse_event("done", {
+            "run_id": run_id,
+            "latency_seconds": latency,
+            "time_to_first_token_seconds": time_to_first_token,
+            "estimated_token_count": token_count
+        })
 
 @prompt_bp.route('/prompt', methods=['POST'])
 @swag_from({
     'tags': ['Prompt'],
-    'description': 'Process a prompt and get AI response',
+    'description': 'Process a prompt and get AI response. Pass ?stream=1 or Accept: text/event-stream to receive Server-Sent Events (start, token, done, error) instead of JSON.',
+    'produces': ['application/json', 'text/event-stream'],
     'parameters': [
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Stream tokens as Server-Sent Events'
+        },
         {
             'name': 'body',
             'in': 'body',
@@ -235,13 +248,17 @@ def handle_prompt():
         user_input = data['chats'][-1]['content'] if data['chats'] else ""
         max_tokens = data.get('max_token', 512)
         
+        # Stream tokens as Server-Sent Events when requested
+        if wants_stream():
+            return sse_response(stream_prompt(messages, max_tokens, run_id, timestamp, user_input))
+
         # Waktu mulai untuk mengukur latency
         start_time = time.time()
         
         try:
             # Panggil API Groq
-            response = client.chat.completions.create(
-                model="gemma2-9b-it",
+            response = get_client().chat.completions.create(
+                model=MODEL_NAME,
                 messages=messages,
                 max_tokens=max_tokens,
                 stream=False,
@@ -256,8 +273,7 @@ def handle_prompt():
             print(f"User input: {user_input[:50]}...")
             print(f"Response time: {latency:.2f}s")
             
-            # Log ke Snowflake secara asynchronous
-            # Dalam aplikasi produksi, gunakan threading atau task queue
+            # Log ke Snowflake secara asynchronous (batched background writer)
             log_to_snowflake(
                 run_id=run_id,
                 timestamp=timestamp,
@@ -265,7 +281,7 @@ def handle_prompt():
                 response=output_content,
                 latency=latency,
                 token_count=token_count,
-                model="gemma2-9b-it"
+                model=MODEL_NAME
             )
             
             return jsonify({
@@ -290,7 +306,7 @@ def handle_prompt():
                 response=None,
                 latency=time.time() - start_time,
                 token_count=0,
-                model="gemma2-9b-it",
+                model=MODEL_NAME,
                 status="error",
                 error=error_msg
             )
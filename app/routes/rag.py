@@ -1,21 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flasgger import swag_from
 from app.db import get_connection
-# Import trulens modules correctly
-from trulens.core import Tru
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+from app.helpers.embeddings import EMBED_MODEL
+from app.helpers.batch_writer import BatchWriter
+from app.helpers.evaluation_queue import EvaluationQueue
+from app.helpers.llm_logging import log_to_snowflake
+from app.helpers.sse import wants_stream, sse_event, sse_response
+from app.helpers.answer_cache import AnswerCache, corpus_version
+import uuid
+import weakref
+from app.helpers.vector_index import vector_index
+from app.helpers.retrieval import (
+    RAG_TOP_K_EMPLOYEES, RAG_SCORE_MODE, RAG_SCORE_TOP_N, RAG_CONTEXT_TOKEN_BUDGET, SCORE_MODES,
+    retrieve_employees_sql, assemble_context
+)
+from app.helpers.stopwords import ENGLISH_STOPWORDS
 import json
+import os
 import re
-
-# Download NLTK resources (uncommented to ensure they're installed)
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('punkt_tab')  # Add this line to download the missing resource
-
-# Initialize TruLens
-tru = Tru()
+import time
 
 # Custom feedback functions
 def custom_groundedness(context, response):
@@ -28,7 +31,7 @@ def custom_groundedness(context, response):
     response_tokens = set(response.lower().split())
     
     # Remove stopwords
-    stop_words = set(stopwords.words('english'))
+    stop_words = ENGLISH_STOPWORDS
     context_tokens = {t for t in context_tokens if t not in stop_words and len(t) > 2}
     response_tokens = {t for t in response_tokens if t not in stop_words and len(t) > 2}
     
@@ -51,7 +54,7 @@ def custom_relevance(question, response):
     response_tokens = set(response.lower().split())
     
     # Remove stopwords
-    stop_words = set(stopwords.words('english'))
+    stop_words = ENGLISH_STOPWORDS
     question_tokens = {t for t in question_tokens if t not in stop_words and len(t) > 2}
     
     # Calculate overlap
@@ -114,13 +117,217 @@ def cortex_evaluator(question, context, response, conn):
     except Exception as e:
         return {"error": str(e)}
 
+def evaluate_answer(evaluation_id, payload):
+    """Score one answer and queue its EVALUATIONS row; runs on an evaluation worker."""
+    question, context, answer = payload["question"], payload["context"], payload["answer"]
+    eval_results = {}
+
+    # Use NLTK-based evaluators
+    grounded_score = custom_groundedness(context, answer)
+    eval_results["groundedness"] = float(grounded_score)
+
+    relevance_score = custom_relevance(question, answer)
+    eval_results["relevance"] = float(relevance_score)
+
+    # Optionally, use Cortex for evaluation
+    conn = get_connection()
+    try:
+        cortex_eval = cortex_evaluator(question, context, answer, conn)
+    finally:
+        conn.close()
+    cortex_coherence = 0.0
+
+    if isinstance(cortex_eval, dict) and "error" not in cortex_eval:
+        for key, value in cortex_eval.items():
+            if key not in eval_results:  # Don't overwrite existing evaluations
+                eval_results[f"cortex_{key}"] = value
+                if key == "coherence":
+                    cortex_coherence = float(value)
+    elif isinstance(cortex_eval, dict):
+        eval_results["cortex_error"] = cortex_eval.get("error")
+
+    evaluation_writer.add((
+        evaluation_id,
+        question,
+        answer,
+        cortex_coherence,
+        grounded_score,
+        relevance_score,
+        time.strftime('%Y-%m-%d %H:%M:%S')
+    ))
+    return eval_results
+
+# EVALUATIONS rows are written in batches off the request thread
+evaluation_writer = BatchWriter(
+    '"PROSTERIO"."PUBLIC"."EVALUATIONS"',
+    ["evaluation_id", "question", "answer", "cortex_coherence", "groundedness", "relevance", "created_at"],
+    batch_size=int(os.getenv("RAG_EVAL_BATCH_SIZE", 20)),
+    flush_interval=float(os.getenv("RAG_EVAL_FLUSH_SECONDS", 5))
+)
+
+evaluation_queue = EvaluationQueue(
+    evaluate_answer,
+    workers=int(os.getenv("RAG_EVAL_WORKERS", 2)),
+    max_pending=int(os.getenv("RAG_EVAL_MAX_PENDING", 100)),
+    sample_rate=float(os.getenv("RAG_EVAL_SAMPLE_RATE", 1.0))
+)
+
+RAG_MODEL = "gemma-7b"
+
+# Answers for repeated questions, invalidated whenever Content_Chunks changes
+answer_cache = AnswerCache(
+    max_entries=int(os.getenv("RAG_CACHE_MAX_ENTRIES", 500)),
+    ttl=float(os.getenv("RAG_CACHE_TTL_SECONDS", 600)),
+    similarity_threshold=float(os.environ["RAG_CACHE_SIMILARITY"]) if os.getenv("RAG_CACHE_SIMILARITY") else None
+)
+
+def cache_bypassed():
+    """Clients skip the answer cache with ``Cache-Control: no-cache``."""
+    return 'no-cache' in request.headers.get('Cache-Control', '').lower()
+
+# Snowpark sessions wrapping pooled connections, reused for streamed completions
+_cortex_sessions = weakref.WeakKeyDictionary()
+
+def _cortex_session(conn):
+    from snowflake.snowpark import Session
+
+    raw = getattr(conn, "raw", conn)
+    session = _cortex_sessions.get(raw)
+    if session is None:
+        session = Session.builder.configs({"connection": raw}).create()
+        _cortex_sessions[raw] = session
+    return session
+
+def stream_completion(conn, prompt):
+    """Yield completion text as Cortex generates it.
+
+    Uses the Cortex streaming API through a Snowpark session; if that is not
+    available, falls back to the SQL COMPLETE function and yields the whole
+    answer at once.
+    """
+    try:
+        from snowflake.cortex import Complete
+        chunks = Complete(RAG_MODEL, prompt, session=_cortex_session(conn), stream=True)
+    except Exception as e:
+        print(f"Cortex streaming unavailable, falling back to SQL COMPLETE: {str(e)}")
+        chunks = None
+
+    if chunks is not None:
+        yield from chunks
+        return
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT snowflake.cortex.complete(%s, %s) AS response", (RAG_MODEL, prompt))
+        result = cursor.fetchone()
+        if result and result[0]:
+            yield result[0]
+    finally:
+        cursor.close()
+
+def submit_evaluation(question, context, answer):
+    """Queue an answer for background evaluation and return (evaluation_id, status)."""
+    evaluation_id = evaluation_queue.submit({
+        "question": question,
+        "context": context,
+        "answer": answer
+    })
+    if evaluation_id:
+        return evaluation_id, evaluation_queue.get(evaluation_id) or {"id": evaluation_id, "status": "pending"}
+    return None, {"id": None, "status": "skipped"}
+
+def stream_cached(cached):
+    """Replay a cached RAG answer as the same SSE events a live stream produces."""
+    yield sse_event("start", {"run_id": None, "cached": True})
+    yield sse_event("retrieval", cached["retrieval"])
+    yield sse_event("token", {"text": cached["answer"]})
+    yield sse_event("done", {
+        "run_id": None,
+        "cached": True,
+        "evaluation_id": cached["evaluation_id"],
+        "latency_seconds": 0.0,
+        "time_to_first_token_seconds": 0.0
+    })
+
+def stream_rag(conn, question, context, prompt, retrieval, on_complete=None):
+    """Yield the RAG answer as SSE events and log latency metrics once the stream ends.
+
+    ``on_complete(answer, evaluation_id)`` is called after a successful stream.
+    """
+    run_id = str(uuid.uuid4())
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    start_time = time.time()
+    time_to_first_token = None
+    parts = []
+    status, error_msg = "success", None
+    yield sse_event("start", {"run_id": run_id})
+    yield sse_event("retrieval", retrieval)
+    try:
+        for text in stream_completion(conn, prompt):
+            if not text:
+                continue
+            if time_to_first_token is None:
+                time_to_first_token = time.time() - start_time
+            parts.append(text)
+            yield sse_event("token", {"text": text})
+    except GeneratorExit:
+        # Client disconnected mid-stream
+        status = "cancelled"
+        raise
+    except Exception as e:
+        status, error_msg = "error", str(e)
+        print(f"Cortex streaming error: {error_msg}")
+        yield sse_event("error", {"error": error_msg})
+    finally:
+        latency = time.time() - start_time
+        answer = "".join(parts)
+        log_to_snowflake(
+            run_id=run_id,
+            timestamp=timestamp,
+            user_input=question,
+            response=answer or None,
+            latency=latency,
+            token_count=len(answer.split()),
+            model=RAG_MODEL,
+            status=status,
+            error=error_msg,
+            time_to_first_token=time_to_first_token
+        )
+
+    if status == "success":
+        evaluation_id, eval_results = submit_evaluation(question, context, answer)
+        if on_complete:
+            on_complete(answer, evaluation_id)
+        yield sse_event("done", {
+            "run_id": run_id,
+            "evaluation_id": evaluation_id,
+            "evaluation": eval_results,
+            "latency_seconds": latency,
+            "time_to_first_token_seconds": time_to_first_token
+        })
+
 rag_bp = Blueprint('rag', __name__, url_prefix='/api')
     
 @rag_bp.route('/rag', methods=['POST'])
 @swag_from({
     'tags': ['RAG'],
-    'description': 'Process RAG (Retrieval-Augmented Generation) query',
+    'description': 'Process RAG (Retrieval-Augmented Generation) query. Pass ?stream=1 or Accept: text/event-stream to receive Server-Sent Events (start, retrieval, token, done, error) instead of JSON.',
+    'produces': ['application/json', 'text/event-stream'],
     'parameters': [
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Stream the answer as Server-Sent Events'
+        },
+        {
+            'name': 'Cache-Control',
+            'in': 'header',
+            'type': 'string',
+            'required': False,
+            'description': 'Send no-cache to bypass the answer cache'
+        },
         {
             'name': 'body',
             'in': 'body',
@@ -131,6 +338,23 @@ rag_bp = Blueprint('rag', __name__, url_prefix='/api')
                     'prompt': {
                         'type': 'string',
                         'description': 'The question to be answered'
+                    },
+                    'top_k': {
+                        'type': 'integer',
+                        'description': 'Number of employees to retrieve (default RAG_TOP_K_EMPLOYEES)'
+                    },
+                    'score_mode': {
+                        'type': 'string',
+                        'enum': ['max', 'mean_top_n'],
+                        'description': 'How chunk similarities are aggregated per employee'
+                    },
+                    'score_top_n': {
+                        'type': 'integer',
+                        'description': 'Chunks averaged per employee when score_mode is mean_top_n'
+                    },
+                    'token_budget': {
+                        'type': 'integer',
+                        'description': 'Approximate token budget for the retrieved context'
                     }
                 },
             }
@@ -152,9 +376,41 @@ rag_bp = Blueprint('rag', __name__, url_prefix='/api')
                                 'type': 'string',
                                 'description': 'Generated answer from the RAG query'
                             },
+                            'evaluation_id': {
+                                'type': 'string',
+                                'description': 'Id to poll at /api/rag/evaluations/{evaluation_id}; null when not sampled'
+                            },
                             'evaluation': {
                                 'type': 'object',
-                                'description': 'TrueLens evaluation metrics'
+                                'description': 'Evaluation status at response time',
+                                'properties': {
+                                    'id': {'type': 'string'},
+                                    'status': {'type': 'string', 'enum': ['pending', 'running', 'done', 'failed', 'dropped', 'skipped']}
+                                }
+                            },
+                            'cached': {
+                                'type': 'boolean',
+                                'description': 'True when the answer came from the answer cache (see X-Cache header)'
+                            },
+                            'retrieval': {
+                                'type': 'object',
+                                'description': 'Ranked employees used as context',
+                                'properties': {
+                                    'source': {'type': 'string'},
+                                    'score_mode': {'type': 'string'},
+                                    'context_tokens': {'type': 'integer'},
+                                    'employees': {
+                                        'type': 'array',
+                                        'items': {
+                                            'type': 'object',
+                                            'properties': {
+                                                'employee_id': {'type': 'integer'},
+                                                'score': {'type': 'number'},
+                                                'chunks_used': {'type': 'integer'}
+                                            }
+                                        }
+                                    }
+                                }
                             }
                         }
                     }
@@ -187,21 +443,73 @@ def handle_rag():
         conn = get_connection()
         cursor = conn.cursor()
         
-        # First, retrieve context
-        cursor.execute("""
-        WITH context AS (
-            SELECT employee_id, chunk_text, snowflake.cortex.embed_text_1024('snowflake-arctic-embed-l-v2.0', chunk_text) AS embedding
-            FROM "PROSTERIO"."PUBLIC"."CONTENT_CHUNKS"
-            QUALIFY ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY employee_id) = 1
-            ORDER BY vector_cosine_similarity(embedding, snowflake.cortex.embed_text_1024('snowflake-arctic-embed-l-v2.0', %s)) DESC
-        ),
-        concatenated_context AS (
-            SELECT LISTAGG(chunk_text, ' ') WITHIN GROUP (ORDER BY employee_id) AS combined_context FROM context
-        )
-        SELECT combined_context FROM concatenated_context;""", (question,))
-        
-        context_result = cursor.fetchone()
-        context = context_result[0] if context_result else ""
+        top_k = int(data.get('top_k') or RAG_TOP_K_EMPLOYEES)
+        score_mode = data.get('score_mode') or RAG_SCORE_MODE
+        top_n = int(data.get('score_top_n') or RAG_SCORE_TOP_N)
+        token_budget = int(data.get('token_budget') or RAG_CONTEXT_TOKEN_BUDGET)
+        if score_mode not in SCORE_MODES:
+            return jsonify({"error": f"score_mode must be one of {', '.join(SCORE_MODES)}"}), 400
+        if top_k < 1 or top_n < 1 or token_budget < 1:
+            return jsonify({"error": "top_k, score_top_n and token_budget must be positive"}), 400
+
+        # Serve repeated questions from the answer cache
+        cache_params = {"top_k": top_k, "score_mode": score_mode, "top_n": top_n, "token_budget": token_budget}
+        version = corpus_version(cursor)
+        question_embedding = None
+        bypass = cache_bypassed()
+        if bypass:
+            answer_cache.record_bypass()
+        else:
+            if answer_cache.similarity_threshold is not None:
+                # Semantic matching needs the question embedding up front
+                cursor.execute("SELECT snowflake.cortex.embed_text_1024(%s, %s)", (EMBED_MODEL, question))
+                question_embedding = cursor.fetchone()[0]
+            cached = answer_cache.get(question, cache_params, version, embedding=question_embedding)
+            if cached:
+                cached_evaluation = {"id": None, "status": "skipped"}
+                if cached["evaluation_id"]:
+                    cached_evaluation = evaluation_queue.get(cached["evaluation_id"]) or {"id": cached["evaluation_id"]}
+                if wants_stream():
+                    response = sse_response(stream_cached(cached))
+                else:
+                    response = jsonify({
+                        "message": "RAG data processed",
+                        "answer": cached["answer"],
+                        "evaluation_id": cached["evaluation_id"],
+                        "evaluation": cached_evaluation,
+                        "retrieval": cached["retrieval"],
+                        "cached": True
+                    })
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+        def remember(answer, evaluation_id):
+            if answer:
+                answer_cache.put(question, cache_params, {
+                    "answer": answer,
+                    "evaluation_id": evaluation_id,
+                    "retrieval": retrieval
+                }, version, embedding=question_embedding)
+
+        # First, retrieve the top-k employees by their best matching chunks
+        if vector_index.is_warm:
+            # Rank chunks in-process; only the question embedding needs Snowflake
+            if question_embedding is None:
+                cursor.execute("SELECT snowflake.cortex.embed_text_1024(%s, %s)", (EMBED_MODEL, question))
+                question_embedding = cursor.fetchone()[0]
+            employees = vector_index.search_employees(question_embedding, k=top_k, score_mode=score_mode, top_n=top_n)
+            retrieval_source = "vector_index"
+        else:
+            employees = retrieve_employees_sql(cursor, question, top_k, score_mode, top_n)
+            retrieval_source = "sql"
+
+        context, context_tokens, ranked_employees = assemble_context(employees, token_budget)
+        retrieval = {
+            "source": retrieval_source,
+            "score_mode": score_mode,
+            "context_tokens": context_tokens,
+            "employees": ranked_employees
+        }
         
         # Skip TruLens logging if it's causing issues
         # Just focus on the core RAG functionality
@@ -214,60 +522,91 @@ def handle_rag():
         QUESTION: {question}
         ANSWER: """
         
+        # Stream the answer as Server-Sent Events when requested
+        if wants_stream():
+            response = sse_response(stream_rag(conn, question, context, prompt, retrieval, on_complete=remember))
+            response.headers['X-Cache'] = 'BYPASS' if bypass else 'MISS'
+            return response
+
         cursor.execute("""
-        SELECT snowflake.cortex.complete('gemma-7b', %s) AS response
-        """, (prompt,))
+        SELECT snowflake.cortex.complete(%s, %s) AS response
+        """, (RAG_MODEL, prompt))
         
         result = cursor.fetchone()
         answer = result[0] if result else ""
         
-        # Evaluate the response
-        eval_results = {}
+        # Evaluate the response in the background; clients poll the evaluation id
+        evaluation_id, eval_results = submit_evaluation(question, context, answer)
+        remember(answer, evaluation_id)
         
-        try:
-            # Use NLTK-based evaluators
-            grounded_score = custom_groundedness(context, answer)
-            eval_results["groundedness"] = float(grounded_score)
-            
-            relevance_score = custom_relevance(question, answer)
-            eval_results["relevance"] = float(relevance_score)
-            
-            # Optionally, use Cortex for evaluation
-            cortex_eval = cortex_evaluator(question, context, answer, conn)
-            cortex_coherence = 0.0
-            
-            if isinstance(cortex_eval, dict) and "error" not in cortex_eval:
-                for key, value in cortex_eval.items():
-                    if key not in eval_results:  # Don't overwrite existing evaluations
-                        eval_results[f"cortex_{key}"] = value
-                        if key == "coherence":
-                            cortex_coherence = float(value)
-            
-            # Save evaluation results to database
-            cursor.execute("""
-            INSERT INTO "PROSTERIO"."PUBLIC"."EVALUATIONS" 
-            (question, answer, cortex_coherence, groundedness, relevance, created_at)
-            VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP())
-            """, (
-                question, 
-                answer, 
-                cortex_coherence,
-                grounded_score,
-                relevance_score
-            ))
-            
-            # Commit the transaction
-            conn.commit()
-            
-        except Exception as eval_error:
-            print(f"Evaluation error: {eval_error}")
-            eval_results["error"] = str(eval_error)
-        
-        return jsonify({
+        response = jsonify({
             "message": "RAG data processed", 
             "answer": answer,
-            "evaluation": eval_results
+            "evaluation_id": evaluation_id,
+            "evaluation": eval_results,
+            "retrieval": retrieval,
+            "cached": False
         })
+        response.headers['X-Cache'] = 'BYPASS' if bypass else 'MISS'
+        return response
+    except Exception as e:
+        print(e)
+        return jsonify({"error": str(e)}), 500
+
+@rag_bp.route('/rag/evaluations/<evaluation_id>', methods=['GET'])
+@swag_from({
+    'tags': ['RAG'],
+    'description': 'Poll the background evaluation of a RAG answer',
+    'parameters': [
+        {'name': 'evaluation_id', 'in': 'path', 'required': True, 'type': 'string'}
+    ],
+    'responses': {
+        '200': {
+            'description': 'Evaluation status, with scores once done',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'string'},
+                    'status': {'type': 'string'},
+                    'scores': {'type': 'object'},
+                    'error': {'type': 'string'}
+                }
+            }
+        },
+        '404': {'description': 'Evaluation not found'},
+        '500': {'description': 'Internal server error'}
+    }
+})
+def get_evaluation(evaluation_id):
+    status = evaluation_queue.get(evaluation_id)
+    if status:
+        return jsonify(status), 200
+
+    # No longer tracked in memory (e.g. after a restart): read the stored row
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT cortex_coherence, groundedness, relevance, created_at
+            FROM "PROSTERIO"."PUBLIC"."EVALUATIONS"
+            WHERE evaluation_id = %s
+        """, (evaluation_id,))
+        row = cursor.fetchone()
+        if not row:
+            return jsonify({"error": "Evaluation not found"}), 404
+        return jsonify({
+            "id": evaluation_id,
+            "status": "done",
+            "scores": {
+                "cortex_coherence": row[0],
+                "groundedness": row[1],
+                "relevance": row[2]
+            },
+            "created_at": row[3]
+        }), 200
     except Exception as e:
         print(e)
         return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
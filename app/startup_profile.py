@@ -0,0 +1,152 @@
+"""Report how long importing each blueprint takes and how much memory it adds.
+
+Usage::
+
+    python -m app.startup_profile [--budget-seconds 5] [--json]
+
+The measurement runs in a fresh interpreter so nothing is imported up front.
+The ``app`` and ``app.routes`` packages are registered without running their
+``__init__`` so each blueprint module can be imported on its own, in the order
+``register_routes`` uses. Modules shared between blueprints are attributed to
+the first blueprint that imports them.
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_MODULES = ["flask", "flasgger", "flask_cors", "flask_mail", "app.db", "app.middleware.auth"]
+
+BLUEPRINT_MODULES = [
+    "login", "employees", "users", "documents", "chats", "prompt",
+    "rag", "forgot_password", "analytics", "gdrive", "metrics", "jobs",
+]
+
+# Dependencies that should only load on first use, never at startup
+HEAVY_MODULES = [
+    "trulens", "nltk", "google.generativeai", "langchain_community",
+    "googleapiclient", "groq", "langsmith",
+]
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak RSS; KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _register_package(name):
+    """Put an empty package module in sys.modules without executing __init__."""
+    spec = importlib.util.find_spec(name)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return spec, module
+
+
+def _measure(label, load):
+    before = set(sys.modules)
+    rss = _rss_bytes()
+    started = time.perf_counter()
+    load()
+    return {
+        "name": label,
+        "seconds": round(time.perf_counter() - started, 4),
+        "rss_mib": round((_rss_bytes() - rss) / 2 ** 20, 2),
+        "modules": len(set(sys.modules) - before),
+    }
+
+
+def profile():
+    """Run the measurement in the current (fresh) interpreter."""
+    os.environ.setdefault("RAG_VECTOR_INDEX", "0")
+    rss_start = _rss_bytes()
+    started = time.perf_counter()
+
+    app_spec, app_module = _register_package("app")
+    routes_spec, routes_module = _register_package("app.routes")
+
+    steps = [_measure("baseline", lambda: [importlib.import_module(m) for m in BASELINE_MODULES])]
+    for name in BLUEPRINT_MODULES:
+        steps.append(_measure(name, lambda name=name: importlib.import_module(f"app.routes.{name}")))
+
+    def create():
+        # Blueprints are loaded, so running the real package __init__s is cheap
+        routes_spec.loader.exec_module(routes_module)
+        app_spec.loader.exec_module(app_module)
+        app_module.create_app({"TESTING": True})
+
+    steps.append(_measure("create_app", create))
+
+    return {
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "rss_mib": round(_rss_bytes() / 2 ** 20, 2),
+        "rss_added_mib": round((_rss_bytes() - rss_start) / 2 ** 20, 2),
+        "steps": steps,
+        "heavy_modules_loaded": [
+            m for m in HEAVY_MODULES if m in sys.modules
+        ],
+    }
+
+
+def _print_report(report, budget):
+    print(f"{'step':<18}{'seconds':>10}{'rss MiB':>10}{'modules':>10}")
+    for step in report["steps"]:
+        print(f"{step['name']:<18}{step['seconds']:>10.3f}{step['rss_mib']:>10.1f}{step['modules']:>10}")
+    print(f"{'total':<18}{report['total_seconds']:>10.3f}{report['rss_added_mib']:>10.1f}")
+    print(f"Process RSS after create_app: {report['rss_mib']:.1f} MiB")
+    loaded = report["heavy_modules_loaded"]
+    print(f"Heavy modules loaded at startup: {', '.join(loaded) if loaded else 'none'}")
+    if budget is not None:
+        verdict = "within" if report["total_seconds"] <= budget else "OVER"
+        print(f"Startup budget {budget:.2f}s: {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time and memory per blueprint.")
+    parser.add_argument("--budget-seconds", type=float, default=None,
+                        help="Exit with status 1 when startup takes longer than this")
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Run as a script: import from the repo root, not from app/
+        sys.path = [ROOT] + [p for p in sys.path if os.path.abspath(p or ".") != os.path.dirname(__file__)]
+        print(json.dumps(profile()))
+        return
+
+    # `python -m app.startup_profile` has already imported the app package,
+    # so measure in a clean interpreter that runs this file as a script.
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        sys.exit(result.returncode)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report, args.budget_seconds)
+    if args.budget_seconds is not None and report["total_seconds"] > args.budget_seconds:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
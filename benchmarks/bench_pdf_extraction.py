@@ -0,0 +1,69 @@
+"""Compare CV text extraction: in-memory pypdf vs. the old temp file + LangChain path.
+
+Usage:
+    python -m benchmarks.bench_pdf_extraction [pdf ...] [--repeat 20]
+"""
+import argparse
+import glob
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from app.helpers.pdf_text import extract_pdf_text
+from app.helpers.retrieval import estimate_tokens
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests", "pdf")
+
+def langchain_text(data):
+    """The previous path: write a temp file, PyPDFLoader.load_and_split(), join the pieces."""
+    from langchain_community.document_loaders import PyPDFLoader
+
+    with tempfile.NamedTemporaryFile(delete=True, suffix=".pdf") as tmp:
+        tmp.write(data)
+        tmp.flush()
+        pages = PyPDFLoader(tmp.name).load_and_split()
+        return " ".join([page.page_content.strip() for page in pages])
+
+def measure(engines, data, repeat):
+    """First call (includes importing the engine) and median of ``repeat`` interleaved calls, in ms."""
+    results = {}
+    for name, extract in engines:
+        started = time.perf_counter()
+        text = extract(data)
+        results[name] = {"text": text, "first": (time.perf_counter() - started) * 1000, "timings": []}
+    # Interleave engines so machine noise hits both alike
+    for _ in range(repeat):
+        for name, extract in engines:
+            started = time.perf_counter()
+            extract(data)
+            results[name]["timings"].append((time.perf_counter() - started) * 1000)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", help=f"PDF files (default: {SAMPLE_DIR}/*.pdf)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    import pypdf  # noqa: F401  shared by both engines, so "first" only shows their own import cost
+
+    engines = [("pypdf", extract_pdf_text)]
+    try:
+        import langchain_community.document_loaders  # noqa: F401
+        engines.insert(0, ("langchain", langchain_text))
+    except ImportError:
+        print("langchain_community is not installed; only the pypdf engine is measured")
+
+    for path in args.pdfs or sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.pdf"))):
+        with open(path, "rb") as f:
+            data = f.read()
+        print(os.path.basename(path))
+        for name, result in measure(engines, data, args.repeat).items():
+            text = result["text"]
+            print(f"  {name:<10} first={result['first']:8.2f}ms median={statistics.median(result['timings']):7.2f}ms "
+                  f"chars={len(text):6d} ~tokens={estimate_tokens(text):5d}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark the in-process RAG vector index on a synthetic corpus.
+
+Usage:
+    python -m benchmarks.bench_vector_index [--chunks 100000] [--queries 200] [--k 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.helpers.vector_index import VectorIndex
+
+def synthetic_rows(n_chunks, dimensions, chunks_per_employee, seed):
+    rng = np.random.default_rng(seed)
+    batch = 10000
+    for start in range(0, n_chunks, batch):
+        vectors = rng.standard_normal((min(batch, n_chunks - start), dimensions), dtype=np.float32)
+        yield [
+            (start + i, (start + i) // chunks_per_employee, f"chunk {start + i}", vector)
+            for i, vector in enumerate(vectors)
+        ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--dimensions", type=int, default=1024)
+    parser.add_argument("--chunks-per-employee", type=int, default=8)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = VectorIndex(dimensions=args.dimensions, dtype=args.dtype)
+
+    started = time.perf_counter()
+    for rows in synthetic_rows(args.chunks, args.dimensions, args.chunks_per_employee, args.seed):
+        index.apply(rows)
+    load_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = rng.standard_normal((args.queries, args.dimensions), dtype=np.float32)
+    index.search(queries[0], k=args.k)  # warm-up
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, k=args.k)
+        timings.append(time.perf_counter() - started)
+    timings = np.array(timings) * 1000
+
+    started = time.perf_counter()
+    index.apply(next(synthetic_rows(1000, args.dimensions, args.chunks_per_employee, args.seed + 2)))
+    refresh_ms = (time.perf_counter() - started) * 1000
+
+    stats = index.stats()
+    print(f"chunks={stats['chunks']} dims={args.dimensions} dtype={args.dtype} "
+          f"matrix={stats['bytes'] / 1024 / 1024:.1f} MiB")
+    print(f"load: {load_seconds:.2f}s")
+    print(f"search k={args.k}: p50={np.percentile(timings, 50):.2f}ms "
+          f"p95={np.percentile(timings, 95):.2f}ms max={timings.max():.2f}ms")
+    print(f"incremental upsert of 1000 chunks: {refresh_ms:.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from app import create_app
 
-app = create_app()
+# CV parse pool workers re-run this file as __mp_main__ and need no app
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=3001)
\ No newline at end of file
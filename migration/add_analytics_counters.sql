@@ -0,0 +1,40 @@
+-- Per-dimension analytics counters kept up to date by employee writes, so
+-- GET /api/analytics reads one row per distinct value instead of scanning
+-- Employees. Dimensions: job_title, experience_level, skill (key1) and
+-- education_job_title (education title in key1, job title in key2).
+-- NULL keys are stored as ''. Verify later with
+-- python -m migration.reconcile_analytics_counters
+CREATE TABLE IF NOT EXISTS Analytics_Counters (
+    dimension VARCHAR(30) NOT NULL,
+    key1 VARCHAR NOT NULL,
+    key2 VARCHAR NOT NULL DEFAULT '',
+    total INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (dimension, key1, key2)
+);
+
+-- Seed from the current employees (same aggregations as
+-- app/helpers/analytics_counters.RECOMPUTE_SQL)
+DELETE FROM Analytics_Counters;
+INSERT INTO Analytics_Counters (dimension, key1, key2, total)
+SELECT 'job_title', COALESCE(JOB_TITLE, ''), '', COUNT(*)
+FROM Employees
+GROUP BY 2
+UNION ALL
+SELECT 'experience_level',
+  CASE
+    WHEN JOB_TITLE ILIKE '%Junior%' THEN 'Junior'
+    WHEN JOB_TITLE ILIKE '%Senior%' THEN 'Senior'
+    WHEN JOB_TITLE ILIKE '%Manager%' THEN 'Managerial'
+    ELSE 'Mid-Level'
+  END, '', COUNT(*)
+FROM Employees
+GROUP BY 2
+UNION ALL
+SELECT 'skill', COALESCE(TRIM(f.value::STRING, '"'), ''), '', COUNT(*)
+FROM Employees, LATERAL FLATTEN(input => PARSE_JSON(SKILLS)) f
+GROUP BY 2
+UNION ALL
+SELECT 'education_job_title', COALESCE(edu.value:title::STRING, ''), COALESCE(JOB_TITLE, ''), COUNT(*)
+FROM Employees, LATERAL FLATTEN(input => PARSE_JSON(EDUCATIONS)) edu
+GROUP BY 2, 3;
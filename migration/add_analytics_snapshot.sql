@@ -0,0 +1,8 @@
+-- Last computed GET /api/analytics sections, shared by all app processes.
+-- The row is written on the first dashboard read and rebuilt in the
+-- background after employee writes.
+CREATE TABLE IF NOT EXISTS Analytics_Snapshots (
+    name VARCHAR(50) PRIMARY KEY,
+    data TEXT NOT NULL,
+    generated_at TIMESTAMP_NTZ NOT NULL
+);
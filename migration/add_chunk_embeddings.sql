@@ -0,0 +1,6 @@
+-- Persist chunk embeddings so RAG retrieval only has to embed the question.
+-- Run once on existing databases, then fill old rows with:
+--   python -m migration.backfill_embeddings
+ALTER TABLE Content_Chunks ADD COLUMN embedding VECTOR(FLOAT, 1024);
+ALTER TABLE Content_Chunks ADD COLUMN embedding_model VARCHAR;
+ALTER TABLE Content_Chunks ADD COLUMN embedded_at TIMESTAMP_TZ;
@@ -0,0 +1,15 @@
+-- Stable chunk key (employee_id, type, ordinal) and a hash of chunk_text, so
+-- employee updates rewrite only the chunks that changed and keep the stored
+-- embeddings of the rest. Rows left without an ordinal are replaced on the
+-- employee's next update.
+ALTER TABLE Content_Chunks ADD COLUMN ordinal INT;
+ALTER TABLE Content_Chunks ADD COLUMN content_hash VARCHAR(64);
+
+UPDATE Content_Chunks c
+SET ordinal = k.ordinal,
+    content_hash = SHA2(c.chunk_text, 256)
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY employee_id, type ORDER BY id) - 1 AS ordinal
+    FROM Content_Chunks
+) k
+WHERE c.id = k.id AND c.ordinal IS NULL;
@@ -0,0 +1,12 @@
+-- Version of the employee corpus shared by every app worker and CLI process.
+-- Employee and Content_Chunks writes bump it in their own transaction, and
+-- cached RAG answers and employee counts from another version are dropped.
+CREATE TABLE IF NOT EXISTS Corpus_Version (
+    id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+MERGE INTO Corpus_Version AS t
+USING (SELECT 1 AS id) AS s ON t.id = s.id
+WHEN NOT MATCHED THEN INSERT (id, version) VALUES (1, 0);
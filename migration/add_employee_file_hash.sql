@@ -0,0 +1,10 @@
+-- Content hash and size of the stored CV, so GET /api/employees/<id> can serve
+-- a cached copy without reading file_data. Rows left NULL here are filled the
+-- first time their CV is requested.
+ALTER TABLE Employees ADD COLUMN file_sha256 VARCHAR(64);
+ALTER TABLE Employees ADD COLUMN file_size INT;
+
+UPDATE Employees
+SET file_sha256 = SHA2(file_data, 256),
+    file_size = LENGTH(file_data)
+WHERE file_data IS NOT NULL AND file_sha256 IS NULL;
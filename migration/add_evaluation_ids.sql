@@ -0,0 +1,3 @@
+-- Evaluations run in the background; the id returned by /api/rag is stored so
+-- it can still be polled after the in-memory status has been evicted.
+ALTER TABLE EVALUATIONS ADD COLUMN evaluation_id VARCHAR(36);
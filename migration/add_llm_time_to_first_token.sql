@@ -0,0 +1,2 @@
+-- Streamed /api/prompt and /api/rag responses record time-to-first-token.
+ALTER TABLE LLM_EVALUATIONS ADD COLUMN TIME_TO_FIRST_TOKEN_SECONDS FLOAT;
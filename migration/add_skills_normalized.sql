@@ -0,0 +1,6 @@
+-- Canonical skill names ("python3", "Python (Advanced)" -> "Python") next to
+-- the skills extracted from CVs. Employee writes fill it; fill existing rows
+-- with: python -m migration.backfill_skills
+-- Analytics and the employee skill filter read COALESCE(skills_normalized, skills)
+-- until then.
+ALTER TABLE Employees ADD COLUMN skills_normalized VARIANT;
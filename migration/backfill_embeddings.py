@@ -0,0 +1,23 @@
+"""Backfill Content_Chunks embeddings for rows written before they were stored.
+
+Usage:
+    python -m migration.backfill_embeddings [--batch-size 500]
+"""
+import argparse
+from app.db import get_connection
+from app.helpers.embeddings import EMBED_MODEL, backfill_embeddings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows embedded per UPDATE/commit")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        total = backfill_embeddings(conn, batch_size=args.batch_size)
+        print(f"Backfill complete: {total} chunks embedded with {EMBED_MODEL}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Fill Employees.skills_normalized from skills using the canonical skill dictionary.
+
+Usage:
+    python -m migration.backfill_skills [--batch-size 500] [--all]
+
+Without --all only rows that have no normalized skills yet are written; use
+--all after changing the dictionary (SKILL_DICTIONARY_PATH) to re-normalize
+every employee. Analytics counters are moved in the same transaction as
+each batch.
+"""
+import argparse
+import json
+from app.db import get_connection
+from app.helpers.analytics_counters import apply_deltas, employee_counts_where, lock_employee_counts, parse_variant_list
+from app.helpers.skills import normalize_skills
+
+UPDATE_SQL = """
+    UPDATE Employees
+    SET skills_normalized = PARSE_JSON(s.skills), updated_at = CURRENT_TIMESTAMP()
+    FROM (
+        SELECT v.value[0]::INTEGER AS id, v.value[1]::VARCHAR AS skills
+        FROM TABLE(FLATTEN(input => PARSE_JSON(%s))) v
+    ) s
+    WHERE Employees.id = s.id
+"""
+
+def backfill_skills(conn, batch_size=500, renormalize=False):
+    """Normalize skills in id order, one commit per batch; returns (scanned, updated)."""
+    cursor = conn.cursor()
+    scanned = updated = 0
+    last_id = 0
+    pending = "" if renormalize else " AND skills_normalized IS NULL AND skills IS NOT NULL"
+    try:
+        while True:
+            cursor.execute(
+                f"SELECT id, skills, skills_normalized FROM Employees WHERE id > %s{pending} ORDER BY id LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned += len(rows)
+            changes = []
+            for employee_id, skills, current in rows:
+                normalized = normalize_skills(parse_variant_list(skills))
+                if normalized is not None and normalized != parse_variant_list(current):
+                    changes.append([employee_id, json.dumps(normalized)])
+            if not changes:
+                continue
+
+            ids = [employee_id for employee_id, _ in changes]
+            touched = f"id IN ({', '.join(['%s'] * len(ids))})"
+            cursor.execute("BEGIN")
+            counts_before = lock_employee_counts(cursor, touched, ids)
+            cursor.execute(UPDATE_SQL, (json.dumps(changes),))
+            apply_deltas(cursor, counts_before, employee_counts_where(cursor, touched, ids))
+            conn.commit()
+            updated += len(changes)
+            print(f"Normalized skills up to employee {last_id}: {updated} updated of {scanned} scanned")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return scanned, updated
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500, help="Employees per UPDATE/commit")
+    parser.add_argument("--all", action="store_true", help="Re-normalize employees that already have normalized skills")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        scanned, updated = backfill_skills(conn, batch_size=args.batch_size, renormalize=args.all)
+        print(f"Backfill complete: {updated} of {scanned} employees updated")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
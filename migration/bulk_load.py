@@ -0,0 +1,40 @@
+"""Bulk load employees and their content chunks through a Snowflake stage.
+
+Usage:
+    python -m migration.bulk_load employees.ndjson --user-id 1 [--format csv|parquet] [--no-embed]
+    python -m migration.bulk_load employees.json --user-id 1 --dry-run [--stand-in local.db]
+
+The input is NDJSON (one employee per line), a JSON array or {"employees": [...]}.
+--dry-run loads into a SQLite copy of migration/schema.sql instead of Snowflake.
+The load bumps Corpus_Version, so running servers drop cached RAG answers and
+rebuild the analytics snapshot on their next read.
+"""
+import argparse
+import json
+from app.helpers.bulk_loader import FORMATS, SnowflakeTarget, SqliteStandInTarget, bulk_load, iter_employee_file
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="NDJSON or JSON file with employees")
+    parser.add_argument("--user-id", type=int, required=True, help="Owner stored on every employee and chunk")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Load file format (parquet needs pyarrow)")
+    parser.add_argument("--no-embed", action="store_true", help="Skip embedding the new chunks")
+    parser.add_argument("--dry-run", action="store_true", help="Load into a local SQLite stand-in instead of Snowflake")
+    parser.add_argument("--stand-in", default=":memory:", help="SQLite file used by --dry-run")
+    args = parser.parse_args()
+
+    employees = iter_employee_file(args.path)
+    if args.dry_run:
+        report = bulk_load(employees, args.user_id, SqliteStandInTarget(args.stand_in), fmt=args.format)
+    else:
+        from app.db import get_connection
+
+        conn = get_connection()
+        try:
+            report = bulk_load(employees, args.user_id, SnowflakeTarget(conn, embed=not args.no_embed), fmt=args.format)
+        finally:
+            conn.close()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Check Analytics_Counters against a full recompute from Employees.
+
+Usage:
+    python -m migration.reconcile_analytics_counters [--fix]
+
+Exits with status 1 when counters drifted and --fix was not given.
+"""
+import argparse
+import sys
+from app.db import get_connection
+from app.helpers.analytics_counters import reconcile
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="Rewrite the counters from the recompute")
+    parser.add_argument("--limit", type=int, default=50, help="Mismatches printed")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        mismatches = reconcile(cursor, fix=args.fix)
+        for m in mismatches[:args.limit]:
+            key = f"{m['key1']!r}" + (f" -> {m['key2']!r}" if m["key2"] else "")
+            print(f"{m['dimension']:<20} {key}: expected {m['expected']}, stored {m['stored']}")
+        if len(mismatches) > args.limit:
+            print(f"... {len(mismatches) - args.limit} more")
+        if args.fix:
+            conn.commit()
+            print(f"Counters rewritten; {len(mismatches)} mismatches fixed")
+        else:
+            print(f"{len(mismatches)} mismatches" if mismatches else "Counters match a full recompute")
+    finally:
+        cursor.close()
+        conn.close()
+    if mismatches and not args.fix:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
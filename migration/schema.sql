@@ -21,12 +21,15 @@ CREATE TABLE Employees (
     promotion_years INT,
     profile TEXT,
     skills VARIANT,
+    skills_normalized VARIANT,
     professional_experiences VARIANT,
     educations VARIANT,
     publications VARIANT,
     distinctions VARIANT,
     certifications VARIANT,
     file_data BINARY,
+    file_sha256 VARCHAR(64),
+    file_size INT,
     file_url TEXT,
     created_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
     updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
@@ -37,8 +40,13 @@ CREATE TABLE Content_Chunks (
     id INT PRIMARY KEY AUTOINCREMENT,
     chunk_text TEXT NOT NULL,
     type VARCHAR NOT NULL,
+    ordinal INT,
+    content_hash VARCHAR(64),
     user_id INT REFERENCES Users(id) ON DELETE CASCADE,
-    employee_id INT REFERENCES Employees(id) ON DELETE SET NULL
+    employee_id INT REFERENCES Employees(id) ON DELETE SET NULL,
+    embedding VECTOR(FLOAT, 1024),
+    embedding_model VARCHAR,
+    embedded_at TIMESTAMP_TZ
 );
 
 
@@ -60,6 +68,7 @@ CREATE TABLE Chats (
 -- Migration for LLM Evaluations
 CREATE TABLE EVALUATIONS (
     id INTEGER AUTOINCREMENT PRIMARY KEY,
+    evaluation_id VARCHAR(36),
     question TEXT NOT NULL,
     answer TEXT NOT NULL,
     cortex_coherence FLOAT,
@@ -77,5 +86,27 @@ CREATE TABLE LLM_EVALUATIONS (
     TOKEN_COUNT INTEGER,
     MODEL_NAME VARCHAR(100),
     STATUS VARCHAR(20),
-    ERROR_MESSAGE TEXT
+    ERROR_MESSAGE TEXT,
+    TIME_TO_FIRST_TOKEN_SECONDS FLOAT
+);
+
+CREATE TABLE Analytics_Snapshots (
+    name VARCHAR(50) PRIMARY KEY,
+    data TEXT NOT NULL,
+    generated_at TIMESTAMP_NTZ NOT NULL
+);
+
+CREATE TABLE Analytics_Counters (
+    dimension VARCHAR(30) NOT NULL,
+    key1 VARCHAR NOT NULL,
+    key2 VARCHAR NOT NULL DEFAULT '',
+    total INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (dimension, key1, key2)
+);
+
+CREATE TABLE Corpus_Version (
+    id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP_TZ DEFAULT CURRENT_TIMESTAMP()
 );
@@ -0,0 +1,78 @@
+import json
+from collections import Counter
+
+from app.helpers.analytics_counters import apply_deltas, counter_deltas, employee_counts, reconcile
+
+
+def test_employee_counts_mirror_the_scan_queries():
+    rows = [
+        ("Senior Engineer", json.dumps(["Python", "SQL"]), json.dumps([{"title": "BSc"}, {"school": "x"}])),
+        # PUT /api/employees/<id> stores VARIANTs as JSON strings
+        ("Engineering Manager", json.dumps(json.dumps(["Python"])), None),
+        (None, None, "[]"),
+    ]
+    counts = employee_counts(rows)
+
+    assert counts[("job_title", "Senior Engineer", "")] == 1
+    assert counts[("job_title", "", "")] == 1
+    assert counts[("experience_level", "Senior", "")] == 1
+    assert counts[("experience_level", "Managerial", "")] == 1
+    assert counts[("experience_level", "Mid-Level", "")] == 1
+    assert counts[("skill", "Python", "")] == 2
+    assert counts[("education_job_title", "BSc", "Senior Engineer")] == 1
+    assert counts[("education_job_title", "", "Senior Engineer")] == 1
+
+
+def test_update_emits_only_the_changed_counters():
+    before = employee_counts([("Junior Engineer", '["Python", "SQL"]', '[{"title": "BSc"}]')])
+    after = employee_counts([("Senior Engineer", '["Python", "Go"]', '[{"title": "BSc"}]')])
+
+    assert counter_deltas(before, after) == {
+        ("job_title", "Junior Engineer", ""): -1,
+        ("job_title", "Senior Engineer", ""): 1,
+        ("experience_level", "Junior", ""): -1,
+        ("experience_level", "Senior", ""): 1,
+        ("skill", "SQL", ""): -1,
+        ("skill", "Go", ""): 1,
+        ("education_job_title", "BSc", "Junior Engineer"): -1,
+        ("education_job_title", "BSc", "Senior Engineer"): 1,
+    }
+
+
+class FakeCursor:
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+def test_apply_deltas_is_one_merge_and_skips_no_ops():
+    cursor = FakeCursor()
+    assert apply_deltas(cursor, Counter({("skill", "Go", ""): 1}), Counter({("skill", "Go", ""): 1})) == 0
+    assert cursor.executed == []
+
+    assert apply_deltas(cursor, Counter(), employee_counts([("Analyst", '["Excel"]', None)])) == 3
+    sql, params = cursor.executed[0]
+    assert sql.startswith("MERGE INTO Analytics_Counters")
+    assert sql.count("(%s, %s, %s, %s)") == 3
+    assert params[:4] == ["experience_level", "Mid-Level", "", 1]
+
+
+def test_reconcile_reports_drift_and_fixes():
+    recomputed = [("job_title", "Analyst", "", 2), ("skill", "Excel", "", 1)]
+    stored = [("job_title", "Analyst", "", 3), ("skill", "Word", "", 1)]
+    cursor = FakeCursor([recomputed, stored])
+
+    mismatches = reconcile(cursor, fix=True)
+
+    assert [(m["key1"], m["expected"], m["stored"]) for m in mismatches] == [
+        ("Analyst", 2, 3), ("Excel", 1, 0), ("Word", 0, 1)
+    ]
+    assert cursor.executed[-3][0] == "BEGIN"
+    assert cursor.executed[-2][0] == "DELETE FROM Analytics_Counters"
+    assert cursor.executed[-1][0].startswith("INSERT INTO Analytics_Counters")
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import app.helpers.analytics as analytics
+from werkzeug.datastructures import MultiDict
+
+from app.helpers.analytics import (
+    AnalyticsError, DEFAULT_OPTIONS, build_sankey, parse_options, run_sections, scan_query
+)
+
+ROWS = {
+    "job_title_distribution": [("Engineer", 3)],
+    "experience_level_distribution": [("Senior", 2)],
+    "top_skills": [("Python", 4)],
+    "education_to_job_title": [("CS", "Engineer", 2), ("CS", "Analyst", 1)],
+}
+
+
+class FakeCursor:
+    def __init__(self, delays):
+        self.delays = delays
+
+    def execute(self, sql, params=None, timeout=None):
+        self.key = sql
+        time.sleep(self.delays.get(self.key, 0))
+
+    def fetchall(self):
+        return ROWS[self.key]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, delays, leased):
+        self.delays = delays
+        self.leased = leased
+
+    def cursor(self):
+        return FakeCursor(self.delays)
+
+    def close(self):
+        self.leased.append(threading.current_thread().name)
+
+
+def _fake_connections(monkeypatch, delays):
+    leased = []
+    monkeypatch.setattr(analytics, "section_query", lambda name, source, options: (name, []))
+    monkeypatch.setattr(analytics, "get_connection", lambda: FakeConnection(delays, leased))
+    return leased
+
+
+def test_sections_run_concurrently(monkeypatch):
+    leased = _fake_connections(monkeypatch, {key: 0.3 for key in ROWS})
+    started = time.time()
+    data, debug = run_sections(timeout=5)
+
+    assert time.time() - started < 1.0
+    assert len(leased) == 4
+    assert data["top_skills"] == [{"skill": "Python", "total_employees": 4}]
+    assert data["education_to_job_title"]["links"][1] == {"source": 0, "target": 2, "value": 1}
+    assert debug["source"] == analytics.ANALYTICS_SOURCE
+    assert set(debug["sections"]) == set(analytics.SECTIONS)
+    assert all(s["seconds"] >= 0.3 and s["rows"] for s in debug["sections"].values())
+
+
+def test_slow_section_times_out(monkeypatch):
+    _fake_connections(monkeypatch, {"top_skills": 1.5})
+    with pytest.raises(AnalyticsError) as error:
+        run_sections(timeout=0.3)
+
+    assert "top_skills: timed out" in str(error.value)
+    assert error.value.debug["sections"]["top_skills"]["seconds"] is None
+    assert error.value.debug["sections"]["job_title_distribution"]["rows"] == 1
+
+
+def test_build_sankey_reuses_nodes():
+    sankey = build_sankey([("CS", "Engineer", 2), ("Math", "Engineer", 1)])
+    assert [n["name"] for n in sankey["nodes"]] == ["CS", "Engineer", "Math"]
+    assert sankey["links"][1] == {"source": 2, "target": 1, "value": 1}
+
+
+def test_sankey_prunes_long_tail_into_other():
+    rows = [("CS", "Engineer", 5), (None, "Engineer", 3), ("Math", "Analyst", 1), ("Art", "Cook", 1)]
+    sankey = build_sankey(rows, max_nodes=2)
+    assert [n["name"] for n in sankey["nodes"]] == ["CS", "Engineer", "Other educations", "Other job titles"]
+    assert sankey["links"] == [
+        {"source": 0, "target": 1, "value": 5},
+        {"source": 2, "target": 1, "value": 3},
+        {"source": 2, "target": 3, "value": 2},
+    ]
+
+
+def test_options_are_validated_and_pushed_into_sql():
+    sections, options = parse_options(MultiDict())
+    assert options == DEFAULT_OPTIONS and len(sections) == 4
+
+    sections, options = parse_options(MultiDict([
+        ("sections", "top_skills,job_title_distribution"), ("top_n", "3"), ("job_title", "Engineer"),
+        ("skill", "Python"), ("skill", "SQL"), ("created_from", "2024-01-01"),
+    ]))
+    assert sections == ("job_title_distribution", "top_skills")
+    assert analytics.has_filters(options)
+    sql, params = scan_query("top_skills", options)
+    assert "LOWER(JOB_TITLE) IN (LOWER(%s))" in sql and sql.count("ARRAY_CONTAINS") == 2
+    assert sql.index("WHERE") < sql.index("GROUP BY") and "LIMIT %s" in sql
+    assert params == ["Engineer", "Python", "SQL", "2024-01-01", 3]
+
+    for bad in ({"sections": "salaries"}, {"top_n": "0"}, {"created_from": "yesterday"},
+                {"created_from": "2024-02-01", "created_to": "2024-01-01"}):
+        with pytest.raises(ValueError):
+            parse_options(MultiDict(bad))
@@ -0,0 +1,140 @@
+import time
+from datetime import timedelta
+
+from app.helpers.analytics import AnalyticsSnapshot
+
+
+class FakeTable:
+    """Stands in for Analytics_Snapshots: one row, read with SELECT and written with MERGE."""
+
+    def __init__(self):
+        self.row = None
+        self.corpus_version = 1
+        self.sql = ""
+
+    def connect(self):
+        return self
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        self.sql = sql
+        if sql.lstrip().startswith("MERGE"):
+            self.row = (params[1], params[2])
+
+    def fetchone(self):
+        if "Corpus_Version" in self.sql:
+            return (self.corpus_version,)
+        return self.row
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _snapshot(table, builds, **kwargs):
+    def compute():
+        builds.append(time.time())
+        return {"top_skills": [{"skill": "Python", "total_employees": len(builds)}]}, {"sections": {}}
+
+    return AnalyticsSnapshot(compute=compute, connect=table.connect, debounce=0.05, **kwargs)
+
+
+def _wait_idle(snapshot):
+    deadline = time.time() + 5
+    while snapshot.stats()["refreshing"] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_first_read_builds_then_hits():
+    table, builds = FakeTable(), []
+    snapshot = _snapshot(table, builds)
+
+    first, status = snapshot.get()
+    assert status == "MISS" and table.row is not None
+    second, status = snapshot.get()
+    assert status == "HIT" and second is first
+    assert len(builds) == 1
+
+    # Another process starts from the stored row without recomputing
+    other = _snapshot(table, [])
+    stored, status = other.get()
+    assert status == "HIT"
+    assert stored["sections"] == first["sections"]
+    assert stored["generated_at"] == first["generated_at"]
+
+
+def test_writes_serve_stale_and_rebuild_once_in_background():
+    table, builds = FakeTable(), []
+    snapshot = _snapshot(table, builds)
+    snapshot.get()
+
+    for _ in range(5):
+        snapshot.mark_stale()
+    stale, status = snapshot.get()
+    assert status == "STALE"
+    assert stale["sections"]["top_skills"][0]["total_employees"] == 1
+
+    _wait_idle(snapshot)
+    fresh, status = snapshot.get()
+    assert status == "HIT"
+    assert fresh["sections"]["top_skills"][0]["total_employees"] == 2
+    assert len(builds) == 2
+
+
+def test_aged_snapshot_reloads_newer_row_from_table():
+    table, builds = FakeTable(), []
+    writer = _snapshot(table, [])
+    reader = _snapshot(table, builds, max_age=60)
+    reader.get()
+    reader._snapshot["generated_at"] -= timedelta(seconds=120)
+
+    writer.mark_stale()
+    _wait_idle(writer)
+    _, status = reader.get()
+    assert status == "STALE"
+    _wait_idle(reader)
+
+    assert reader.stats()["reloads"] == 1
+    assert len(builds) == 1
+    assert reader._snapshot["generated_at"] == writer._snapshot["generated_at"]
+
+
+def test_write_from_another_process_is_seen_through_corpus_version():
+    table, builds = FakeTable(), []
+    snapshot = _snapshot(table, builds)
+    snapshot.get()
+
+    table.corpus_version += 1  # e.g. migration/bulk_load.py committed in its own process
+    stale, status = snapshot.get()
+    assert status == "STALE"
+    _wait_idle(snapshot)
+
+    fresh, status = snapshot.get()
+    assert status == "HIT"
+    assert fresh["corpus_version"] == 2
+    assert len(builds) == 2
+
+def test_sections_alone_are_served_from_the_snapshot(monkeypatch):
+    from datetime import datetime, timezone
+    from flask import Flask
+    import app.routes.analytics as analytics_route
+
+    snapshot = {'sections': {'top_skills': [], 'job_title_distribution': []}, 'debug': None,
+                'generated_at': datetime.now(timezone.utc)}
+    monkeypatch.setattr(analytics_route.analytics_snapshot, "get", lambda refresh=False: (snapshot, 'HIT'))
+
+    def run_sections(*args, **kwargs):
+        raise AssertionError("sections alone should not bypass the snapshot")
+
+    monkeypatch.setattr(analytics_route, "run_sections", run_sections)
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(analytics_route.analytics_bp)
+
+    response = flask_app.test_client().get('/api/analytics?sections=top_skills')
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'HIT'
+    assert set(response.get_json()) == {'top_skills', 'generated_at', 'stale'}
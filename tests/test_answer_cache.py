@@ -0,0 +1,50 @@
+import time
+from unittest.mock import MagicMock
+from app.helpers.answer_cache import AnswerCache, bump_corpus_version, corpus_version, normalize_question
+
+PARAMS = {"top_k": 5}
+
+def test_normalize_question():
+    assert normalize_question("  Who knows   PYTHON? ") == "who knows python"
+
+def test_exact_match_on_normalized_question():
+    cache = AnswerCache()
+    cache.put("Who knows Python?", PARAMS, {"answer": "Budi"}, 1)
+    assert cache.get("who knows python", PARAMS, 1) == {"answer": "Budi"}
+    assert cache.get("who knows python", {"top_k": 3}, 1) is None
+    stats = cache.stats()
+    assert stats['exact_hits'] == 1
+    assert stats['misses'] == 1
+
+def test_corpus_version_bump_invalidates_entries():
+    cache = AnswerCache()
+    cache.put("who knows python", PARAMS, {"answer": "Budi"}, 1)
+    # Another worker bumped Corpus_Version; the next lookup reads the new row
+    assert cache.get("who knows python", PARAMS, 2) is None
+    assert cache.get("who knows python", PARAMS, 1) is None
+    assert cache.stats()["corpus_version"] == 1
+
+def test_corpus_version_lives_in_the_database():
+    cursor = MagicMock()
+    cursor.fetchone.return_value = None
+    assert corpus_version(cursor) == 0
+    bump_corpus_version(cursor)
+    assert cursor.execute.call_args[0][0].split()[:3] == ["MERGE", "INTO", "Corpus_Version"]
+
+def test_ttl_and_lru_eviction():
+    cache = AnswerCache(max_entries=2, ttl=0.05)
+    cache.put("a", PARAMS, {"answer": 1}, 1)
+    cache.put("b", PARAMS, {"answer": 2}, 1)
+    cache.get("a", PARAMS, 1)
+    cache.put("c", PARAMS, {"answer": 3}, 1)
+    assert cache.get("b", PARAMS, 1) is None
+    assert cache.get("a", PARAMS, 1) == {"answer": 1}
+    time.sleep(0.06)
+    assert cache.get("a", PARAMS, 1) is None
+
+def test_semantic_match_above_threshold():
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put("who knows python", PARAMS, {"answer": "Budi"}, 1, embedding=[1.0, 0.0])
+    assert cache.get("which engineers know python", PARAMS, 1, embedding=[0.99, 0.05]) == {"answer": "Budi"}
+    assert cache.get("who knows java", PARAMS, 1, embedding=[0.0, 1.0]) is None
+    assert cache.stats()['semantic_hits'] == 1
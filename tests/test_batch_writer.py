@@ -0,0 +1,95 @@
+import json
+from app.helpers.batch_writer import BatchWriter
+
+
+class RecordingWriter(BatchWriter):
+    def __init__(self, *args, fail=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail = fail
+        self.batches_written = []
+
+    def write(self, rows):
+        if self.fail:
+            return 0
+        self.batches_written.append(list(rows))
+        return len(rows)
+
+def test_insert_sql_has_one_group_per_row():
+    writer = BatchWriter("LOGS", ["A", "B"])
+    assert writer._insert_sql(2) == "INSERT INTO LOGS (A, B) VALUES (%s, %s), (%s, %s)"
+
+def test_add_drops_rows_when_queue_is_full():
+    writer = RecordingWriter("LOGS", ["A"], batch_size=100, flush_interval=60, max_queue=2)
+    assert writer.add((1,)) and writer.add((2,))
+    assert writer.add((3,)) is False
+    stats = writer.stats()
+    assert stats['queued'] == 2
+    assert stats['dropped'] == 1
+
+def test_flush_writes_pending_rows():
+    writer = RecordingWriter("LOGS", ["A"], batch_size=100, flush_interval=60)
+    writer.add((1,))
+    writer.add((2,))
+    writer.flush()
+    assert writer.batches_written == [[(1,), (2,)]]
+    assert writer.stats()['queued'] == 0
+
+def test_failed_rows_go_to_fallback_and_are_replayed(tmp_path):
+    path = tmp_path / "fallback.jsonl"
+    writer = RecordingWriter("LOGS", ["A", "B"], batch_size=100, flush_interval=60,
+                             fallback_path=str(path), fail=True)
+    writer.add((1, "x"))
+    writer.flush()
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [[1, "x"]]
+
+    writer.fail = False
+    writer.add((2, "y"))
+    writer.flush()
+    assert writer.batches_written == [[(2, "y")], [(1, "x")]]
+    assert not path.exists()
+    assert writer.stats()['replayed'] == 1
+
+
+class FailingConnection:
+    """Autocommitting connection whose INSERT fails on the ``fail_at``-th statement."""
+
+    def __init__(self, fail_at):
+        self.fail_at = fail_at
+        self.inserted = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params):
+        if len(self.inserted) + 1 == self.fail_at:
+            raise RuntimeError("warehouse suspended")
+        self.inserted.append(params)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_partial_failure_saves_only_unwritten_batches(tmp_path, monkeypatch):
+    import app.db
+    conn = FailingConnection(fail_at=2)
+    monkeypatch.setattr(app.db, "get_connection", lambda: conn)
+    path = tmp_path / "fallback.jsonl"
+    writer = BatchWriter("LOGS", ["A"], batch_size=2, flush_interval=60, fallback_path=str(path))
+    monkeypatch.setattr(writer, "_ensure_thread", lambda: None)  # flush only when the test says so
+    for i in range(5):
+        writer.add((i,))
+    writer.flush()
+
+    assert conn.inserted == [[0, 1]]
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [[2], [3], [4]]
+    stats = writer.stats()
+    assert (stats['written'], stats['failed'], stats['batches'], stats['fallback_rows']) == (2, 3, 1, 3)
+
+    conn.fail_at = None
+    writer.add((5,))
+    writer.flush()
+    assert conn.inserted == [[0, 1], [5], [2, 3], [4]]
+    assert not path.exists()
+    assert writer.stats()['replayed'] == 3
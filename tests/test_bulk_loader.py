@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import MagicMock
+from app.helpers.bulk_loader import SnowflakeTarget, SqliteStandInTarget, bulk_load, stand_in_schema
+
+
+def employee(i, **extra):
+    return {"full_name": f"Name {i}", "email": f"e{i}@example.com", "job_title": "Engineer", **extra}
+
+
+def test_stand_in_schema_covers_employee_tables():
+    schema = stand_in_schema()
+    assert "CREATE TABLE Employees" in schema
+    assert "VECTOR" not in schema
+
+
+def test_dry_run_upserts_and_replaces_chunks():
+    target = SqliteStandInTarget()
+    report = bulk_load([employee(1, skills=["Python"]), employee(2), {"email": "missing@example.com"}], 1, target)
+    assert report["employees_inserted"] == 2
+    assert report["chunks_inserted"] == 3
+    assert report["skipped"][0]["row"] == 3
+
+    # Duplicate emails in one load: the last row wins; empty strings are kept
+    report = bulk_load([employee(1, job_title="Lead"), employee(1, job_title="Manager", profile="")], 1, target)
+    assert report["employees_updated"] == 1
+    assert report["chunks_deleted"] == 2
+    assert report["chunks_inserted"] == 1
+    row = target.conn.execute("SELECT job_title, profile FROM Employees WHERE email = 'e1@example.com'").fetchone()
+    assert row == ("Manager", "")
+    assert target.conn.execute("SELECT COUNT(*) FROM Content_Chunks").fetchone()[0] == 2
+
+
+def test_snowflake_target_stages_copies_and_merges_once():
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (2, 0)
+    cursor.rowcount = 0
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    report = bulk_load([employee(1), employee(2)], 1, SnowflakeTarget(conn, embed=False))
+    statements = [call.args[0].split()[0] for call in cursor.execute.call_args_list]
+    assert statements == ["CREATE", "CREATE", "CREATE", "PUT", "COPY", "PUT", "COPY", "BEGIN", "DELETE", "UPDATE", "SELECT", "MERGE", "SELECT", "DELETE", "INSERT", "MERGE", "DROP", "DROP", "REMOVE"]
+    assert report["employees_inserted"] == 2
+    conn.commit.assert_called_once()
+    cursor.close.assert_called_once()
+    copies = [call.args[0] for call in cursor.execute.call_args_list if call.args[0].startswith("COPY")]
+    assert all("ESCAPE_UNENCLOSED_FIELD = NONE" in sql for sql in copies)
+    merge = next(call.args[0] for call in cursor.execute.call_args_list if "MERGE INTO Employees" in call.args[0])
+    assert "ON target.id = source.target_id" in merge and " OR " not in merge.split("ON target.id")[1].split("WHEN")[0]
+
+
+def test_snowflake_target_embeds_only_the_loaded_employees(monkeypatch):
+    import app.helpers.bulk_loader as bulk_loader
+    embedded = []
+    monkeypatch.setattr(bulk_loader, "embed_chunks", lambda cursor, ids: embedded.append(list(ids)) or len(ids))
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (2, 0)
+    cursor.fetchall.side_effect = lambda: [(11,), (12,)] if "SELECT id FROM Employees" in cursor.execute.call_args[0][0] else []
+    cursor.rowcount = 0
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    report = bulk_load([employee(1), employee(2)], 1, SnowflakeTarget(conn, embed=True))
+    assert embedded == [[11, 12]]
+    assert report["chunks_embedded"] == 2
+
+
+def test_snowflake_target_drops_load_tables_when_the_load_fails():
+    def execute(sql, *args):
+        if "MERGE" in sql:
+            raise RuntimeError("merge failed")
+
+    cursor = MagicMock()
+    cursor.execute.side_effect = execute
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    with pytest.raises(RuntimeError):
+        bulk_load([employee(1)], 1, SnowflakeTarget(conn, embed=False))
+    conn.rollback.assert_called_once()
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert statements[-3:] == ["DROP TABLE IF EXISTS employees_load", "DROP TABLE IF EXISTS chunks_load", "REMOVE @bulk_load_stage"]
@@ -0,0 +1,56 @@
+from app.helpers.chunking import compile_to_chunk, diff_chunks, sync_chunks
+
+
+def employee(**extra):
+    return {"full_name": "Ada", "email": "ada@example.com", "job_title": "Engineer",
+            "skills": ["Python"], "educations": [{"degree": "BSc"}, {"degree": "MSc"}], **extra}
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql.split()[0], list(params)))
+
+    def executemany(self, sql, rows):
+        self.executed.append((sql.split()[0], list(rows)))
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_chunks_have_stable_keys():
+    chunks = compile_to_chunk(employee(), employee_id=1, user_id=1)
+    education = [c for c in chunks if c["type"] == "EDUCATION"]
+    assert [c["ordinal"] for c in education] == [0, 1]
+    assert chunks == compile_to_chunk(employee(), employee_id=1, user_id=1)
+
+
+def test_diff_keeps_unchanged_chunks():
+    old = compile_to_chunk(employee(), employee_id=1, user_id=1)
+    new = compile_to_chunk(employee(skills=["Python", "SQL"], educations=[{"degree": "BSc"}]), employee_id=1, user_id=1)
+    existing = [(100 + i, c["type"], c["ordinal"], c["content_hash"]) for i, c in enumerate(old)]
+    existing.append((999, "SKILLS", None, None))  # legacy row written before ordinals
+
+    inserts, updates, delete_ids, unchanged = diff_chunks(existing, new)
+    skills_id = next(row[0] for row in existing if row[1] == "SKILLS")
+    second_education_id = next(row[0] for row in existing if row[1] == "EDUCATION" and row[2] == 1)
+    assert inserts == []
+    assert [(chunk_id, chunk["type"]) for chunk_id, chunk in updates] == [(skills_id, "SKILLS")]
+    assert sorted(delete_ids) == sorted([999, second_education_id])
+    assert unchanged == len(new) - 1
+
+
+def test_sync_writes_only_changed_rows():
+    chunks = compile_to_chunk(employee(), employee_id=1, user_id=1)
+    rows = [(100 + i, 1, c["type"], c["ordinal"], c["content_hash"]) for i, c in enumerate(chunks)]
+    cursor = FakeCursor(rows)
+    assert sync_chunks(cursor, {1: chunks}) == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": len(chunks)}
+    assert [statement for statement, _ in cursor.executed] == ["SELECT"]
+
+    cursor = FakeCursor([])
+    stats = sync_chunks(cursor, {1: chunks})
+    assert stats["inserted"] == len(chunks)
+    assert [statement for statement, _ in cursor.executed] == ["SELECT", "INSERT"]
@@ -0,0 +1,56 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import app.helpers.cv_extraction as cv_extraction
+from app.helpers.cv_extraction import RateLimiter, extract_files
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), 'pdf', 'CV-IntanPermataSari-BusinessAnalyst.pdf')
+
+
+def read_pdf():
+    with open(PDF_PATH, 'rb') as f:
+        return f.read()
+
+
+def test_results_keep_order_and_isolate_failures(monkeypatch):
+    monkeypatch.setattr(cv_extraction, "get_parse_pool", lambda: cv_extraction._InlineExecutor())
+    monkeypatch.setattr(cv_extraction, "gemini_rate_limiter", RateLimiter(per_minute=0))
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def generate(text):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if "Intan" not in text:
+            raise ValueError("unexpected text")
+        return {"full_name": "Intan Permata Sari"}
+
+    pdf = read_pdf()
+    files = [("a.pdf", pdf), ("broken.pdf", b"not a pdf"), ("c.pdf", pdf), ("d.pdf", pdf)]
+    results = extract_files(files, generate)
+
+    assert [r["filename"] for r in results] == ["a.pdf", "broken.pdf", "c.pdf", "d.pdf"]
+    assert "error" in results[1] and "data" not in results[1]
+    assert all(r["data"]["full_name"] == "Intan Permata Sari" for r in results if r["filename"] != "broken.pdf")
+    assert set(results[0]["timings"]) == {"parse", "parse_wait", "rate_limit_wait", "llm", "total"}
+    assert peak[0] > 1  # Gemini calls overlapped
+
+
+def test_parse_runs_in_a_process_pool():
+    pool = cv_extraction.get_parse_pool()
+    assert isinstance(pool, ProcessPoolExecutor)
+    text, seconds, report = pool.submit(cv_extraction.parse_pdf, read_pdf()).result(timeout=120)
+    assert "Intan" in text
+    assert seconds >= 0
+    assert report["contacts"]["emails"] == ["intan.ba@gmail.com"]
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(per_minute=600)  # one call per 0.1s
+    waits = [limiter.acquire() for _ in range(3)]
+    assert waits[0] == 0
+    assert 0.15 < sum(waits) < 0.5
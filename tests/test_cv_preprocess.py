@@ -0,0 +1,61 @@
+from app.helpers.cv_preprocess import extract_contacts, preprocess_cv
+
+
+def test_contacts_are_found_without_mistaking_dates_for_phones():
+    contacts = extract_contacts(
+        "Ada Lovelace | ada@example.com | +44 20 7946 0958 | linkedin.com/in/ada | https://ada.dev\n"
+        "Analyst, 2016 - 2020, ada@example.com"
+    )
+    assert contacts == {
+        "emails": ["ada@example.com"],
+        "phones": ["+44 20 7946 0958"],
+        "urls": ["linkedin.com/in/ada", "https://ada.dev"],
+    }
+
+
+def test_page_furniture_is_removed_and_contacts_collected():
+    pages = [
+        "Ada Lovelace - Curriculum\nada@example.com | www.ada.dev\nSKILLS\nSQL\nPython\nPage 1 of 2",
+        "Ada Lovelace - Curriculum\nEXPERIENCE\nSQL\nAnalyst\nReferences available upon request\n2",
+    ]
+    text, report = preprocess_cv(pages)
+    assert text.splitlines() == [
+        "Contact: ada@example.com | www.ada.dev",
+        "Ada Lovelace - Curriculum",
+        "SKILLS",
+        "SQL",
+        "Python",
+        "EXPERIENCE",
+        "SQL",  # repeated, but not at the edge of a page
+        "Analyst",
+    ]
+    assert report["lines_removed"] == 5
+    assert report["tokens_after"] < report["tokens_before"]
+    assert report["truncated"] is False
+
+
+def test_text_is_cut_to_the_token_budget():
+    text, report = preprocess_cv(["\n".join(f"Line number {i} of the CV" for i in range(100))], token_budget=50)
+    assert report["truncated"] is True
+    assert report["tokens_after"] <= 50
+    assert text.splitlines()[0] == "Line number 0 of the CV"
+
+
+def test_years_on_their_own_line_are_kept():
+    pages = [
+        "Ada Lovelace\n1\nEDUCATION\nBSc Mathematics\n2018\nEXPERIENCE\nAnalyst\n09/2020\n2020\nPage 1/2",
+        "Engineer\n2021\n2 of 2",
+    ]
+    text, _ = preprocess_cv(pages)
+    assert text.splitlines() == [
+        "Ada Lovelace",
+        "EDUCATION",
+        "BSc Mathematics",
+        "2018",
+        "EXPERIENCE",
+        "Analyst",
+        "09/2020",
+        "2020",  # at the bottom of the page, but not its page number
+        "Engineer",
+        "2021",
+    ]
@@ -0,0 +1,114 @@
+import threading
+import time
+import pytest
+from app.db import ConnectionPool, PoolTimeout, PooledConnection
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise RuntimeError("connection lost")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool(connect=connect, **kwargs), created
+
+def test_pool_reuses_released_connection():
+    pool, created = make_pool(max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert len(created) == 1
+
+def test_pool_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+
+def test_pool_waiter_gets_released_connection():
+    pool, created = make_pool(max_size=1, timeout=2)
+    conn = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(conn,)).start()
+    assert pool.acquire() is conn
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['max_wait_seconds'] > 0
+    assert len(created) == 1
+
+def test_pool_replaces_unhealthy_connection():
+    pool, created = make_pool(max_size=2, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.broken = True
+    fresh = pool.acquire()
+    assert fresh is not conn
+    assert conn.closed
+    assert pool.stats()['health_check_failures'] == 1
+
+def test_pool_recycles_connections_past_max_lifetime():
+    pool, created = make_pool(max_size=2, max_lifetime=0.01)
+    conn = pool.acquire()
+    time.sleep(0.02)
+    pool.release(conn)
+    assert conn.closed
+    assert pool.stats()['idle'] == 0
+
+def test_pool_evicts_idle_connections_above_min_size():
+    pool, created = make_pool(min_size=1, max_size=3, idle_timeout=0.01)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    time.sleep(0.02)
+    pool.acquire()
+    assert sum(conn.closed for conn in created) == 1
+
+def test_request_scoped_connection_ignores_close():
+    pool, _ = make_pool(max_size=1)
+    conn = PooledConnection(pool, pool.acquire(), request_scoped=True)
+    conn.close()
+    assert pool.stats()['in_use'] == 1
+    conn.release()
+    assert pool.stats()['in_use'] == 0
+
+def test_get_connection_shares_one_connection_per_request(app, monkeypatch):
+    from app import db
+    pool, created = make_pool(max_size=2)
+    monkeypatch.setattr(db, 'pool', pool)
+    with app.test_request_context('/'):
+        assert db.get_connection() is db.get_connection()
+        assert pool.stats()['in_use'] == 1
+    assert pool.stats()['in_use'] == 0
+    assert len(created) == 1
@@ -0,0 +1,133 @@
+import json
+from unittest.mock import MagicMock
+import app.routes.employees as employees
+
+
+class FakeCursor:
+    rowcount = 0
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.statements = []
+        self.chunk_rows = []
+
+    def execute(self, sql, params=()):
+        self.statements.append(sql.split()[0])
+        self.sql = sql
+        self.params = params
+        if self.fail_on and self.fail_on in json.dumps(params, default=str):
+            raise RuntimeError("merge failed")
+
+    def executemany(self, sql, rows):
+        self.chunk_rows.extend(rows)
+
+    def fetchall(self):
+        if "educations FROM Employees" in self.sql:
+            return []  # analytics counter state: employees are new
+        if self.statements[-1] == "SELECT" and "@" not in str(self.params):
+            return []  # existing chunks: none stored yet
+        # SELECT id, email ... WHERE email IN (...)
+        return [(int(email.split("@")[0][1:]), email) for email in self.params]
+
+    def close(self):
+        pass
+
+
+def employee_line(i, **extra):
+    return json.dumps({"full_name": f"Name {i}", "email": f"e{i}@example.com", "job_title": "Engineer", **extra})
+
+
+def test_merge_batch_maps_ids_by_email(monkeypatch):
+    monkeypatch.setattr(employees, "embed_chunks", lambda cursor, ids: len(ids))
+    cursor = FakeCursor()
+    batch = [employees._prepare_employee(json.loads(employee_line(i)), user_id=1)[0] for i in (3, 7)]
+    results, chunk_stats = employees._merge_employee_batch(cursor, batch, user_id=1)
+    assert [r["employee_id"] for r in results] == [3, 7]
+    assert cursor.statements == ["UPDATE", "SELECT", "MERGE", "SELECT", "SELECT", "SELECT"]
+    assert {row[0] for row in cursor.chunk_rows} == {3, 7}
+    assert chunk_stats["inserted"] == len(cursor.chunk_rows)
+    assert chunk_stats["deleted"] == chunk_stats["updated"] == 0
+
+
+def test_ndjson_import_commits_each_batch_and_isolates_failures(monkeypatch):
+    monkeypatch.setattr(employees, "embed_chunks", lambda cursor, ids: len(ids))
+    cursor = FakeCursor(fail_on="e5@example.com")
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    monkeypatch.setattr(employees, "get_connection", lambda: conn)
+
+    lines = [employee_line(i) for i in range(1, 6)] + ["{not json", json.dumps({"email": "x@example.com"})]
+    output = [json.loads(line) for line in employees._import_ndjson(iter(lines), batch_size=2, user_id=1)]
+
+    batches, summary = output[:-1], output[-1]
+    assert [b["rows"] for b in batches] == [2, 2, 2, 1]
+    assert batches[2]["results"][0]["line"] == 6
+    assert batches[2]["results"][1]["status"] == "failed"  # e5 batch rolled back
+    assert summary == {"done": True, "rows": 7, "succeeded": 4, "failed": 3, "batches": 4}
+    assert conn.commit.call_count == 2
+    assert conn.rollback.call_count == 1
+
+
+class TransactionalCursor(FakeCursor):
+    """Autocommits like a pooled Snowflake connection until BEGIN, then buffers until commit."""
+
+    def __init__(self, fail_on=None):
+        super().__init__(fail_on)
+        self.in_transaction = False
+        self.pending = []
+        self.committed = []
+
+    def execute(self, sql, params=()):
+        super().execute(sql, params)
+        if sql.strip() == "BEGIN":
+            self.in_transaction = True
+        elif self.in_transaction:
+            self.pending.append(sql)
+        else:
+            self.committed.append(sql)
+
+    def fetchall(self):
+        if "educations FROM Employees" in self.sql:
+            # Employees exist once the batch's MERGE has run
+            merged = any("merge into employees" in sql.lower() for sql in self.pending)
+            return [("Engineer", '["Python"]', None)] * len(self.params) if merged else []
+        return super().fetchall()
+
+
+class TransactionalConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self._cursor.committed += self._cursor.pending
+        self._cursor.pending, self._cursor.in_transaction = [], False
+
+    def rollback(self):
+        self._cursor.pending, self._cursor.in_transaction = [], False
+
+    def close(self):
+        pass
+
+
+def test_failed_batch_leaves_analytics_counters_unchanged(monkeypatch):
+    def embed_chunks(cursor, ids):
+        if 3 in ids:
+            raise RuntimeError("embedding failed")
+        return len(ids)
+
+    monkeypatch.setattr(employees, "embed_chunks", embed_chunks)
+    cursor = TransactionalCursor()
+    monkeypatch.setattr(employees, "get_connection", lambda: TransactionalConnection(cursor))
+
+    lines = [employee_line(i) for i in range(1, 5)]
+    output = [json.loads(line) for line in employees._import_ndjson(iter(lines), batch_size=2, user_id=1)]
+
+    assert [b["succeeded"] for b in output[:-1]] == [2, 0]
+    counter_merges = [sql for sql in cursor.committed if "Analytics_Counters" in sql]
+    # Only the first batch's deltas survive; the second batch's MERGE and counters were rolled back
+    assert len(counter_merges) == 1
+    assert sum("merge into employees" in sql.lower() for sql in cursor.committed) == 1
+    assert cursor.pending == []
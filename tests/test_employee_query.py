@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import MagicMock
+from app.helpers import employee_query
+from app.helpers.employee_query import (
+    build_page_query, count_employees, make_cursor, parse_cursor, parse_fields, to_employee
+)
+
+def test_parse_fields_always_includes_keyset_columns_and_rejects_unknown():
+    assert parse_fields(None) == ["id", "full_name", "job_title", "email", "file_url"]
+    assert parse_fields("skills, job_title") == ["id", "full_name", "skills", "job_title"]
+    with pytest.raises(ValueError):
+        parse_fields("file_data")
+
+def test_cursor_round_trip_with_comma_in_name():
+    cursor = make_cursor({"full_name": "Doe, Jane", "id": 42})
+    assert parse_cursor(cursor) == ("Doe, Jane", 42)
+    with pytest.raises(ValueError):
+        parse_cursor("Jane")
+
+def test_build_page_query_pushes_filters_and_keyset_into_sql():
+    sql, params = build_page_query(["id", "full_name"], job_title="Engineer", user_id=3,
+                                   after=("Budi", 7), limit=20)
+    assert sql == (
+        "SELECT id, full_name FROM employees WHERE LOWER(job_title) = LOWER(%s) AND user_id = %s"
+        " AND (full_name > %s OR (full_name = %s AND id > %s)) ORDER BY full_name ASC, id ASC LIMIT %s"
+    )
+    assert params == ["Engineer", 3, "Budi", "Budi", 7, 21]
+
+def test_to_employee_decodes_variant_columns():
+    assert to_employee(["id", "skills"], (1, '["Python"]')) == {"id": 1, "skills": ["Python"]}
+
+def test_count_is_cached_until_employee_write():
+    employee_query._count_cache.clear()
+    version = [1]
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = lambda: (version[0],) if "Corpus_Version" in cursor.execute.call_args[0][0] else (12,)
+    assert count_employees(cursor, "Engineer") == 12
+    assert count_employees(cursor, "engineer") == 12
+    counts = lambda: sum("COUNT(*)" in call.args[0] for call in cursor.execute.call_args_list)
+    assert counts() == 1
+    version[0] = 2  # bumped by a write in another process
+    count_employees(cursor, "Engineer")
+    assert counts() == 2
@@ -0,0 +1,56 @@
+import queue as queue_module
+import threading
+from app.helpers.evaluation_queue import EvaluationQueue
+
+
+def wait_for(queue, evaluation_id, statuses=("done", "failed")):
+    for _ in range(200):
+        status = queue.get(evaluation_id)
+        if status and status['status'] in statuses:
+            return status
+        threading.Event().wait(0.01)
+    raise AssertionError(f"Evaluation {evaluation_id} did not finish")
+
+def test_submit_returns_id_and_runs_in_background():
+    queue = EvaluationQueue(lambda evaluation_id, payload: {"relevance": len(payload["answer"])})
+    evaluation_id = queue.submit({"answer": "abc"})
+    status = wait_for(queue, evaluation_id)
+    assert status['status'] == 'done'
+    assert status['scores'] == {"relevance": 3}
+
+def test_failed_evaluation_is_reported():
+    def evaluate(evaluation_id, payload):
+        raise RuntimeError("cortex unavailable")
+
+    queue = EvaluationQueue(evaluate)
+    status = wait_for(queue, queue.submit({}))
+    assert status['status'] == 'failed'
+    assert status['error'] == 'cortex unavailable'
+    assert queue.stats()['failed'] == 1
+
+def test_sample_rate_zero_skips_evaluation():
+    queue = EvaluationQueue(lambda *args: {}, sample_rate=0.0)
+    assert queue.submit({}) is None
+    assert queue.stats()['skipped'] == 1
+
+def test_full_queue_drops_submission():
+    release = threading.Event()
+    queue = EvaluationQueue(lambda *args: release.wait(1), workers=1, max_pending=1)
+    queue.submit({})
+    statuses = [queue.get(queue.submit({}))['status'] for _ in range(3)]
+    release.set()
+    assert 'dropped' in statuses
+    assert queue.stats()['dropped'] >= 1
+
+def test_fast_worker_status_is_not_overwritten_by_pending():
+    class FinishingQueue(queue_module.Queue):
+        """Lets the worker finish the job before submit() carries on."""
+        def put_nowait(self, item):
+            super().put_nowait(item)
+            self.join()
+
+    queue = EvaluationQueue(lambda *args: {"relevance": 1}, workers=1)
+    queue._queue = FinishingQueue()
+    evaluation_id = queue.submit({})
+    assert queue.get(evaluation_id)['status'] == 'done'
+    assert queue.stats()['submitted'] == 1
@@ -0,0 +1,67 @@
+import app.routes.documents as documents
+from app.helpers.extraction_cache import ExtractionCache, extraction_key
+
+
+def test_key_covers_pdf_prompt_model_and_parse_settings():
+    key = extraction_key(b"%PDF", "prompt", "model-a", "v1:pages=10")
+    assert key == extraction_key(b"%PDF", "prompt", "model-a", "v1:pages=10")
+    assert key != extraction_key(b"%PDF", "prompt v2", "model-a", "v1:pages=10")
+    assert key != extraction_key(b"%PDF", "prompt", "model-b", "v1:pages=10")
+    assert key != extraction_key(b"%PDF-2", "prompt", "model-a", "v1:pages=10")
+    assert key != extraction_key(b"%PDF", "prompt", "model-a", "v1:pages=5")
+    assert key != extraction_key(b"%PDF", "prompt", "model-a", "v2:pages=10")
+
+
+
+def test_parse_settings_follow_the_preprocessing_config(monkeypatch):
+    import app.helpers.cv_extraction as cv_extraction
+    before = cv_extraction.parse_settings()
+    monkeypatch.setattr(cv_extraction, "CV_TOKEN_BUDGET", 1000)
+    assert cv_extraction.parse_settings() != before
+    monkeypatch.undo()
+    monkeypatch.setattr(cv_extraction, "CV_MAX_PAGES", 2)
+    assert cv_extraction.parse_settings() != before
+
+
+def test_hits_refresh_and_eviction(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "extractions.sqlite3"), max_bytes=50)
+    assert cache.get("a") is None
+    cache.put("a", {"full_name": "Ada"})
+    assert cache.get("a") == {"full_name": "Ada"}
+    assert cache.get("a", refresh=True) is None
+
+    cache.put("b", {"full_name": "Bob"})
+    cache.get("a")  # a is now the most recently used
+    cache.put("c", {"full_name": "Cyd"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"full_name": "Ada"}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["refreshes"], stats["evictions"]) == (3, 2, 1, 1)
+    assert stats["bytes"] <= 50
+
+    # Entries survive a new process opening the same file
+    assert ExtractionCache(cache.path).get("c") == {"full_name": "Cyd"}
+
+
+def test_reuploaded_cv_skips_extraction(tmp_path, monkeypatch):
+    monkeypatch.setattr(documents, "extraction_cache", ExtractionCache(str(tmp_path / "extractions.sqlite3")))
+    monkeypatch.setattr(documents, "_gemini_model", lambda api_key: None)
+    calls = []
+
+    def fake_extract_files(files, generate):
+        calls.append([name for name, _ in files])
+        return [{"filename": name, "data": {"email": f"{name}@x"}, "timings": {}} if data != b"bad"
+                else {"filename": name, "error": "boom", "timings": {}} for name, data in files]
+
+    monkeypatch.setattr(documents, "extract_files", fake_extract_files)
+    files = [("a", b"pdf-a"), ("bad", b"bad"), ("b", b"pdf-b")]
+    first = documents._extract(files, "key")
+    second = documents._extract(files, "key")
+    refreshed = documents._extract(files[:1], "key", refresh=True)
+
+    assert calls == [["a", "bad", "b"], ["bad"], ["a"]]
+    assert [r["cached"] for r in first] == [False, False, False]
+    assert [r["cached"] for r in second] == [True, False, True]
+    assert second[2]["data"] == {"email": "b@x"}
+    assert refreshed[0]["cached"] is False
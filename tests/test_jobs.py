@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from app.helpers.jobs import JobQueue, JobQueueFull, JobStore
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_run_by_priority_and_record_partial_results(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+    gate, order = threading.Event(), []
+
+    def handler(job):
+        if job.payload.get("block"):
+            gate.wait(5)
+        order.append(job.payload["name"])
+        for i in range(job.done, 3):
+            job.progress(done=i + 1, total=3, results=[{"item": i}])
+        return {"name": job.payload["name"]}
+
+    queue.register("work", handler)
+    first = queue.submit("work", {"name": "first", "block": True})
+    low = queue.submit("work", {"name": "low"}, priority="low")
+    high = queue.submit("work", {"name": "high"}, priority="high")
+    gate.set()
+
+    job = wait_for(queue, low["id"])
+    wait_for(queue, first["id"])
+    wait_for(queue, high["id"])
+    assert order == ["first", "high", "low"]
+    assert job["summary"] == {"name": "low"}
+    assert (job["done"], job["total"]) == (3, 3)
+    assert job["results"] == [{"item": 0}, {"item": 1}, {"item": 2}]
+    assert queue.get(low["id"], results_offset=2)["results"] == [{"item": 2}]
+
+
+def test_failures_are_recorded_and_unknown_kinds_rejected(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+    queue.register("boom", lambda job: 1 / 0)
+    job = wait_for(queue, queue.submit("boom", {})["id"])
+    assert job["status"] == "failed"
+    assert "division" in job["error"]
+    with pytest.raises(ValueError):
+        queue.submit("missing", {})
+
+
+def test_queue_is_bounded(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1, max_pending=1)
+    gate = threading.Event()
+    queue.register("wait", lambda job: gate.wait(5))
+    queue.submit("wait", {})
+    time.sleep(0.1)  # the worker takes the first job
+    queue.submit("wait", {})
+    with pytest.raises(JobQueueFull):
+        queue.submit("wait", {})
+    gate.set()
+    assert queue.stats()["rejected"] == 1
+
+
+def test_interrupted_job_resumes_after_last_progress(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    record = store.create("work", {"items": [1, 2, 3]}, user_id=7)
+    store.claim(record["id"], "gone-host:1")
+    store.progress(record["id"], done=1, results=[{"item": 1}])
+
+    # A new process opens the same store and picks the job up where it stopped
+    queue = JobQueue(JobStore(path), workers=1)
+    seen = []
+
+    def handler(job):
+        for item in job.payload["items"][job.done:]:
+            seen.append(item)
+            job.progress(done=job.done + 1, results=[{"item": item}])
+
+    queue.register("work", handler)
+    assert queue.resume() == 1
+    job = wait_for(queue, record["id"])
+    assert seen == [2, 3]
+    assert job["status"] == "done"
+    assert job["attempts"] == 2
+    assert [r["item"] for r in job["results"]] == [1, 2, 3]
+
+
+def test_uploaded_files_are_kept_until_the_job_finishes(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+    seen = []
+
+    def handler(job):
+        with open(job.payload["files"][0]["path"], "rb") as f:
+            seen.append(f.read())
+
+    queue.register("upload", handler)
+    job = wait_for(queue, queue.submit("upload", {}, files=[("cv.pdf", b"%PDF-1.4")])["id"])
+    assert job["payload"]["files"][0]["filename"] == "cv.pdf"
+    assert seen == [b"%PDF-1.4"]
+    assert not (tmp_path / "jobs_files" / job["id"]).exists()
@@ -0,0 +1,50 @@
+import os
+import time
+from app.helpers.pdf_cache import PdfCache, sha256_hex
+
+def test_put_is_content_addressed(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1000)
+    sha = cache.put(b"%PDF-1 a")
+    assert sha == sha256_hex(b"%PDF-1 a")
+    assert cache.put(b"%PDF-1 a") == sha
+    assert os.listdir(tmp_path) == [f"{sha}.pdf"]
+    assert cache.get(sha) == str(tmp_path / f"{sha}.pdf")
+    assert cache.get(None) is None
+    assert cache.stats()["hits"] == 1
+
+def test_evicts_least_recently_used_past_max_bytes(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    first = cache.put(b"a" * 10)
+    second = cache.put(b"b" * 10)
+    old = time.time() - 60
+    os.utime(cache.path(first), (old, old))
+    os.utime(cache.path(second), (old - 60, old - 60))
+    cache.get(second)  # touching makes `first` the oldest
+    third = cache.put(b"c" * 10)
+    assert cache.get(first) is None
+    assert cache.get(second) and cache.get(third)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 20
+
+def test_put_chunks_hashes_while_streaming(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1000)
+    sha = cache.put_chunks(iter([b"%PDF", b"-1 ", b"a"]))
+    assert sha == sha256_hex(b"%PDF-1 a")
+    with open(cache.path(sha), "rb") as f:
+        assert f.read() == b"%PDF-1 a"
+    assert cache.put_chunks([b"%PDF-1 a"]) == sha
+    assert [name for name in os.listdir(tmp_path)] == [f"{sha}.pdf"]
+
+def test_eviction_leaves_files_the_cache_does_not_own(tmp_path):
+    legacy = tmp_path / "employee_102_20250502_015920.pdf"
+    legacy.write_bytes(b"x" * 100)
+    old = time.time() - 3600
+    os.utime(legacy, (old, old))
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    first = cache.put(b"a" * 10)
+    os.utime(cache.path(first), (old + 60, old + 60))
+    cache.put(b"b" * 10)
+    cache.put(b"c" * 10)
+    assert legacy.exists()
+    assert cache.get(first) is None
+    assert cache.stats()["bytes"] == 20
@@ -0,0 +1,22 @@
+import os
+import pytest
+from app.helpers.pdf_text import extract_pdf_text, iter_page_text, normalize_text
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), 'pdf', 'CV-IntanPermataSari-BusinessAnalyst.pdf')
+
+
+def test_normalize_collapses_whitespace_bullets_and_hyphenation():
+    text = "  \ufb01nance   team \n\n\n\u2022 Led\tre\u00adporting\ncustomer-\ncentric solutions \n\uf0b7 SQL\n-5% cost"
+    assert normalize_text(text) == "finance team\n- Led reporting\ncustomer-centric solutions\n- SQL\n-5% cost"
+
+
+def test_extracts_in_memory_with_page_cap():
+    with open(PDF_PATH, 'rb') as f:
+        data = f.read()
+    text = extract_pdf_text(data)
+    assert text.startswith("Intan Permata Sari")
+    assert "intan.ba@gmail.com" in text
+    assert "  " not in text
+    assert list(iter_page_text(data, max_pages=0)) == []
+    with pytest.raises(ValueError):
+        extract_pdf_text(data, max_pages=0)
@@ -22,10 +22,14 @@ def test_handle_rag(client, auth_headers, monkeypatch):
     
     # Create mock cursor and connection
     mock_cursor = MagicMock()
+    # Retrieval - (employee_id, employee_score, chunk_text, chunk_score) rows
+    mock_cursor.fetchall.return_value = [
+        (7, 0.91, "SKILLS of Budi: Python, Flask", 0.91),
+        (7, 0.91, "INFORMATION of Budi: Backend Engineer", 0.72),
+        (3, 0.64, "SKILLS of Sari: Go, PostgreSQL", 0.64),
+    ]
     mock_cursor.fetchone.side_effect = [
-        # First call - context
-        ["Sample context about employees and their skills"],
-        # Second call - response
+        # Generated response
         ["This is a generated response based on the context"]
     ]
     
@@ -53,4 +57,6 @@ def test_handle_rag(client, auth_headers, monkeypatch):
     data = json.loads(response.data)
     assert 'answer' in data
     assert 'evaluation' in data
-    assert data['answer'] == "This is a generated response based on the context"
\ No newline at end of file
+    assert data['answer'] == "This is a generated response based on the context"
+    assert [e['employee_id'] for e in data['retrieval']['employees']] == [7, 3]
+    assert data['retrieval']['employees'][0]['score'] == 0.91
\ No newline at end of file
@@ -0,0 +1,45 @@
+import re
+
+from app.helpers.retrieval import assemble_context, estimate_tokens, retrieve_employees_sql
+
+
+def employee(employee_id, score, *texts):
+    return {"employee_id": employee_id, "score": score,
+            "chunks": [{"chunk_text": text, "score": score} for text in texts]}
+
+def test_assemble_context_takes_best_chunk_of_each_employee_first():
+    employees = [employee(1, 0.9, "a" * 40, "b" * 40), employee(2, 0.8, "c" * 40)]
+    context, used, summary = assemble_context(employees, token_budget=20)
+    assert context == "a" * 40 + "\n" + "c" * 40
+    assert used == 20
+    assert summary == [
+        {"employee_id": 1, "score": 0.9, "chunks_used": 1},
+        {"employee_id": 2, "score": 0.8, "chunks_used": 1},
+    ]
+
+def test_assemble_context_skips_chunks_over_budget():
+    employees = [employee(1, 0.9, "a" * 400), employee(2, 0.8, "short")]
+    context, used, summary = assemble_context(employees, token_budget=10)
+    assert context == "short"
+    assert used == estimate_tokens("short")
+    assert summary[0]["chunks_used"] == 0
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+    def fetchall(self):
+        return [(7, 0.9, "Python", 0.9)]
+
+def test_sql_retrieval_qualifies_embedding_columns():
+    cursor = RecordingCursor()
+    employees = retrieve_employees_sql(cursor, "who knows python", 5, "max", 3)
+    sql, params = cursor.statements[0]
+    scored = sql[sql.index("scored AS"):sql.index("ranked AS")]
+    # CONTENT_CHUNKS and the question CTE are both in scope here
+    assert re.findall(r"(?<![.\w])embedding(?:_model)?\b", scored) == []
+    assert sql.count("%s") == len(params)
+    assert employees == [{"employee_id": 7, "score": 0.9, "chunks": [{"chunk_text": "Python", "score": 0.9}]}]
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+import app.routes.employees as employees
+from app.helpers.skills import SkillNormalizer, load_skill_aliases, normalize_skills
+from migration.backfill_skills import backfill_skills
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("python3", ["Python"]),
+    ("Python (Advanced)", ["Python"]),
+    ("Advanced Python programming", ["Python"]),
+    ("ReactJS", ["React"]),
+    ("Node JS", ["Node.js"]),
+    ("Angular 12", ["Angular"]),
+    ("C#", ["C#"]),
+    ("Python/Django", ["Python", "Django"]),
+    ("CI/CD", ["CI/CD"]),
+    ("TCP/IP", ["TCP/IP"]),
+    ("Team Leadership (Strong)", ["Team Leadership"]),
+    ("GitHub", ["GitHub"]),
+    ("Git", ["Git"]),
+    ("tf", ["tf"]),
+    ("PM", ["PM"]),
+    ("Spring Framework", ["Spring"]),
+    ("Spring Boot", ["Spring Boot"]),
+    ("TDD", ["Test-Driven Development"]),
+])
+def test_skills_map_to_canonical_names(raw, expected):
+    assert normalize_skills([raw]) == expected
+
+
+def test_lists_are_deduplicated_and_dictionary_can_be_extended(tmp_path):
+    assert normalize_skills(["Python", "python3", "Python (Advanced)", "SQL", "sql"]) == ["Python", "SQL"]
+    assert normalize_skills(None) is None
+
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"Prosterio": ["prosterio platform"], "Python": ["snake"]}))
+    normalizer = SkillNormalizer(load_skill_aliases(str(path)))
+    assert normalizer.normalize_list(["Prosterio Platform", "snake", "python3"]) == ["Prosterio", "Python"]
+
+    employee, _ = employees._prepare_employee(
+        {"full_name": "A", "email": "a@example.com", "job_title": "Dev", "skills": ["golang", "Go"]}, user_id=1
+    )
+    assert employee["skills"] == ["golang", "Go"] and employee["skills_normalized"] == ["Go"]
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql.split()[0], params))
+
+    def fetchall(self):
+        statement, params = self.statements[-1]
+        if statement == "SELECT" and len(self.statements) == 1:
+            return self.rows
+        return []
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_backfill_writes_only_changed_rows():
+    conn = FakeConnection([
+        (1, json.dumps(["python3", "SQL"]), None),
+        (2, json.dumps(["Go"]), json.dumps(["Go"])),
+        (3, json.dumps(json.dumps(["ReactJS"])), None),
+    ])
+    assert backfill_skills(conn, batch_size=10, renormalize=True) == (3, 2)
+
+    statements = [statement for statement, _ in conn.statements]
+    assert statements[1:4] == ["BEGIN", "UPDATE", "SELECT"]  # counters read under the Employees lock
+    update = [params for statement, params in conn.statements if statement == "UPDATE"][-1]
+    assert json.loads(update[0]) == [[1, '["Python", "SQL"]'], [3, '["React"]']]
+    assert conn.commits == 1
@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+
+from flask import Flask
+
+import app.routes.prompt as prompt
+import app.routes.rag as rag
+from app.helpers.sse import sse_event, sse_response, wants_stream
+
+
+def parse_events(chunks):
+    """Split an SSE body into (event, data) pairs, checking the framing on the way."""
+    body = "".join(chunks)
+    assert body.endswith("\n\n")
+    events = []
+    for block in body.split("\n\n")[:-1]:
+        event_line, data_line = block.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_event_framing():
+    assert sse_event("token", {"text": "a\nb"}) == 'event: token\ndata: {"text": "a\\nb"}\n\n'
+
+
+def test_wants_stream_and_response_headers():
+    flask_app = Flask(__name__)
+    with flask_app.test_request_context("/?stream=1"):
+        assert wants_stream()
+    with flask_app.test_request_context("/?stream=0", headers={"Accept": "text/event-stream"}):
+        assert not wants_stream()
+    with flask_app.test_request_context("/", headers={"Accept": "text/event-stream"}):
+        assert wants_stream()
+        response = sse_response(iter([sse_event("done", {})]))
+        assert response.mimetype == "text/event-stream"
+        assert response.headers["Cache-Control"] == "no-cache"
+        assert response.headers["X-Accel-Buffering"] == "no"
+
+
+def _groq_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def _fake_client(chunks):
+    create = lambda **kwargs: iter(chunks)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_prompt_stream_ends_with_done_and_logs_time_to_first_token(monkeypatch):
+    logged = []
+    monkeypatch.setattr(prompt, "log_to_snowflake", lambda **row: logged.append(row) or True)
+    monkeypatch.setattr(prompt, "get_client", lambda: _fake_client([_groq_chunk("Hello"), _groq_chunk(None), _groq_chunk(" there")]))
+
+    events = parse_events(prompt.stream_prompt([], 16, "run-1", "2025-01-01 00:00:00", "hi"))
+
+    assert [name for name, _ in events] == ["start", "token", "token", "done"]
+    assert "".join(data["text"] for name, data in events if name == "token") == "Hello there"
+    done = events[-1][1]
+    assert done["run_id"] == "run-1"
+    assert logged[0]["status"] == "success"
+    assert logged[0]["response"] == "Hello there"
+    assert logged[0]["time_to_first_token"] is not None
+    assert logged[0]["time_to_first_token"] == done["time_to_first_token_seconds"]
+    assert logged[0]["time_to_first_token"] <= logged[0]["latency"]
+
+
+def test_prompt_stream_error_has_no_done_event(monkeypatch):
+    logged = []
+    monkeypatch.setattr(prompt, "log_to_snowflake", lambda **row: logged.append(row) or True)
+
+    def failing():
+        yield _groq_chunk("Hel")
+        raise RuntimeError("upstream closed")
+
+    monkeypatch.setattr(prompt, "get_client", lambda: SimpleNamespace(chat=SimpleNamespace(
+        completions=SimpleNamespace(create=lambda **kwargs: failing()))))
+
+    events = parse_events(prompt.stream_prompt([], 16, "run-2", "2025-01-01 00:00:00", "hi"))
+
+    assert [name for name, _ in events] == ["start", "token", "error"]
+    assert logged[0]["status"] == "error" and logged[0]["error"] == "upstream closed"
+    assert logged[0]["time_to_first_token"] is not None
+
+
+def test_rag_stream_sends_retrieval_tokens_and_done(monkeypatch):
+    logged, completed = [], []
+    monkeypatch.setattr(rag, "log_to_snowflake", lambda **row: logged.append(row) or True)
+    monkeypatch.setattr(rag, "stream_completion", lambda conn, prompt_text: iter(["Budi", "", " knows Python"]))
+    monkeypatch.setattr(rag, "submit_evaluation", lambda q, c, a: ("eval-1", {"id": "eval-1", "status": "pending"}))
+
+    retrieval = {"employee_ids": [7]}
+    events = parse_events(rag.stream_rag(None, "who knows python", "ctx", "prompt", retrieval,
+                                         on_complete=lambda answer, eid: completed.append((answer, eid))))
+
+    assert [name for name, _ in events] == ["start", "retrieval", "token", "token", "done"]
+    assert events[1][1] == retrieval
+    done = events[-1][1]
+    assert done["evaluation_id"] == "eval-1"
+    assert completed == [("Budi knows Python", "eval-1")]
+    assert logged[0]["time_to_first_token"] is not None
+    assert logged[0]["time_to_first_token"] == done["time_to_first_token_seconds"]
+
+
+def test_cached_answer_replays_the_same_events():
+    cached = {"answer": "Budi", "evaluation_id": None, "retrieval": {"employee_ids": [7]}}
+    events = parse_events(rag.stream_cached(cached))
+    assert [name for name, _ in events] == ["start", "retrieval", "token", "done"]
+    assert events[-1][1]["cached"] is True
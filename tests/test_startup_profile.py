@@ -0,0 +1,23 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_heavy_modules_are_not_loaded_at_startup():
+    env = dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "x"))
+    result = subprocess.run(
+        [sys.executable, "-m", "app.startup_profile", "--json"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["heavy_modules_loaded"] == []
+    assert [step["name"] for step in report["steps"]][-1] == "create_app"
+
+def test_profile_covers_every_registered_blueprint():
+    from app.startup_profile import BLUEPRINT_MODULES
+    with open(os.path.join(ROOT, "app", "routes", "__init__.py")) as f:
+        registered = [line.split()[1].lstrip(".") for line in f if line.startswith("from .")]
+    assert sorted(BLUEPRINT_MODULES) == sorted(registered)
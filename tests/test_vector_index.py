@@ -0,0 +1,135 @@
+import numpy as np
+from app.helpers.vector_index import VectorIndex
+
+
+def make_index():
+    index = VectorIndex(dimensions=3)
+    index.apply([
+        (1, 10, "python developer", [1.0, 0.0, 0.0]),
+        (2, 10, "java developer", [0.0, 1.0, 0.0]),
+        (3, 20, "data analyst", [0.0, 0.0, 2.0]),
+    ])
+    return index
+
+def test_search_returns_top_k_by_cosine_similarity():
+    index = make_index()
+    hits = index.search([0.9, 0.1, 0.0], k=2)
+    assert [hit['chunk_id'] for hit in hits] == [1, 2]
+    assert hits[0]['employee_id'] == 10
+    assert hits[0]['chunk_text'] == "python developer"
+    assert hits[0]['score'] > hits[1]['score']
+
+def test_search_scores_are_normalized():
+    index = make_index()
+    hits = index.search([0.0, 0.0, 5.0], k=1)
+    assert hits[0]['chunk_id'] == 3
+    assert np.isclose(hits[0]['score'], 1.0)
+
+def test_apply_upserts_and_drops_deleted_chunks():
+    index = make_index()
+    index.apply([(2, 10, "rust developer", [0.0, 0.0, 1.0])], live_ids=[2, 3])
+    assert len(index) == 2
+    hits = index.search([0.0, 0.0, 1.0], k=2)
+    assert {hit['chunk_id'] for hit in hits} == {2, 3}
+    assert "rust developer" in {hit['chunk_text'] for hit in hits}
+
+def test_search_on_empty_index():
+    assert VectorIndex(dimensions=3).search([1.0, 0.0, 0.0]) == []
+
+def test_search_employees_aggregates_best_chunk_per_employee():
+    index = make_index()
+    index.apply([(4, 20, "data engineer", [0.6, 0.0, 0.8])])
+    employees = index.search_employees([1.0, 0.0, 0.0], k=2)
+    assert [e['employee_id'] for e in employees] == [10, 20]
+    assert np.isclose(employees[0]['score'], 1.0)
+    assert [c['chunk_text'] for c in employees[0]['chunks']] == ["python developer", "java developer"]
+    assert np.isclose(employees[1]['score'], 0.6)
+
+def test_search_employees_mean_top_n():
+    index = make_index()
+    employees = index.search_employees([1.0, 0.0, 0.0], k=1, score_mode="mean_top_n", top_n=2)
+    assert employees[0]['employee_id'] == 10
+    assert np.isclose(employees[0]['score'], 0.5)
+
+class FakeConnection:
+    """Content_Chunks rows; honours the employee_id filter the retrieval SQL applies."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.result = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        rows = [r for r in self.rows if r[1] is not None] if "employee_id IS NOT NULL" in sql else self.rows
+        self.result = [(r[0],) for r in rows] if sql.strip().startswith("SELECT id FROM") else [r + ("t",) for r in rows]
+
+    def fetchmany(self, size):
+        batch, self.result = self.result[:size], self.result[size:]
+        return batch
+
+    def fetchall(self):
+        return self.fetchmany(len(self.result))
+
+    def close(self):
+        pass
+
+def test_chunks_without_employee_are_never_returned():
+    conn = FakeConnection([
+        (1, 10, "python developer", [1.0, 0.0, 0.0]),
+        (2, None, "orphaned python chunk", [1.0, 0.0, 0.0]),
+    ])
+    index = VectorIndex(dimensions=3)
+    index.load(conn)
+    index.refresh(conn)
+    index.apply([(3, None, "another orphan", [1.0, 0.0, 0.0])])
+    assert len(index) == 1
+    assert [e['employee_id'] for e in index.search_employees([1.0, 0.0, 0.0], k=5)] == [10]
+
+class CommittingConnection:
+    """Content_Chunks rows with an embedded_at; only committed rows are visible."""
+
+    def __init__(self):
+        self.rows = []
+        self.result = []
+
+    def add(self, chunk_id, employee_id, embedded_at, committed=True):
+        self.rows.append({"row": (chunk_id, employee_id, "python", [1.0, 0.0, 0.0], embedded_at), "committed": committed})
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        visible = [r["row"] for r in self.rows if r["committed"]]
+        if sql.strip().startswith("SELECT id FROM"):
+            self.result = [(r[0],) for r in visible]
+            return
+        if "DATEADD(second, %s, %s)" in sql:
+            offset, since = params[-2:]
+            visible = [r for r in visible if r[4] >= since + offset]
+        self.result = visible
+
+    def fetchmany(self, size):
+        batch, self.result = self.result[:size], self.result[size:]
+        return batch
+
+    def fetchall(self):
+        return self.fetchmany(len(self.result))
+
+    def close(self):
+        pass
+
+def test_refresh_picks_up_rows_committed_below_the_watermark():
+    conn = CommittingConnection()
+    conn.add(1, 10, embedded_at=100)
+    conn.add(2, 20, embedded_at=105, committed=False)  # embedded inside a still-open transaction
+    index = VectorIndex(dimensions=3, overlap_seconds=60)
+    index.load(conn)
+    conn.add(3, 30, embedded_at=110)
+    index.refresh(conn)
+    assert index.watermark == 110
+
+    conn.rows[1]["committed"] = True
+    index.refresh(conn)
+    assert sorted(e['employee_id'] for e in index.search_employees([1.0, 0.0, 0.0], k=5)) == [10, 20, 30]